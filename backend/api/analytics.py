@@ -0,0 +1,40 @@
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import async_crud, schemas
+from app.database import get_async_db
+
+router = APIRouter()
+
+PERIOD_PATTERN = r"^\d{4}-\d{2}$"
+
+@router.get("/groups", response_model=List[schemas.GroupSummary])
+async def get_group_summaries(db: AsyncSession = Depends(get_async_db)):
+    """Expense count and total spend of every group."""
+    return await async_crud.get_group_summaries(db)
+
+@router.get("/groups/{group_id}", response_model=schemas.GroupSummary)
+async def get_group_summary(group_id: int, db: AsyncSession = Depends(get_async_db)):
+    summaries = await async_crud.get_group_summaries(db, group_id)
+    if not summaries:
+        raise HTTPException(status_code=404, detail="Group not found")
+    return summaries[0]
+
+@router.get("/users/{user_id}", response_model=schemas.UserPosition)
+async def get_user_position(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    """What a user paid, their share of expenses and their net balance across all groups."""
+    position = await async_crud.get_user_position(db, user_id)
+    if position is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return position
+
+@router.get("/spend", response_model=List[schemas.PayerSpend])
+async def get_payer_spend(
+    group_id: Optional[int] = Query(None),
+    user_id: Optional[int] = Query(None, description="Only expenses paid by this user"),
+    period_from: Optional[str] = Query(None, pattern=PERIOD_PATTERN, description="First month, 'YYYY-MM'"),
+    period_to: Optional[str] = Query(None, pattern=PERIOD_PATTERN, description="Last month, 'YYYY-MM'"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Monthly spend per payer and group."""
+    return await async_crud.get_payer_spend(db, group_id, user_id, period_from, period_to)
@@ -1,20 +1,72 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from app import crud, schemas
-from app.database import get_db
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import async_crud, schemas
+from app.cache import balance_cache
+from app.database import get_async_db
 
 router = APIRouter()
 
 @router.get("/groups/{group_id}/balances", response_model=schemas.BalanceResponse)
-def get_group_balances(group_id: int, db: Session = Depends(get_db)):
-    balances = crud.get_group_balances(db, group_id)
+async def get_group_balances(
+    group_id: int,
+    strategy: str = Query("greedy", description="Settlement strategy: 'greedy' or 'optimal'"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        balances = await async_crud.get_group_balances(db, group_id, strategy)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if balances is None:
         raise HTTPException(status_code=404, detail="Group not found")
     return balances
 
 @router.get("/users/{user_id}/balances", response_model=schemas.UserBalanceResponse)
-def get_user_balances(user_id: int, db: Session = Depends(get_db)):
-    balances = crud.get_user_balances(db, user_id)
+async def get_user_balances(
+    user_id: int,
+    strategy: str = Query("greedy", description="Settlement strategy: 'greedy' or 'optimal'"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        balances = await async_crud.get_user_balances(db, user_id, strategy)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if balances is None:
         raise HTTPException(status_code=404, detail="User not found")
-    return balances
\ No newline at end of file
+    return balances
+
+@router.get("/users/{user_id}/balances/simplified", response_model=schemas.UserSimplifiedBalanceResponse)
+async def get_user_simplified_balances(
+    user_id: int,
+    strategy: str = Query("greedy", description="Settlement strategy: 'greedy' or 'optimal'"),
+    group_ids: Optional[List[int]] = Query(None, description="Only these of the user's groups (default: all)"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """The user's transfers after netting debts across their groups."""
+    try:
+        balances = await async_crud.get_user_simplified_balances(db, user_id, strategy, group_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if balances is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return balances
+
+@router.get("/balances/simplified", response_model=schemas.SimplifiedDebtsResponse)
+async def simplify_debts(
+    group_ids: List[int] = Query(..., description="Groups to settle together"),
+    strategy: str = Query("greedy", description="Settlement strategy: 'greedy' or 'optimal'"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """One transfer plan for several groups, with opposing and chained debts netted out."""
+    try:
+        simplified = await async_crud.simplify_debts(db, group_ids, strategy)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if simplified is None:
+        raise HTTPException(status_code=404, detail="One or more groups not found")
+    return simplified
+
+@router.get("/balances/cache-stats")
+async def get_balance_cache_stats():
+    """Hit/miss counters of the in-process balance cache, for monitoring."""
+    return balance_cache.stats()
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
-from app.database import get_db
+from fastapi import APIRouter, HTTPException, BackgroundTasks
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
-from chat.chatbot import process_chat_question
+import asyncio
+import json
+from fastapi.responses import StreamingResponse
+from chat.chatbot import process_chat_question, stream_chat_events, ChatOverloadedError
+from chat.sql_guard import sql_stats
 
 router = APIRouter()
 
@@ -15,7 +17,7 @@ class ChatResponse(BaseModel):
     answer: str
 
 @router.post("/", response_model=ChatResponse)
-async def chat_endpoint(request: ChatRequest, db: Session = Depends(get_db)):
+async def chat_endpoint(request: ChatRequest):
     """
     Send a message to the AI assistant and get a response.
     
@@ -32,5 +34,53 @@ async def chat_endpoint(request: ChatRequest, db: Session = Depends(get_db)):
         answer = await process_chat_question(request.question)
         
         return ChatResponse(answer=answer)
+    except ChatOverloadedError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="The assistant took too long to answer")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing question: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error processing question: {str(e)}")
+
+@router.get("/sql-stats")
+async def chat_sql_stats():
+    """Latency, row counts and rejections of the SQL the assistant generated, for tuning the guard limits."""
+    return sql_stats.stats()
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    """
+    Same as POST /chat/, but answers with server-sent events.
+
+    Stage events (query generated, query executed with its row count) arrive
+    first, then the answer as a series of token events, then a done event
+    carrying the full answer. Failures after the stream started are reported
+    as an error event.
+    """
+    events = stream_chat_events(request.question)
+    try:
+        # Wait for a concurrency slot before committing to a 200 response
+        first_event = await events.__anext__()
+    except ChatOverloadedError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+
+    async def event_stream():
+        yield _sse(*first_event)
+        try:
+            async for event, data in events:
+                yield _sse(event, data)
+        except asyncio.TimeoutError:
+            yield _sse("error", {"detail": "The assistant took too long to answer"})
+        except Exception as e:
+            yield _sse("error", {"detail": f"Error processing question: {str(e)}"})
+        finally:
+            # Releases the concurrency slot even if the client disconnects mid-stream
+            await events.aclose()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
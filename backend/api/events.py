@@ -0,0 +1,116 @@
+import json
+import os
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Path, Query, Header, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import async_crud, schemas
+from app.change_feed import change_feed
+from app.database import get_async_db
+
+router = APIRouter()
+
+# Idle streams send a comment this often to keep proxies from closing them,
+# and re-read the event log in case an event was published on another worker
+FEED_HEARTBEAT_SECONDS = float(os.getenv("FEED_HEARTBEAT_SECONDS", "15"))
+FEED_PAGE_SIZE = 500
+
+
+def _session_scope(request: Request):
+    """Short-lived session from get_async_db (honouring dependency overrides), so a stream holds no connection."""
+    get_session = request.app.dependency_overrides.get(get_async_db, get_async_db)
+    return asynccontextmanager(get_session)()
+
+
+def _server_sent_event(event_type: str, data: dict, event_id: int = None):
+    lines = [f"event: {event_type}", f"data: {json.dumps(data)}"]
+    if event_id is not None:
+        lines.insert(0, f"id: {event_id}")
+    return "\n".join(lines) + "\n\n"
+
+
+@router.get("/groups/{group_id}/events", response_model=List[schemas.GroupEvent])
+async def get_group_events(
+    group_id: int = Path(...),
+    after: int = Query(0, ge=0, description="Return events with a larger sequence number"),
+    limit: int = Query(FEED_PAGE_SIZE, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """The group's change feed, oldest first; page with `after` set to the last `seq` received."""
+    if await async_crud.get_group_event_seq(db, group_id) is None:
+        raise HTTPException(status_code=404, detail="Group not found")
+    return await async_crud.get_group_events(db, group_id, after, limit)
+
+
+@router.get("/groups/{group_id}/events/stream")
+async def stream_group_events(
+    request: Request,
+    group_id: int = Path(...),
+    after: Optional[int] = Query(None, ge=0, description="Resume after this sequence number"),
+    last_event_id: Optional[str] = Header(None, description="Sent by EventSource when it reconnects"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Server-sent events of the group's change feed.
+
+    Every event carries its sequence number as the SSE id, so a reconnecting
+    EventSource resumes through Last-Event-ID; other clients pass `after`.
+    Without either, the stream starts at the current head, announced by a
+    `ready` event. A `reset` event means events after the requested sequence
+    number were already trimmed: reload the balances, then go on with the
+    stream.
+    """
+    if last_event_id is not None and last_event_id.isdigit():
+        after = int(last_event_id)
+    # Subscribe before reading the head, so nothing committed after it is missed
+    subscription = change_feed.subscribe(group_id)
+    head = await async_crud.get_group_event_seq(db, group_id)
+    if head is None:
+        subscription.close()
+        raise HTTPException(status_code=404, detail="Group not found")
+
+    async def load_events(after_seq: int):
+        async with _session_scope(request) as session:
+            return await async_crud.get_group_events(session, group_id, after_seq, FEED_PAGE_SIZE)
+
+    async def stream():
+        last_seq = head if after is None else after
+        try:
+            if after is None:
+                yield _server_sent_event("ready", {"group_id": group_id, "seq": head}, head)
+            catch_up = after is not None
+            while True:
+                if catch_up:
+                    # Replay the event log from last_seq, page by page
+                    while True:
+                        events = await load_events(last_seq)
+                        if events and events[0]["seq"] > last_seq + 1:
+                            yield _server_sent_event("reset", {"group_id": group_id, "seq": last_seq})
+                        for event in events:
+                            yield _server_sent_event(event["type"], event, event["seq"])
+                            last_seq = event["seq"]
+                        if len(events) < FEED_PAGE_SIZE:
+                            break
+                    catch_up = False
+
+                event = await subscription.get(FEED_HEARTBEAT_SECONDS)
+                if await request.is_disconnected():
+                    break
+                if event is None:
+                    yield ": heartbeat\n\n"
+                    catch_up = True
+                elif event["seq"] == last_seq + 1:
+                    yield _server_sent_event(event["type"], event, event["seq"])
+                    last_seq = event["seq"]
+                elif event["seq"] > last_seq + 1:
+                    # A message was dropped or is still on its way: the log has it
+                    catch_up = True
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,22 +1,152 @@
-from fastapi import APIRouter, HTTPException, Depends, Path
+from contextlib import contextmanager
+from fastapi import APIRouter, HTTPException, Depends, Path, Body, Query, Header, UploadFile, File, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
-from app import crud, schemas
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app import crud, async_crud, schemas, expense_io, idempotency
+from app.database import get_db, get_async_db
+from app.pagination import decode_cursor, set_next_cursor
 
 router = APIRouter()
 
-@router.post("/", response_model=schemas.ExpenseCreate)
-def add_expense(
+
+def _session_scope(request: Request):
+    """Session from get_db (honouring dependency overrides) for a stream that outlives the request's session."""
+    get_session = request.app.dependency_overrides.get(get_db, get_db)
+    return contextmanager(get_session)()
+
+
+@router.post("/", response_model=schemas.ExpenseResponse)
+async def add_expense(
+    response: Response,
     group_id: int = Path(...),
     expense: schemas.ExpenseCreate = None,
-    db: Session = Depends(get_db)
+    idempotency_key: Optional[str] = Header(
+        None, min_length=1, max_length=idempotency.IDEMPOTENCY_KEY_MAX_LENGTH,
+        description="Retries with the same key and body return the first response instead of a duplicate"
+    ),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        if idempotency_key is None:
+            return await async_crud.create_expense(db=db, expense=expense, group_id=group_id)
+        body, replayed = await async_crud.create_expense_idempotent(
+            db=db, expense=expense, group_id=group_id, key=idempotency_key
+        )
+    except idempotency.IdempotencyKeyMismatch as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return body
+
+@router.post("/bulk", response_model=schemas.BulkExpenseResponse)
+async def add_expenses_bulk(
+    group_id: int = Path(...),
+    expenses: List[schemas.ExpenseCreate] = Body(...),
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
-        return crud.create_expense(db=db, expense=expense, group_id=group_id)
+        return await async_crud.create_expenses_bulk(db=db, expenses=expenses, group_id=group_id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/", response_model=List[schemas.ExpenseResponse])
-def get_expenses(group_id: int = Path(...), db: Session = Depends(get_db)):
-    return crud.get_expenses_by_group(db=db, group_id=group_id)
\ No newline at end of file
+async def get_expenses(
+    response: Response,
+    group_id: int = Path(...),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size; omit to list every expense"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value of the previous page"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        after_id = decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    expenses = await async_crud.get_expenses_by_group(db=db, group_id=group_id, limit=limit, after_id=after_id)
+    set_next_cursor(response, [expense["id"] for expense in expenses], limit)
+    return expenses
+
+@router.patch("/{expense_id}", response_model=schemas.ExpenseResponse)
+async def update_expense(
+    group_id: int = Path(...),
+    expense_id: int = Path(...),
+    changes: schemas.ExpenseUpdate = Body(...),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        expense = await async_crud.update_expense(db=db, group_id=group_id, expense_id=expense_id, changes=changes)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if expense is None:
+        raise HTTPException(status_code=404, detail="Expense not found")
+    return expense
+
+@router.delete("/{expense_id}", status_code=204)
+async def delete_expense(
+    group_id: int = Path(...),
+    expense_id: int = Path(...),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if await async_crud.delete_expense(db=db, group_id=group_id, expense_id=expense_id) is None:
+        raise HTTPException(status_code=404, detail="Expense not found")
+    return Response(status_code=204)
+
+@router.get("/export")
+def export_expenses(
+    request: Request,
+    group_id: int = Path(...),
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    db: Session = Depends(get_db)
+):
+    if crud.get_group(db, group_id) is None:
+        raise HTTPException(status_code=404, detail="Group not found")
+
+    def stream():
+        # The request's session is closed once the endpoint returns, so the
+        # stream keeps its own session open for as long as it is being read
+        with _session_scope(request) as stream_db:
+            rows = crud.stream_expenses_by_group(stream_db, group_id, with_splits=True)
+            yield from expense_io.ENCODERS[format](rows)
+
+    return StreamingResponse(
+        stream(),
+        media_type=expense_io.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="group-{group_id}-expenses.{format}"'}
+    )
+
+@router.post("/import", response_model=schemas.ExpenseImportResponse)
+def import_expenses(
+    group_id: int = Path(...),
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    batch_size: int = Query(1000, ge=1, le=10000),
+    db: Session = Depends(get_db)
+):
+    format = format or expense_io.guess_format(file.filename)
+    if format is None:
+        raise HTTPException(status_code=400, detail="Could not tell the file format, pass ?format=csv or ?format=ndjson")
+
+    created_count = 0
+    errors = []
+    for batch in expense_io.chunked(expense_io.read_expenses(file.file, format), batch_size):
+        expenses = [(index, item) for index, item in batch if isinstance(item, schemas.ExpenseCreate)]
+        errors.extend({"index": index, "detail": item} for index, item in batch if isinstance(item, str))
+        if not expenses:
+            continue
+
+        try:
+            result = crud.create_expenses_bulk(db=db, expenses=[item for _, item in expenses], group_id=group_id)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        created_count += len(result["created"])
+        # Map batch positions back to record numbers in the file
+        errors.extend(
+            {"index": expenses[error["index"]][0], "detail": error["detail"]}
+            for error in result["errors"]
+        )
+
+    errors.sort(key=lambda error: error["index"])
+    return {"created_count": created_count, "errors": errors}
@@ -1,31 +1,46 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from typing import List
-from app import crud, schemas
-from app.database import get_db
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app import async_crud, schemas
+from app.database import get_async_db
+from app.pagination import decode_cursor, set_next_cursor
 
 
 router = APIRouter()
 
 @router.post("/", response_model=schemas.Group)
-def create_group(group: schemas.GroupCreate, db: Session = Depends(get_db)):
+async def create_group(group: schemas.GroupCreate, db: AsyncSession = Depends(get_async_db)):
     try:
-        db_group = crud.create_group(db=db, group=group)
+        db_group = await async_crud.create_group(db=db, group=group)
         return db_group
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/allGroups", response_model=List[schemas.Group])
-def get_groups(db: Session = Depends(get_db)):
-    db_groups = crud.get_all_groups(db=db)
+async def get_groups(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size; omit to list every group"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value of the previous page"),
+    member_id: Optional[int] = Query(None, description="Only groups this user belongs to"),
+    name_prefix: Optional[str] = Query(None, max_length=100, description="Only groups whose name starts with this"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        after_id = decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    db_groups = await async_crud.get_all_groups(
+        db=db, limit=limit, after_id=after_id, member_id=member_id, name_prefix=name_prefix
+    )
     if db_groups is None:
         raise HTTPException(status_code=404, detail="Group not found")
+    set_next_cursor(response, [group["id"] for group in db_groups], limit)
     return db_groups
 
 
 @router.get("/{group_id}", response_model=schemas.GroupDetails)
-def get_group_details_route(group_id: int, db: Session = Depends(get_db)):
-    db_group = crud.get_group_details(db=db, group_id=group_id)
+async def get_group_details_route(group_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_group = await async_crud.get_group_details(db=db, group_id=group_id)
     if db_group is None:
         raise HTTPException(status_code=404, detail="Group not found")
     return db_group
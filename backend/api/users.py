@@ -1,26 +1,38 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from app import crud, schemas
-from app.database import get_db
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import async_crud, schemas
+from app.database import get_async_db
+from app.pagination import decode_cursor, set_next_cursor
+from typing import List, Optional
 
 router = APIRouter()
 
 @router.post("/", response_model=schemas.User)
-def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = crud.get_user_by_email(db, email=user.email)
+async def create_user(user: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    db_user = await async_crud.get_user_by_email(db, email=user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    return crud.create_user(db=db, user=user)
+    return await async_crud.create_user(db=db, user=user)
 
 @router.get("/", response_model=List[schemas.User])
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    users = crud.get_users(db, skip=skip, limit=limit)
+async def read_users(
+    response: Response,
+    skip: int = Query(0, ge=0, description="Deprecated: use cursor"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value of the previous page"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        after_id = decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    users = await async_crud.get_users(db, skip=skip, limit=limit, after_id=after_id)
+    set_next_cursor(response, [user["id"] for user in users], limit)
     return users
 
 @router.get("/{user_id}", response_model=schemas.User)
-def read_user(user_id: int, db: Session = Depends(get_db)):
-    db_user = crud.get_user(db, user_id=user_id)
+async def read_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_user = await async_crud.get_user(db, user_id=user_id)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return db_user
\ No newline at end of file
@@ -0,0 +1,54 @@
+"""
+Async versions of the crud functions, for routers using an AsyncSession.
+
+Each function runs its app.crud counterpart through AsyncSession.run_sync:
+the query logic stays in one place, while the statements are executed by
+the async driver (asyncpg) inside a greenlet, so a slow query suspends the
+request instead of occupying a threadpool worker.
+"""
+from functools import wraps
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import crud
+
+
+def _run_sync(fn):
+    @wraps(fn)
+    async def wrapper(db: AsyncSession, *args, **kwargs):
+        return await db.run_sync(fn, *args, **kwargs)
+    return wrapper
+
+
+# User CRUD operations
+get_user = _run_sync(crud.get_user)
+get_users = _run_sync(crud.get_users)
+get_user_by_email = _run_sync(crud.get_user_by_email)
+create_user = _run_sync(crud.create_user)
+
+# Group CRUD operations
+create_group = _run_sync(crud.create_group)
+get_all_groups = _run_sync(crud.get_all_groups)
+get_group = _run_sync(crud.get_group)
+get_group_details = _run_sync(crud.get_group_details)
+
+# Expense CRUD operations
+create_expense = _run_sync(crud.create_expense)
+create_expense_idempotent = _run_sync(crud.create_expense_idempotent)
+create_expenses_bulk = _run_sync(crud.create_expenses_bulk)
+get_expenses_by_group = _run_sync(crud.get_expenses_by_group)
+update_expense = _run_sync(crud.update_expense)
+delete_expense = _run_sync(crud.delete_expense)
+
+# Change feed
+get_group_event_seq = _run_sync(crud.get_group_event_seq)
+get_group_events = _run_sync(crud.get_group_events)
+
+# Balance calculations
+get_group_balances = _run_sync(crud.get_group_balances)
+get_user_balances = _run_sync(crud.get_user_balances)
+simplify_debts = _run_sync(crud.simplify_debts)
+get_user_simplified_balances = _run_sync(crud.get_user_simplified_balances)
+
+# Analytics summaries
+get_group_summaries = _run_sync(crud.get_group_summaries)
+get_user_position = _run_sync(crud.get_user_position)
+get_payer_spend = _run_sync(crud.get_payer_spend)
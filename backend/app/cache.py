@@ -0,0 +1,167 @@
+"""
+Read-through cache for group balances.
+
+Balance reads go through `balance_cache`: a hit skips the database entirely,
+a miss loads the group's net balances from the ledger and stores them. Every
+write path that changes a group's splits must call
+`balance_cache.invalidate_group(group_id)` after committing. A reader takes
+`generation(group_id)` before loading and passes it to `set_group`, which
+then drops the value if the group was invalidated in the meantime: the load
+may predate that write.
+
+Entries live in a pluggable CacheBackend. InMemoryBackend keeps them in this
+process with LRU eviction and per-entry TTLs; a shared backend (e.g. Redis)
+only needs to implement the same four methods to serve several workers
+(generations are per process, so a load that races another worker's write
+can still be served until its TTL runs out).
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+BALANCE_CACHE_TTL_SECONDS = float(os.getenv("BALANCE_CACHE_TTL_SECONDS", "30"))
+BALANCE_CACHE_MAX_ENTRIES = int(os.getenv("BALANCE_CACHE_MAX_ENTRIES", "10000"))
+
+
+class CacheBackend:
+    """Storage interface used by BalanceCache."""
+
+    def get(self, key):
+        """Return the stored value, or None if missing or expired."""
+        raise NotImplementedError
+
+    def set(self, key, value, ttl: float):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def __len__(self):
+        return 0
+
+
+class InMemoryBackend(CacheBackend):
+    """Thread-safe LRU dict with per-entry expiry, local to this process."""
+
+    def __init__(self, max_entries: int = BALANCE_CACHE_MAX_ENTRIES, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: float):
+        with self._lock:
+            self._entries[key] = (self.clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class BalanceCache:
+    """Per-group cache of (group_name, net balances) with hit/miss counters."""
+
+    def __init__(self, backend: CacheBackend, ttl: float = BALANCE_CACHE_TTL_SECONDS):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._generations = {}  # group_id -> invalidation count, for groups invalidated so far
+        self._clears = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(group_id: int):
+        return f"group_balances:{group_id}"
+
+    def get_group(self, group_id: int):
+        value = self.backend.get(self._key(group_id))
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def generation(self, group_id: int):
+        """Token that changes whenever the group is invalidated in this process."""
+        with self._lock:
+            return self._clears, self._generations.get(group_id, 0)
+
+    def set_group(self, group_id: int, value, generation=None):
+        """Store a loaded value, unless the group was invalidated since `generation` was taken."""
+        with self._lock:
+            if generation is not None and generation != (self._clears, self._generations.get(group_id, 0)):
+                return
+            self.backend.set(self._key(group_id), value, self.ttl)
+
+    def invalidate_group(self, group_id: int):
+        with self._lock:
+            self.invalidations += 1
+            self._generations[group_id] = self._generations.get(group_id, 0) + 1
+            self.backend.delete(self._key(group_id))
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += 1
+            self._clears += 1
+            self._generations.clear()
+            self.backend.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "entries": len(self.backend),
+            "ttl_seconds": self.ttl,
+        }
+
+
+balance_cache = BalanceCache(InMemoryBackend())
+
+_writes = 0
+_writes_lock = threading.Lock()
+
+
+def record_write():
+    """Move data_version() after a committed write that invalidates no group balances (users, groups, cleanup)."""
+    global _writes
+    with _writes_lock:
+        _writes += 1
+
+
+def data_version() -> int:
+    """
+    Counter that moves on every write committed in this process: balance
+    invalidations plus record_write(). Writes by other processes do not move it.
+    """
+    return balance_cache.invalidations + _writes
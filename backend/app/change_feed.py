@@ -0,0 +1,120 @@
+"""
+Per-group change feed: live delivery of group events to subscribers.
+
+Every write that changes a group's balances appends an event to the
+group_events table in the same transaction (crud.record_group_event), with
+a sequence number that increases by one per group. After committing, the
+writer hands the event to `change_feed.publish`, which fans it out to the
+subscribers of the group (GET /groups/{group_id}/events/stream).
+
+The table is the source of truth: a subscriber that reconnects, misses a
+message or sees a gap in the sequence reloads from it, so the pub/sub layer
+only has to be fast, not reliable. Messages go through a pluggable
+PubSubBackend. InMemoryPubSub delivers within this process (and is the
+stand-in for tests); a shared backend (e.g. Redis pub/sub) only needs to
+implement the same three methods to reach subscribers on other workers.
+"""
+import asyncio
+import os
+import threading
+
+FEED_SUBSCRIBER_QUEUE_SIZE = int(os.getenv("FEED_SUBSCRIBER_QUEUE_SIZE", "1000"))
+
+
+class Subscription:
+    """Messages of one channel for one consumer, read with `await get()`."""
+
+    def __init__(self, backend, channel: str, max_size: int = FEED_SUBSCRIBER_QUEUE_SIZE):
+        self.backend = backend
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(max_size)
+
+    def deliver(self, message):
+        """Queue a message; safe to call from any thread."""
+        self.loop.call_soon_threadsafe(self._put, message)
+
+    def _put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            pass  # A slow consumer sees a gap in the sequence and reloads from group_events
+
+    async def get(self, timeout: float = None):
+        """Next message, or None after `timeout` seconds without one."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.backend.unsubscribe(self)
+
+
+class PubSubBackend:
+    """Transport used by ChangeFeed."""
+
+    def subscribe(self, channel: str) -> Subscription:
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription: Subscription):
+        raise NotImplementedError
+
+    def publish(self, channel: str, message):
+        raise NotImplementedError
+
+
+class InMemoryPubSub(PubSubBackend):
+    """Thread-safe fan-out to the subscriptions of this process."""
+
+    def __init__(self):
+        self._channels = {}  # channel -> set of Subscription
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel: str) -> Subscription:
+        subscription = Subscription(self, channel)
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._channels.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[subscription.channel]
+
+    def publish(self, channel: str, message):
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(message)
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._channels.values())
+
+
+class ChangeFeed:
+    """Publishes committed group events and subscribes to a group's events."""
+
+    def __init__(self, backend: PubSubBackend):
+        self.backend = backend
+        self.published = 0
+
+    @staticmethod
+    def _channel(group_id: int):
+        return f"group_events:{group_id}"
+
+    def publish(self, *events):
+        """Fan out events (as returned by crud.record_group_event); call only after committing them."""
+        for event in events:
+            self.published += 1
+            self.backend.publish(self._channel(event["group_id"]), event)
+
+    def subscribe(self, group_id: int) -> Subscription:
+        return self.backend.subscribe(self._channel(group_id))
+
+
+change_feed = ChangeFeed(InMemoryPubSub())
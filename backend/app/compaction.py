@@ -0,0 +1,55 @@
+"""
+Remove soft-deleted expenses and old change feed events once they are older than the retention window.
+
+Deleting an expense only sets expenses.deleted_at (its splits and balance
+effects are removed right away), and group_events keeps every event of the
+change feed; run this periodically, e.g. from cron, to purge those rows.
+Usage (from the backend directory):
+    python -m app.compaction                # expenses deleted more than EXPENSE_RETENTION_DAYS ago,
+                                            # events older than GROUP_EVENT_RETENTION_DAYS
+    python -m app.compaction --days 7 --event-days 1
+    python -m app.compaction --dry-run      # only count them
+"""
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import crud
+from app.database import SessionLocal
+
+EXPENSE_RETENTION_DAYS = float(os.getenv("EXPENSE_RETENTION_DAYS", "30"))
+# Clients that reconnect after longer than this reload balances instead of replaying the feed
+GROUP_EVENT_RETENTION_DAYS = float(os.getenv("GROUP_EVENT_RETENTION_DAYS", "7"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=float, default=EXPENSE_RETENTION_DAYS,
+                        help="Keep expenses deleted less than this many days ago")
+    parser.add_argument("--event-days", type=float, default=GROUP_EVENT_RETENTION_DAYS,
+                        help="Keep change feed events created less than this many days ago")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Expenses removed per transaction")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the expenses to remove")
+    args = parser.parse_args(argv)
+
+    now = datetime.utcnow()
+    deleted_before = now - timedelta(days=args.days)
+    created_before = now - timedelta(days=args.event_days)
+    db = SessionLocal()
+    try:
+        removed = crud.compact_deleted_expenses(db, deleted_before, args.batch_size, args.dry_run)
+        removed_events = crud.compact_group_events(db, created_before, args.dry_run)
+    finally:
+        db.close()
+
+    action = "Would remove" if args.dry_run else "Removed"
+    print(f"{action} {removed} expense(s) deleted before {deleted_before:%Y-%m-%d %H:%M} UTC")
+    print(f"{action} {removed_events} change feed event(s) created before {created_before:%Y-%m-%d %H:%M} UTC")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,33 @@
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from . import models, schemas
+from sqlalchemy.dialects import postgresql, sqlite
+from . import models, schemas, settlement, money, idempotency
+from .cache import balance_cache, record_write
+from .change_feed import change_feed
+from typing import List
+from datetime import datetime
+from collections import defaultdict
+import json
 import math
 
+def fetch_rows(db: Session, query):
+    """Run a column select and return plain dicts, skipping ORM object hydration."""
+    return [dict(row) for row in db.execute(query).mappings()]
+
 # User CRUD operations
 def get_user(db: Session, user_id: int):
     return db.query(models.User).filter(models.User.id == user_id).first()
 
 # Add to /Users/shrutipatil/Documents/pr/ass/backend/app/crud.py
-def get_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.User).offset(skip).limit(limit).all()
+def get_users(db: Session, skip: int = 0, limit: int = 100, after_id: int = None):
+    query = select(models.User.id, models.User.username, models.User.email).order_by(models.User.id)
+    if after_id is not None:
+        # Keyset pagination: seek past the previous page instead of counting rows
+        query = query.where(models.User.id > after_id)
+    elif skip:
+        query = query.offset(skip)
+    return fetch_rows(db, query.limit(limit))
 
 def get_user_by_email(db: Session, email: str):
     return db.query(models.User).filter(models.User.email == email).first()
@@ -17,6 +36,7 @@ def create_user(db: Session, user: schemas.UserCreate):
     db_user = models.User(username=user.username, email=user.email)
     db.add(db_user)
     db.commit()
+    record_write()
     db.refresh(db_user)
     return db_user
 
@@ -31,6 +51,7 @@ def create_group(db: Session, group: schemas.GroupCreate):
     db_group = models.Group(name=group.name, users=users)
     db.add(db_group)
     db.commit()
+    record_write()
     db.refresh(db_group)
     return {
         "id": db_group.id,
@@ -39,39 +60,185 @@ def create_group(db: Session, group: schemas.GroupCreate):
     }
 
 
-def get_all_groups(db: Session):
-    groups = db.query(models.Group).all()
-    result = []
-    for group in groups:
-        result.append({
-            "id": group.id,
-            "name": group.name,
-            "member_count": len(group.users)
-        })
-    return result
+def get_all_groups(db: Session, limit: int = None, after_id: int = None,
+                   member_id: int = None, name_prefix: str = None):
+    """
+    List groups with their member counts in a single aggregate query.
+    
+    Optionally restricted to groups containing `member_id` and/or whose name
+    starts with `name_prefix`, and keyset-paginated on the group id.
+    """
+    query = select(
+        models.Group.id,
+        models.Group.name,
+        func.count(models.group_users.c.user_id).label("member_count")
+    ).outerjoin(
+        models.group_users, models.group_users.c.group_id == models.Group.id
+    ).group_by(models.Group.id, models.Group.name).order_by(models.Group.id)
+    
+    if member_id is not None:
+        query = query.where(models.Group.id.in_(
+            select(models.group_users.c.group_id).where(models.group_users.c.user_id == member_id)
+        ))
+    if name_prefix:
+        query = query.where(models.Group.name.startswith(name_prefix, autoescape=True))
+    if after_id is not None:
+        query = query.where(models.Group.id > after_id)
+    if limit is not None:
+        query = query.limit(limit)
+    return fetch_rows(db, query)
 
 def get_group(db: Session, group_id: int):
     return db.query(models.Group).filter(models.Group.id == group_id).first()
 
 def get_group_details(db: Session, group_id: int):
-    group = db.query(models.Group).filter(models.Group.id == group_id).first()
-    if not group:
+    """
+    Group with its totals and a paid/share/balance summary per member.
+    
+    Two aggregate queries against the summary tables and the balance ledger,
+    so the cost does not grow with the number of expenses in the group.
+    """
+    group = db.execute(
+        select(
+            models.Group.id,
+            models.Group.name,
+            func.coalesce(models.GroupSummary.expense_count, 0).label("expense_count"),
+            func.coalesce(models.GroupSummary.total_cents, 0).label("total_cents")
+        ).outerjoin(models.GroupSummary, models.GroupSummary.group_id == models.Group.id)
+        .where(models.Group.id == group_id)
+    ).mappings().first()
+    if group is None:
         return None
-        
-    # Calculate total expenses for the group
-    total_expenses = sum(expense.amount for expense in group.expenses)
     
-    # Create group details
+    paid = select(
+        models.PayerPeriodSpend.user_id,
+        func.sum(models.PayerPeriodSpend.total_cents).label("paid_cents")
+    ).where(models.PayerPeriodSpend.group_id == group_id).group_by(models.PayerPeriodSpend.user_id).subquery()
+    members = fetch_rows(db, select(
+        models.User.id,
+        models.User.username,
+        models.User.email,
+        func.coalesce(paid.c.paid_cents, 0).label("paid_cents"),
+        func.coalesce(models.GroupUserBalance.balance_cents, 0).label("balance_cents")
+    ).join(
+        models.group_users, models.group_users.c.user_id == models.User.id
+    ).outerjoin(
+        models.GroupUserBalance,
+        (models.GroupUserBalance.group_id == group_id) & (models.GroupUserBalance.user_id == models.User.id)
+    ).outerjoin(
+        paid, paid.c.user_id == models.User.id
+    ).where(models.group_users.c.group_id == group_id).order_by(models.User.id))
+    
     return {
-        "id": group.id,
-            "name": group.name,
-            "users": group.users,
-            "total_expenses": group.total_expenses if hasattr(group, 'total_expenses') else 0,
-            "member_count": len(group.users)  # Add this line
-        }
+        "id": group["id"],
+        "name": group["name"],
+        "users": [
+            {"id": member["id"], "username": member["username"], "email": member["email"]}
+            for member in members
+        ],
+        "member_count": len(members),
+        "expense_count": group["expense_count"],
+        "total_cents": group["total_cents"],
+        "total_expenses": money.from_cents(group["total_cents"]),
+        "members": [
+            {
+                "user_id": member["id"],
+                "username": member["username"],
+                "paid_cents": member["paid_cents"],
+                # Their share of the group's expenses: paid + net balance
+                "share_cents": member["paid_cents"] + member["balance_cents"],
+                "balance_cents": member["balance_cents"]
+            }
+            for member in members
+        ]
+    }
 
 # Expense CRUD operations
-def create_expense(db: Session, expense: schemas.ExpenseCreate, group_id: int):
+def build_splits(expense: schemas.ExpenseCreate, member_ids):
+    """
+    Calculate the split amount of every participant of an expense, in cents.
+    
+    Returns {user_id: amount_cents}; positive means the user owes, negative
+    means the user is owed. Shares are allocated with the largest-remainder
+    method, so the splits of an expense always sum to exactly zero.
+    Raises ValueError if the expense cannot be split.
+    """
+    if expense.paid_by not in member_ids:
+        raise ValueError(f"Payer {expense.paid_by} is not a member of this group")
+    total_cents = money.to_cents(expense.amount)
+    _check_amount(total_cents)
+    
+    if expense.split_type == "equal":
+        # Equal split among the listed participants (e.g. a re-imported export), else among all members
+        if expense.splits:
+            participant_ids = [int(user_id) for user_id in expense.splits]
+            for user_id in participant_ids:
+                if user_id not in member_ids:
+                    raise ValueError(f"User {user_id} is not a member of this group")
+        else:
+            participant_ids = list(member_ids)
+        shares = money.allocate(total_cents, [1] * len(participant_ids))
+    
+    elif expense.split_type == "percentage":
+        # Percentage split
+        if not expense.splits:
+            raise ValueError("Percentage splits are required for percentage split type")
+            
+        total_percentage = sum(float(percentage) for percentage in expense.splits.values())
+        if not math.isclose(total_percentage, 100.0, rel_tol=1e-5):
+            raise ValueError(f"Split percentages must sum to 100%, got {total_percentage}%")
+        
+        participant_ids = [int(user_id) for user_id in expense.splits]
+        for user_id in participant_ids:
+            if user_id not in member_ids:
+                raise ValueError(f"User {user_id} is not a member of this group")
+        shares = money.allocate(total_cents, list(expense.splits.values()))
+    
+    else:
+        raise ValueError(f"Unknown split type '{expense.split_type}', expected 'equal' or 'percentage'")
+    
+    return _owed_splits(participant_ids, shares, expense.paid_by, total_cents)
+
+def _check_amount(total_cents: int):
+    # Amounts under half a cent round to nothing
+    if total_cents <= 0:
+        raise ValueError("Amount must be at least 0.01")
+
+def _group_currency(db: Session, group_id: int, exclude_expense_id: int = None):
+    """
+    Currency of the group's active expenses (None if it has none), locking the group row.
+    
+    Balances add up amounts, so all active expenses of a group share one
+    currency and the first one tells it. The lock keeps two first expenses
+    from picking different currencies; writers take it in
+    record_group_event anyway.
+    """
+    db.execute(select(models.Group.id).where(models.Group.id == group_id).with_for_update())
+    query = select(models.Expense.currency).where(
+        models.Expense.group_id == group_id, models.Expense.deleted_at.is_(None)
+    ).order_by(models.Expense.id).limit(1)
+    if exclude_expense_id is not None:
+        query = query.where(models.Expense.id != exclude_expense_id)
+    return db.execute(query).scalar()
+
+def _check_currency(currency: str, group_currency):
+    if group_currency is not None and currency != group_currency:
+        raise ValueError(f"This group's expenses are in {group_currency}, got {currency}")
+
+def _owed_splits(participant_ids, shares, paid_by: int, total_cents: int):
+    # Everyone owes their share; the payer is owed the total (negative means they're owed)
+    splits = dict(zip(participant_ids, shares))
+    splits[paid_by] = splits.get(paid_by, 0) - total_cents
+    return splits
+
+def _expense_json(db_expense: models.Expense):
+    return schemas.ExpenseResponse.model_validate(db_expense, from_attributes=True).model_dump(mode="json")
+
+def _add_expense(db: Session, expense: schemas.ExpenseCreate, group_id: int):
+    """
+    Stage an expense with its splits, ledger and summary updates and its
+    change feed event, without committing. Returns (expense, event).
+    """
     group = get_group(db, group_id)
     if not group:
         raise ValueError("Group not found")
@@ -80,163 +247,846 @@ def create_expense(db: Session, expense: schemas.ExpenseCreate, group_id: int):
     if not paid_by_user:
         raise ValueError("Payer not found")
     
-    # Create expense record
+    # Calculate expense splits before writing anything
+    splits = build_splits(expense, [user.id for user in group.users])
+    currency = expense.currency or money.DEFAULT_CURRENCY
+    _check_currency(currency, _group_currency(db, group_id))
+    
+    # Create expense record; flushing assigns its id inside the transaction
     db_expense = models.Expense(
         description=expense.description,
-        amount=expense.amount,
+        amount_cents=money.to_cents(expense.amount),
+        currency=currency,
         paid_by=expense.paid_by,
         group_id=group_id,
-        split_type=expense.split_type
+        split_type=expense.split_type,
+        created_at=datetime.utcnow()
     )
     db.add(db_expense)
+    db.flush()
+    
+    # Create expense splits
+    for user_id, amount_cents in splits.items():
+        db_split = models.ExpenseSplit(
+            expense_id=db_expense.id,
+            group_id=group_id,
+            user_id=user_id,
+            amount_cents=amount_cents
+        )
+        db.add(db_split)
+    
+    # Keep the balance ledger and summaries in step with the splits (same transaction)
+    apply_balance_deltas(db, group_id, splits)
+    apply_summary_deltas(db, group_id, [
+        (db_expense.paid_by, db_expense.amount_cents, db_expense.created_at, splits)
+    ])
+    event = record_group_event(
+        db, group_id, "expense_created", db_expense.id, splits, expense=_expense_json(db_expense)
+    )
+    return db_expense, event
+
+def create_expense(db: Session, expense: schemas.ExpenseCreate, group_id: int):
+    """Insert an expense, its splits, the ledger/summary updates and its event in a single transaction."""
+    db_expense, event = _add_expense(db, expense, group_id)
     db.commit()
-    db.refresh(db_expense)
+    balance_cache.invalidate_group(group_id)
+    change_feed.publish(event)
+    return db_expense
+
+def get_idempotent_response(db: Session, key: str, request_hash: str):
+    """
+    Stored response of an earlier request with this Idempotency-Key, or None.
     
-    # Calculate and create expense splits
-    if expense.split_type == "equal":
-        # Equal split
-        per_person_amount = expense.amount / len(group.users)
-        for user in group.users:
-            # The payer is owed money, everyone else owes money
-            split_amount = per_person_amount
-            if user.id == expense.paid_by:
-                split_amount = -1 * (expense.amount - per_person_amount)  # Negative amount means they're owed
-            
-            db_split = models.ExpenseSplit(
-                expense_id=db_expense.id,
-                user_id=user.id,
-                amount=split_amount
-            )
-            db.add(db_split)
+    Raises IdempotencyKeyMismatch if the key was used for a different request.
+    An expired key is deleted (not committed) so the key can be stored again.
+    """
+    row = db.get(models.IdempotencyKey, key)
+    if row is None:
+        return None
+    if row.created_at < idempotency.retention_cutoff():
+        db.delete(row)
+        db.flush()
+        return None
+    if row.request_hash != request_hash:
+        raise idempotency.IdempotencyKeyMismatch("Idempotency-Key was already used for a different request")
+    return json.loads(row.response_body)
+
+def purge_idempotency_keys(db: Session):
+    """Delete idempotency keys older than the retention window (not committed); returns the count."""
+    result = db.execute(
+        delete(models.IdempotencyKey).where(models.IdempotencyKey.created_at < idempotency.retention_cutoff())
+    )
+    return result.rowcount
+
+def create_expense_idempotent(db: Session, expense: schemas.ExpenseCreate, group_id: int, key: str):
+    """
+    create_expense keyed by an Idempotency-Key; returns (response dict, replayed).
     
-    elif expense.split_type == "percentage":
-        # Percentage split
-        if not expense.splits:
-            raise ValueError("Percentage splits are required for percentage split type")
-            
-        total_percentage = sum(float(percentage) for percentage in expense.splits.values())
-        if not math.isclose(total_percentage, 100.0, rel_tol=1e-5):
-            raise ValueError(f"Split percentages must sum to 100%, got {total_percentage}%")
+    A retry of the same request gets the stored response of the first one and
+    creates nothing. The key is stored in the same transaction as the expense,
+    so when two requests with one key race, the loser's commit fails on the
+    primary key and it answers with the winner's response.
+    """
+    request_hash = idempotency.request_hash(group_id, expense.model_dump(mode="json"))
+    stored = get_idempotent_response(db, key, request_hash)
+    if stored is not None:
+        return stored, True
+    
+    try:
+        db_expense, event = _add_expense(db, expense, group_id)
+        response = event["expense"]
+        db.add(models.IdempotencyKey(
+            key=key, request_hash=request_hash, response_body=json.dumps(response), created_at=datetime.utcnow()
+        ))
+        if idempotency.purge_schedule.due():
+            purge_idempotency_keys(db)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        stored = get_idempotent_response(db, key, request_hash)
+        if stored is None:
+            raise
+        return stored, True
+    balance_cache.invalidate_group(group_id)
+    change_feed.publish(event)
+    return response, False
+
+def create_expenses_bulk(db: Session, expenses: List[schemas.ExpenseCreate], group_id: int):
+    """
+    Validate and insert many expenses of a group in a single transaction.
+    
+    Every item is checked against one preloaded member set and the group's
+    currency; invalid items are reported by index in `errors` and the valid ones are still inserted.
+    Expenses and splits go in with one executemany INSERT each.
+    """
+    group = get_group(db, group_id)
+    if not group:
+        raise ValueError("Group not found")
+    
+    member_ids = [
+        row.user_id for row in db.query(models.group_users.c.user_id).filter(
+            models.group_users.c.group_id == group_id
+        ).order_by(models.group_users.c.user_id)
+    ]
+    
+    created_at = datetime.utcnow()
+    group_currency = _group_currency(db, group_id)
+    expense_rows = []
+    expense_splits = []
+    errors = []
+    for index, expense in enumerate(expenses):
+        currency = expense.currency or money.DEFAULT_CURRENCY
+        try:
+            splits = build_splits(expense, member_ids)
+            _check_currency(currency, group_currency)
+        except ValueError as e:
+            errors.append({"index": index, "detail": str(e)})
+            continue
+        # The first valid item sets the currency of a group without expenses
+        group_currency = currency
         
-        # Calculate split amounts based on percentages
-        for user_id_str, percentage in expense.splits.items():
-            user_id = int(user_id_str)
-            amount = (float(percentage) / 100) * expense.amount
-            
-            # Payer is owed money, everyone else owes money
-            if user_id == expense.paid_by:
-                amount = -1 * (expense.amount - amount)  # Negative means they're owed
-                
-            db_split = models.ExpenseSplit(
-                expense_id=db_expense.id,
-                user_id=user_id,
-                amount=amount
-            )
-            db.add(db_split)
+        expense_rows.append({
+            "description": expense.description,
+            "amount_cents": money.to_cents(expense.amount),
+            "currency": currency,
+            "paid_by": expense.paid_by,
+            "group_id": group_id,
+            "split_type": expense.split_type,
+            "created_at": created_at
+        })
+        expense_splits.append(splits)
+    
+    if not expense_rows:
+        return {"created": [], "errors": errors}
+    
+    # RETURNING in parameter order pairs every generated id with its input row
+    expense_ids = db.execute(
+        insert(models.Expense).returning(models.Expense.id, sort_by_parameter_order=True),
+        expense_rows
+    ).scalars().all()
     
+    split_rows = []
+    balance_deltas = {}
+    for expense_id, splits in zip(expense_ids, expense_splits):
+        for user_id, amount_cents in splits.items():
+            split_rows.append({
+                "expense_id": expense_id, "group_id": group_id, "user_id": user_id, "amount_cents": amount_cents
+            })
+            balance_deltas[user_id] = balance_deltas.get(user_id, 0) + amount_cents
+    db.execute(insert(models.ExpenseSplit), split_rows)
+    
+    apply_balance_deltas(db, group_id, balance_deltas)
+    apply_summary_deltas(db, group_id, [
+        (row["paid_by"], row["amount_cents"], created_at, splits)
+        for row, splits in zip(expense_rows, expense_splits)
+    ])
+    # One event for the whole batch, so imports do not flood subscribers
+    event = record_group_event(db, group_id, "expenses_imported", None, balance_deltas, expense_count=len(expense_ids))
     db.commit()
+    balance_cache.invalidate_group(group_id)
+    change_feed.publish(event)
+    
+    created = [
+        dict(row, id=expense_id) for expense_id, row in zip(expense_ids, expense_rows)
+    ]
+    return {"created": created, "errors": errors}
+
+EXPENSE_COLUMNS = (
+    models.Expense.id,
+    models.Expense.description,
+    models.Expense.amount_cents,
+    models.Expense.currency,
+    models.Expense.paid_by,
+    models.Expense.split_type,
+    models.Expense.group_id,
+    models.Expense.created_at
+)
+
+def get_expenses_by_group(db: Session, group_id: int, limit: int = None, after_id: int = None):
+    # Served by the (group_id, id) index on expenses
+    query = select(*EXPENSE_COLUMNS).where(
+        models.Expense.group_id == group_id, models.Expense.deleted_at.is_(None)
+    ).order_by(models.Expense.id)
+    if after_id is not None:
+        query = query.where(models.Expense.id > after_id)
+    if limit is not None:
+        query = query.limit(limit)
+    return fetch_rows(db, query)
+
+def stream_expenses_by_group(db: Session, group_id: int, batch_size: int = 1000, with_splits: bool = False):
+    """
+    Yield a group's expenses as plain row mappings, ordered by id.
+    
+    Uses a server-side cursor (yield_per implies stream_results) so only
+    `batch_size` rows are held in memory at a time. With `with_splits`, each
+    row also gets `splits`: its [(user_id, amount_cents)] in split row order,
+    loaded with one query per batch.
+    """
+    result = db.execute(
+        select(*EXPENSE_COLUMNS).where(
+            models.Expense.group_id == group_id, models.Expense.deleted_at.is_(None)
+        ).order_by(models.Expense.id).execution_options(yield_per=batch_size)
+    )
+    for rows in result.mappings().partitions():
+        if not with_splits:
+            yield from rows
+            continue
+        splits = defaultdict(list)
+        for expense_id, user_id, amount_cents in db.execute(
+            select(models.ExpenseSplit.expense_id, models.ExpenseSplit.user_id, models.ExpenseSplit.amount_cents)
+            .where(models.ExpenseSplit.expense_id.in_([row["id"] for row in rows]))
+            .order_by(models.ExpenseSplit.expense_id, models.ExpenseSplit.id)
+        ):
+            splits[expense_id].append((user_id, amount_cents))
+        for row in rows:
+            yield dict(row, splits=splits[row["id"]])
+
+def _get_active_expense(db: Session, group_id: int, expense_id: int):
+    """The group's expense, locked for update, or None if missing or deleted."""
+    return db.execute(
+        select(models.Expense).where(
+            models.Expense.id == expense_id,
+            models.Expense.group_id == group_id,
+            models.Expense.deleted_at.is_(None)
+        ).with_for_update()
+    ).scalar_one_or_none()
+
+def _load_splits(db: Session, expense_id: int):
+    """Split rows of an expense in insertion (participant) order."""
+    return db.query(models.ExpenseSplit).filter(
+        models.ExpenseSplit.expense_id == expense_id
+    ).order_by(models.ExpenseSplit.id).all()
+
+def update_expense(db: Session, group_id: int, expense_id: int, changes: schemas.ExpenseUpdate):
+    """
+    Apply a partial update to an expense and commit; None if it does not exist.
+    
+    Only a change of amount, payer, split type or splits recomputes the
+    splits. Split rows are then diffed against the stored ones: unchanged rows
+    are left alone, and the ledger and summaries get only the old-vs-new
+    deltas instead of a group recompute. Without new `splits` the expense
+    keeps its participants (members who joined later are not added), and a
+    percentage expense keeps their proportions. Raises ValueError if the new
+    values cannot be split.
+    """
+    db_expense = _get_active_expense(db, group_id, expense_id)
+    if db_expense is None:
+        return None
+    fields = changes.model_dump(exclude_unset=True)
+    
+    if fields.get("description") is not None:
+        db_expense.description = fields["description"]
+    if fields.get("currency") is not None and fields["currency"] != db_expense.currency:
+        _check_currency(fields["currency"], _group_currency(db, group_id, exclude_expense_id=expense_id))
+        db_expense.currency = fields["currency"]
+    
+    deltas = {}
+    if any(fields.get(name) is not None for name in ("amount", "paid_by", "split_type", "splits")):
+        rows = _load_splits(db, expense_id)
+        old_splits = {row.user_id: row.amount_cents for row in rows}
+        old_total, old_paid_by = db_expense.amount_cents, db_expense.paid_by
+        
+        total_cents = money.to_cents(fields["amount"]) if fields.get("amount") is not None else old_total
+        _check_amount(total_cents)
+        paid_by = fields.get("paid_by") or old_paid_by
+        split_type = fields.get("split_type") or db_expense.split_type
+        member_ids = [
+            row.user_id for row in db.query(models.group_users.c.user_id).filter(
+                models.group_users.c.group_id == group_id
+            ).order_by(models.group_users.c.user_id)
+        ]
+        
+        if fields.get("splits") is None and split_type in ("equal", db_expense.split_type):
+            # Keep the current participants: their shares in cents, without the
+            # payer's row unless the payer had a share of their own
+            if paid_by not in member_ids:
+                raise ValueError(f"Payer {paid_by} is not a member of this group")
+            shares = {
+                user_id: amount_cents + (old_total if user_id == old_paid_by else 0)
+                for user_id, amount_cents in old_splits.items()
+            }
+            shares = {
+                user_id: share for user_id, share in shares.items() if user_id != old_paid_by or share > 0
+            }
+            weights = list(shares.values()) if split_type == "percentage" else [1] * len(shares)
+            new_splits = _owed_splits(list(shares), money.allocate(total_cents, weights), paid_by, total_cents)
+        else:
+            new_splits = build_splits(schemas.ExpenseCreate(
+                description=db_expense.description,
+                amount=money.from_cents(total_cents),
+                paid_by=paid_by,
+                split_type=split_type,
+                splits=fields.get("splits")
+            ), member_ids)
+
+        # Rewrite only the split rows that changed
+        for row in rows:
+            if row.user_id not in new_splits:
+                db.delete(row)
+            elif row.amount_cents != new_splits[row.user_id]:
+                row.amount_cents = new_splits[row.user_id]
+        for user_id, amount_cents in new_splits.items():
+            if user_id not in old_splits:
+                db.add(models.ExpenseSplit(
+                    expense_id=expense_id, group_id=group_id, user_id=user_id, amount_cents=amount_cents
+                ))
+        
+        deltas = {
+            user_id: new_splits.get(user_id, 0) - old_splits.get(user_id, 0)
+            for user_id in set(old_splits) | set(new_splits)
+        }
+        deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+        apply_balance_deltas(db, group_id, deltas)
+        apply_summary_deltas(db, group_id, [(old_paid_by, old_total, db_expense.created_at, old_splits)], sign=-1)
+        apply_summary_deltas(db, group_id, [(paid_by, total_cents, db_expense.created_at, new_splits)])
+        _prune_payer_spend(db, group_id)
+        
+        db_expense.amount_cents = total_cents
+        db_expense.paid_by = paid_by
+        db_expense.split_type = split_type
+    
+    event = record_group_event(db, group_id, "expense_updated", expense_id, deltas, expense=_expense_json(db_expense))
+    db.commit()
+    balance_cache.invalidate_group(group_id)
+    change_feed.publish(event)
+    return db_expense
+
+def delete_expense(db: Session, group_id: int, expense_id: int):
+    """
+    Soft-delete an expense and commit; None if it does not exist.
+    
+    The expense row is kept with `deleted_at` set (compact_deleted_expenses
+    removes it later), its splits are deleted, and their amounts are taken
+    back out of the ledger and summaries.
+    """
+    db_expense = _get_active_expense(db, group_id, expense_id)
+    if db_expense is None:
+        return None
+    
+    splits = {row.user_id: row.amount_cents for row in _load_splits(db, expense_id)}
+    db.execute(delete(models.ExpenseSplit).where(models.ExpenseSplit.expense_id == expense_id))
+    apply_balance_deltas(db, group_id, {user_id: -amount_cents for user_id, amount_cents in splits.items()})
+    apply_summary_deltas(db, group_id, [
+        (db_expense.paid_by, db_expense.amount_cents, db_expense.created_at, splits)
+    ], sign=-1)
+    _prune_payer_spend(db, group_id)
+    db_expense.deleted_at = datetime.utcnow()
+    event = record_group_event(db, group_id, "expense_deleted", expense_id, {
+        user_id: -amount_cents for user_id, amount_cents in splits.items()
+    })
+    db.commit()
+    balance_cache.invalidate_group(group_id)
+    change_feed.publish(event)
     return db_expense
 
-def get_expenses_by_group(db: Session, group_id: int):
-    return db.query(models.Expense).filter(models.Expense.group_id == group_id).all()
+def compact_deleted_expenses(db: Session, deleted_before: datetime, batch_size: int = 1000, dry_run: bool = False):
+    """
+    Hard-delete expenses soft-deleted before `deleted_before`, committing per batch.
+    
+    Returns the number of expenses removed (or that would be, with dry_run).
+    """
+    expired = models.Expense.deleted_at < deleted_before
+    if dry_run:
+        return db.execute(select(func.count(models.Expense.id)).where(expired)).scalar()
+    
+    removed = 0
+    while True:
+        expense_ids = db.execute(select(models.Expense.id).where(expired).limit(batch_size)).scalars().all()
+        if not expense_ids:
+            return removed
+        # Deletes remove the splits already; this only guards against stragglers
+        db.execute(delete(models.ExpenseSplit).where(models.ExpenseSplit.expense_id.in_(expense_ids)))
+        db.execute(delete(models.Expense).where(models.Expense.id.in_(expense_ids)))
+        db.commit()
+        record_write()
+        removed += len(expense_ids)
+
+# Change feed
+def _event_dict(group_id: int, seq: int, event_type: str, expense_id, created_at, data: dict):
+    return {
+        "group_id": group_id,
+        "seq": seq,
+        "type": event_type,
+        "expense_id": expense_id,
+        "created_at": created_at.isoformat(),
+        **data
+    }
+
+def record_group_event(db: Session, group_id: int, event_type: str, expense_id, balance_deltas: dict, **data):
+    """
+    Append an event to the group's change feed and return it, without committing.
+    
+    The sequence number comes from incrementing groups.event_seq, which also
+    locks the group row until commit, so a group's events commit in sequence
+    order. Publish the returned event with change_feed.publish once committed.
+    """
+    seq = db.execute(
+        update(models.Group).where(models.Group.id == group_id)
+        .values(event_seq=models.Group.event_seq + 1).returning(models.Group.event_seq)
+    ).scalar_one()
+    data = {"balance_deltas": {str(user_id): cents for user_id, cents in balance_deltas.items()}, **data}
+    created_at = datetime.utcnow()
+    db.add(models.GroupEvent(
+        group_id=group_id, seq=seq, type=event_type, expense_id=expense_id, data=data, created_at=created_at
+    ))
+    return _event_dict(group_id, seq, event_type, expense_id, created_at, data)
+
+def get_group_event_seq(db: Session, group_id: int):
+    """Sequence number of the group's latest event (0 if none), or None if the group does not exist."""
+    return db.execute(select(models.Group.event_seq).where(models.Group.id == group_id)).scalar_one_or_none()
+
+def get_group_events(db: Session, group_id: int, after_seq: int = 0, limit: int = 500):
+    """The group's events with seq > after_seq, oldest first (a range scan of the primary key)."""
+    rows = db.execute(
+        select(models.GroupEvent).where(
+            models.GroupEvent.group_id == group_id, models.GroupEvent.seq > after_seq
+        ).order_by(models.GroupEvent.seq).limit(limit)
+    ).scalars()
+    return [
+        _event_dict(row.group_id, row.seq, row.type, row.expense_id, row.created_at, row.data) for row in rows
+    ]
+
+def compact_group_events(db: Session, created_before: datetime, dry_run: bool = False):
+    """Delete change feed events older than `created_before` and commit; returns the count."""
+    expired = models.GroupEvent.created_at < created_before
+    if dry_run:
+        return db.execute(select(func.count()).select_from(models.GroupEvent).where(expired)).scalar()
+    removed = db.execute(delete(models.GroupEvent).where(expired)).rowcount
+    db.commit()
+    record_write()
+    return removed
+
+# Balance ledger
+def upsert_increment(db: Session, model, key_columns, rows):
+    """
+    Insert rows of a counter table, adding the non-key columns onto existing rows.
+    
+    Runs as a single upsert where the dialect supports one and does not commit.
+    Rows are written in key order, so concurrent transactions lock shared
+    rows in the same order instead of deadlocking on each other.
+    """
+    if not rows:
+        return
+    rows = sorted(rows, key=lambda values: tuple(values[key] for key in key_columns))
+    
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        stmt = postgresql.insert(model).values(rows)
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(model).values(rows)
+    else:
+        # No native upsert: fall back to read-modify-write through the ORM
+        for values in rows:
+            row = db.get(model, tuple(values[key] for key in key_columns))
+            if row is None:
+                db.add(model(**values))
+            else:
+                for column, amount in values.items():
+                    if column not in key_columns:
+                        setattr(row, column, getattr(row, column) + amount)
+        return
+    
+    increments = [column for column in rows[0] if column not in key_columns]
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(key_columns),
+        set_={column: getattr(model, column) + getattr(stmt.excluded, column) for column in increments}
+    )
+    db.execute(stmt)
+
+def apply_balance_deltas(db: Session, group_id: int, deltas: dict):
+    """
+    Add per-user split amounts (cents) to the group's balance ledger.
+    
+    Runs as a single upsert and does not commit, so callers can apply it in the
+    same transaction as the splits it accounts for.
+    """
+    upsert_increment(db, models.GroupUserBalance, ("group_id", "user_id"), [
+        {"group_id": group_id, "user_id": user_id, "balance_cents": amount_cents}
+        for user_id, amount_cents in deltas.items()
+    ])
+
+def expense_period(created_at):
+    """Calendar month bucket (UTC) used by the payer spend summary."""
+    return created_at.strftime("%Y-%m")
+
+def apply_summary_deltas(db: Session, group_id: int, expenses, sign: int = 1):
+    """
+    Fold newly written expenses of a group into the analytics summary tables.
+    
+    `expenses` holds (paid_by, amount_cents, created_at, splits) tuples, with
+    splits as returned by build_splits; `sign=-1` takes them back out (edits
+    and deletes). Like apply_balance_deltas this does not commit, so the
+    summaries change in the same transaction as the facts.
+    """
+    if not expenses:
+        return
+    
+    user_rows = {}
+    period_rows = {}
+    for paid_by, amount_cents, created_at, splits in expenses:
+        for user_id, split_cents in splits.items():
+            row = user_rows.setdefault(user_id, {"user_id": user_id, "paid_cents": 0, "balance_cents": 0})
+            row["balance_cents"] += sign * split_cents
+        payer = user_rows.setdefault(paid_by, {"user_id": paid_by, "paid_cents": 0, "balance_cents": 0})
+        payer["paid_cents"] += sign * amount_cents
+        
+        period = expense_period(created_at)
+        row = period_rows.setdefault((paid_by, period), {
+            "user_id": paid_by, "group_id": group_id, "period": period,
+            "expense_count": 0, "total_cents": 0
+        })
+        row["expense_count"] += sign
+        row["total_cents"] += sign * amount_cents
+    
+    upsert_increment(db, models.GroupSummary, ("group_id",), [{
+        "group_id": group_id,
+        "expense_count": sign * len(expenses),
+        "total_cents": sign * sum(expense[1] for expense in expenses)
+    }])
+    upsert_increment(db, models.UserSummary, ("user_id",), list(user_rows.values()))
+    upsert_increment(db, models.PayerPeriodSpend, ("user_id", "group_id", "period"), list(period_rows.values()))
+
+def _prune_payer_spend(db: Session, group_id: int):
+    """Drop payer/period rows of a group that edits or deletes emptied, as a rebuild would not have them."""
+    db.execute(delete(models.PayerPeriodSpend).where(
+        models.PayerPeriodSpend.group_id == group_id, models.PayerPeriodSpend.expense_count == 0
+    ))
+
+def _period_column(db: Session, column):
+    if db.get_bind().dialect.name == "postgresql":
+        return func.to_char(column, "YYYY-MM")
+    return func.strftime("%Y-%m", column)
+
+def rebuild_summaries(db: Session):
+    """Re-derive every analytics summary table from expenses and expense_splits, and commit."""
+    for model in (models.GroupSummary, models.UserSummary, models.PayerPeriodSpend):
+        db.query(model).delete()
+    
+    expenses = models.Expense
+    active = expenses.deleted_at.is_(None)
+    db.execute(insert(models.GroupSummary).from_select(
+        ["group_id", "expense_count", "total_cents"],
+        select(expenses.group_id, func.count(expenses.id), func.sum(expenses.amount_cents))
+        .where(expenses.group_id.is_not(None), active).group_by(expenses.group_id)
+    ))
+    
+    period = _period_column(db, expenses.created_at)
+    db.execute(insert(models.PayerPeriodSpend).from_select(
+        ["user_id", "group_id", "period", "expense_count", "total_cents"],
+        select(expenses.paid_by, expenses.group_id, period, func.count(expenses.id), func.sum(expenses.amount_cents))
+        .where(expenses.paid_by.is_not(None), expenses.group_id.is_not(None), active)
+        .group_by(expenses.paid_by, expenses.group_id, period)
+    ))
+    
+    paid = {
+        row.paid_by: row.paid_cents for row in db.execute(
+            select(expenses.paid_by, func.sum(expenses.amount_cents).label("paid_cents"))
+            .where(expenses.paid_by.is_not(None), active).group_by(expenses.paid_by)
+        )
+    }
+    balances = {
+        row.user_id: row.balance_cents for row in db.execute(
+            select(models.ExpenseSplit.user_id, func.sum(models.ExpenseSplit.amount_cents).label("balance_cents"))
+            .group_by(models.ExpenseSplit.user_id)
+        )
+    }
+    user_rows = [
+        {"user_id": user_id, "paid_cents": paid.get(user_id, 0), "balance_cents": balances.get(user_id, 0)}
+        for user_id in sorted(set(paid) | set(balances))
+    ]
+    if user_rows:
+        db.execute(insert(models.UserSummary), user_rows)
+    db.commit()
+    record_write()
+
+# Analytics reads: small primary-key lookups on the summary tables
+def get_group_summaries(db: Session, group_id: int = None):
+    query = select(
+        models.Group.id.label("group_id"),
+        models.Group.name.label("group_name"),
+        func.coalesce(models.GroupSummary.expense_count, 0).label("expense_count"),
+        func.coalesce(models.GroupSummary.total_cents, 0).label("total_cents")
+    ).outerjoin(models.GroupSummary, models.GroupSummary.group_id == models.Group.id).order_by(models.Group.id)
+    if group_id is not None:
+        query = query.where(models.Group.id == group_id)
+    return fetch_rows(db, query)
+
+def get_user_position(db: Session, user_id: int):
+    row = db.execute(
+        select(
+            models.User.id.label("user_id"),
+            models.User.username,
+            func.coalesce(models.UserSummary.paid_cents, 0).label("paid_cents"),
+            func.coalesce(models.UserSummary.balance_cents, 0).label("balance_cents")
+        ).outerjoin(models.UserSummary, models.UserSummary.user_id == models.User.id)
+        .where(models.User.id == user_id)
+    ).mappings().first()
+    if row is None:
+        return None
+    position = dict(row)
+    # What the user consumed: their share of every split, i.e. paid + net balance
+    position["share_cents"] = position["paid_cents"] + position["balance_cents"]
+    return position
+
+def get_payer_spend(db: Session, group_id: int = None, user_id: int = None,
+                    period_from: str = None, period_to: str = None):
+    spend = models.PayerPeriodSpend
+    query = select(
+        spend.user_id, spend.group_id, spend.period, spend.expense_count, spend.total_cents
+    ).order_by(spend.period, spend.group_id, spend.user_id)
+    if group_id is not None:
+        query = query.where(spend.group_id == group_id)
+    if user_id is not None:
+        query = query.where(spend.user_id == user_id)
+    if period_from:
+        query = query.where(spend.period >= period_from)
+    if period_to:
+        query = query.where(spend.period <= period_to)
+    return fetch_rows(db, query)
+
+def aggregate_split_balances(db: Session, group_id: int = None):
+    """Derive {(group_id, user_id): balance_cents} from expense_splits with an integer SUM."""
+    query = db.query(
+        models.ExpenseSplit.group_id, models.ExpenseSplit.user_id, func.sum(models.ExpenseSplit.amount_cents)
+    )
+    if group_id is not None:
+        query = query.filter(models.ExpenseSplit.group_id == group_id)
+    rows = query.group_by(models.ExpenseSplit.group_id, models.ExpenseSplit.user_id).all()
+    return {(row[0], row[1]): row[2] or 0 for row in rows}
 
 # Balance calculations
-def get_group_balances(db: Session, group_id: int):
+def get_net_balances(db: Session, group_ids):
+    """
+    Load the net balance of every member of the given groups in one query.
+    
+    Returns {group_id: {user_id: (balance_cents, username)}}. The ledger already
+    holds one pre-aggregated row per (group_id, user_id), so this is the
+    GROUP BY result without rescanning expense_splits. Groups found in the
+    balance cache are not queried at all.
+    """
+    net_balances = {}
+    missing_ids = []
+    for group_id in group_ids:
+        cached = balance_cache.get_group(group_id)
+        if cached is None:
+            missing_ids.append(group_id)
+        else:
+            net_balances[group_id] = cached
+    if not missing_ids:
+        return net_balances
+    
+    # Taken before the read: a write committed after it invalidates the group,
+    # and set_group then drops what this (possibly older) read returned
+    generations = {group_id: balance_cache.generation(group_id) for group_id in missing_ids}
+    loaded = {group_id: {} for group_id in missing_ids}
+    rows = db.query(
+        models.GroupUserBalance.group_id,
+        models.GroupUserBalance.user_id,
+        models.GroupUserBalance.balance_cents,
+        models.User.username
+    ).join(
+        models.User, models.GroupUserBalance.user_id == models.User.id
+    ).filter(models.GroupUserBalance.group_id.in_(missing_ids)).all()
+    
+    for row in rows:
+        loaded[row.group_id][row.user_id] = (row.balance_cents, row.username)
+    for group_id, group_balances in loaded.items():
+        balance_cache.set_group(group_id, group_balances, generations[group_id])
+    net_balances.update(loaded)
+    return net_balances
+
+def transfer_details(transfers, usernames: dict):
+    """Turn settlement (from_user_id, to_user_id, cents) tuples into BalanceDetail dicts."""
+    return [
+        {
+            "from_user_id": from_id,
+            "from_username": usernames[from_id],
+            "to_user_id": to_id,
+            "to_username": usernames[to_id],
+            "amount": money.from_cents(amount_cents)
+        }
+        for from_id, to_id, amount_cents in transfers
+    ]
+
+def settle_balances(net_balances: dict, strategy: str = "greedy"):
+    """Turn {user_id: (balance_cents, username)} into a list of who-owes-whom transfers."""
+    cents = {user_id: balance_cents for user_id, (balance_cents, _) in net_balances.items()}
+    usernames = {user_id: username for user_id, (_, username) in net_balances.items()}
+    return transfer_details(settlement.settle(cents, strategy), usernames)
+
+def get_group_balances(db: Session, group_id: int, strategy: str = "greedy"):
     group = get_group(db, group_id)
     if not group:
         return None
     
-    # Get all expense splits for this group
-    splits = db.query(models.ExpenseSplit).join(
-        models.Expense, models.ExpenseSplit.expense_id == models.Expense.id
-    ).filter(models.Expense.group_id == group_id).all()
-    
-    # Calculate net balance for each user
-    user_balances = {}
-    for split in splits:
-        user_id = split.user_id
-        if user_id not in user_balances:
-            user_balances[user_id] = 0
-        user_balances[user_id] += split.amount
-    
-    # Create balance details (who owes whom)
-    balance_details = []
-    users = {user.id: user for user in group.users}
-    
-    # Users with negative balances owe money, users with positive balances are owed money
-    debtors = [(user_id, -balance) for user_id, balance in user_balances.items() if balance < 0]
-    creditors = [(user_id, balance) for user_id, balance in user_balances.items() if balance > 0]
-    
-    # Sort by amount (descending)
-    debtors.sort(key=lambda x: x[1], reverse=True)
-    creditors.sort(key=lambda x: x[1], reverse=True)
-    
-    # Match debtors with creditors
-    i, j = 0, 0
-    while i < len(debtors) and j < len(creditors):
-        debtor_id, debt = debtors[i]
-        creditor_id, credit = creditors[j]
-        
-        amount = min(debt, credit)
-        if amount > 0.01:  # Ignore very small amounts
-            balance_details.append({
-                "from_user_id": debtor_id,
-                "from_username": users[debtor_id].username,
-                "to_user_id": creditor_id,
-                "to_username": users[creditor_id].username,
-                "amount": amount
-            })
-        
-        # Update remaining amounts
-        debtors[i] = (debtor_id, debt - amount)
-        creditors[j] = (creditor_id, credit - amount)
-        
-        if math.isclose(debtors[i][1], 0, abs_tol=0.01):
-            i += 1
-        if math.isclose(creditors[j][1], 0, abs_tol=0.01):
-            j += 1
+    # Read the net balance of each member from the ledger
+    net_balances = get_net_balances(db, [group_id])[group_id]
     
     return {
         "group_id": group.id,
         "group_name": group.name,
-        "balances": balance_details
+        "balances": settle_balances(net_balances, strategy)
     }
 
-def get_user_balances(db: Session, user_id: int):
+def get_user_balances(db: Session, user_id: int, strategy: str = "greedy"):
     user = get_user(db, user_id)
     if not user:
         return None
     
-    # Get all user's groups
-    groups = user.groups
+    # Get all user's groups without hydrating Group objects
+    groups = db.query(models.Group.id, models.Group.name).join(
+        models.group_users, models.group_users.c.group_id == models.Group.id
+    ).filter(models.group_users.c.user_id == user_id).all()
+    
+    # One query for every group's balances, then settle each group in memory
+    net_balances_by_group = get_net_balances(db, [group.id for group in groups])
     
     balances_by_group = {}
     total_balance = 0
     
     for group in groups:
-        group_balances = get_group_balances(db, group.id)
-        if group_balances:
-            # Filter balances relevant to this user
-            user_balances = [
-                b for b in group_balances["balances"] 
-                if b["from_user_id"] == user_id or b["to_user_id"] == user_id
-            ]
+        group_balances = settle_balances(net_balances_by_group[group.id], strategy)
+        
+        # Filter balances relevant to this user
+        user_balances = [
+            b for b in group_balances
+            if b["from_user_id"] == user_id or b["to_user_id"] == user_id
+        ]
+        
+        if user_balances:
+            balances_by_group[group.name] = user_balances
             
-            if user_balances:
-                balances_by_group[group.name] = user_balances
-                
-                # Calculate impact on user's total balance
-                for balance in user_balances:
-                    if balance["from_user_id"] == user_id:
-                        # User owes money
-                        total_balance -= balance["amount"]
-                    else:
-                        # User is owed money
-                        total_balance += balance["amount"]
+            # Calculate impact on user's total balance
+            for balance in user_balances:
+                if balance["from_user_id"] == user_id:
+                    # User owes money
+                    total_balance -= balance["amount"]
+                else:
+                    # User is owed money
+                    total_balance += balance["amount"]
     
     return {
         "user_id": user.id,
         "username": user.username,
         "balances_by_group": balances_by_group,
         "total_balance": total_balance
-    }
\ No newline at end of file
+    }
+
+def get_user_group_ids(db: Session, user_id: int):
+    return [
+        row.group_id for row in db.query(models.group_users.c.group_id).filter(
+            models.group_users.c.user_id == user_id
+        ).order_by(models.group_users.c.group_id)
+    ]
+
+def simplify_debts(db: Session, group_ids, strategy: str = "greedy"):
+    """
+    Settle several groups together instead of one by one.
+    
+    Each group's own plan is computed from the ledger (one query for all
+    groups, cache permitting), then the combined debt graph is collapsed with
+    settlement.simplify: A owing B in one group and B owing A in another
+    cancel out, and chains collapse into direct transfers. Members can end up
+    paying someone they share no group with; every member's net position
+    over the groups is unchanged.
+    
+    Returns None if any of the groups does not exist; raises ValueError for
+    an empty list or repeated ids.
+    """
+    if not group_ids:
+        raise ValueError("At least one group id is required")
+    if len(set(group_ids)) != len(group_ids):
+        raise ValueError("Group ids must not repeat")
+    found = db.query(func.count(models.Group.id)).filter(models.Group.id.in_(group_ids)).scalar()
+    if found != len(group_ids):
+        return None
+    return _simplify_debts(db, group_ids, strategy)
+
+def _simplify_debts(db: Session, group_ids, strategy: str):
+    net_balances_by_group = get_net_balances(db, group_ids)
+    usernames = {}
+    per_group = []
+    for group_balances in net_balances_by_group.values():
+        usernames.update((user_id, username) for user_id, (_, username) in group_balances.items())
+        per_group.extend(settlement.settle(
+            {user_id: balance_cents for user_id, (balance_cents, _) in group_balances.items()}, strategy
+        ))
+    return {
+        "group_ids": sorted(net_balances_by_group),
+        "transfers_before": len(per_group),
+        "transfers": transfer_details(settlement.simplify(per_group, strategy), usernames)
+    }
+
+def get_user_simplified_balances(db: Session, user_id: int, strategy: str = "greedy", group_ids=None):
+    """
+    The transfers a user is part of after simplifying debts across all their
+    groups (or the given subset of them), and their resulting net total.
+    """
+    user = get_user(db, user_id)
+    if not user:
+        return None
+    
+    user_group_ids = get_user_group_ids(db, user_id)
+    if group_ids:
+        wanted = set(group_ids)
+        user_group_ids = [group_id for group_id in user_group_ids if group_id in wanted]
+    # The user's own groups, so they exist and may be empty
+    simplified = _simplify_debts(db, user_group_ids, strategy)
+    
+    balances = [
+        transfer for transfer in simplified["transfers"]
+        if transfer["from_user_id"] == user_id or transfer["to_user_id"] == user_id
+    ]
+    total_balance = sum(
+        -transfer["amount"] if transfer["from_user_id"] == user_id else transfer["amount"]
+        for transfer in balances
+    )
+    return {
+        "user_id": user.id,
+        "username": user.username,
+        "group_ids": simplified["group_ids"],
+        "transfers_before": simplified["transfers_before"],
+        "transfers_after": len(simplified["transfers"]),
+        "balances": balances,
+        "total_balance": total_balance
+    }
@@ -0,0 +1,136 @@
+"""
+CSV and NDJSON (de)serialization of expenses for streaming import/export.
+
+Everything here works on iterators so neither side ever holds a whole
+group's expenses in memory.
+"""
+import csv
+import io
+import json
+from itertools import islice
+from pydantic import ValidationError
+from app import schemas, money
+
+FORMATS = ("csv", "ndjson")
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+EXPORT_FIELDS = ["id", "description", "amount", "currency", "paid_by", "split_type", "group_id", "splits"]
+
+
+def guess_format(filename: str):
+    """Pick the format from a file extension, or None if it is not recognised."""
+    extension = (filename or "").rsplit(".", 1)[-1].lower()
+    if extension in ("json", "jsonl"):
+        return "ndjson"
+    return extension if extension in FORMATS else None
+
+
+def _export_splits(row):
+    """
+    Each participant's share as a percentage of the amount, in the shape
+    `splits` is imported in.
+
+    Percentages are exact enough for the largest-remainder allocation to give
+    back the same cents. Larger shares come first: an equal split hands its
+    leftover cents to the first participants, so the same people get them
+    again on import.
+    """
+    total_cents = row["amount_cents"]
+    shares = [
+        (user_id, amount_cents + (total_cents if user_id == row["paid_by"] else 0))
+        for user_id, amount_cents in row["splits"]
+    ]
+    shares.sort(key=lambda share: share[1], reverse=True)
+    return {str(user_id): share * 100 / total_cents for user_id, share in shares}
+
+
+def _export_record(row):
+    # Amounts leave as exact decimal strings, so re-importing them is lossless
+    record = {field: row[field] for field in EXPORT_FIELDS if field not in ("amount", "splits")}
+    record["amount"] = money.format_cents(row["amount_cents"])
+    record["splits"] = _export_splits(row)
+    return record
+
+
+def encode_csv(rows, chunk_size: int = 1000):
+    """Yield CSV text for `rows` (mappings), flushing every `chunk_size` rows."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    for count, row in enumerate(rows, start=1):
+        record = _export_record(row)
+        record["splits"] = json.dumps(record["splits"])
+        writer.writerow(record)
+        if count % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def encode_ndjson(rows, chunk_size: int = 1000):
+    """Yield one JSON object per line for `rows` (mappings)."""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(_export_record(row)))
+        if len(lines) == chunk_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+ENCODERS = {"csv": encode_csv, "ndjson": encode_ndjson}
+
+
+def _parse_record(raw, format: str):
+    if format == "csv":
+        # Splits travel as a JSON object in a single CSV column
+        record = dict(raw)
+        splits = record.get("splits")
+        record["splits"] = json.loads(splits) if splits else None
+        return record
+    return json.loads(raw)
+
+
+def read_expenses(stream, format: str):
+    """
+    Parse an uploaded binary stream record by record.
+
+    Yields (index, ExpenseCreate) for valid records and (index, error message)
+    for records that fail to parse, so one bad line does not stop the import.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    if format == "csv":
+        raw_records = csv.DictReader(text)
+    else:
+        raw_records = (line for line in text if line.strip())
+
+    index = 0
+    while True:
+        try:
+            raw = next(raw_records)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            # The csv reader carries on with the next line after an error
+            yield index, f"Could not parse record: {e}"
+            index += 1
+            continue
+
+        try:
+            yield index, schemas.ExpenseCreate.model_validate(_parse_record(raw, format))
+        except ValidationError as e:
+            yield index, f"Invalid expense: {e.errors()[0]['msg']}"
+        except ValueError as e:
+            yield index, f"Could not parse record: {e}"
+        index += 1
+
+
+def chunked(iterable, size: int):
+    """Yield lists of at most `size` items from `iterable`."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
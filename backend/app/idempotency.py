@@ -0,0 +1,60 @@
+"""
+Idempotency keys for expense creation.
+
+A client that may retry `POST /groups/{group_id}/expenses` sends an
+`Idempotency-Key` header. The first request stores the key, a hash of the
+request and the response in `idempotency_keys`, in the same transaction as
+the expense and its splits; a retry with the same key and request is
+answered from the stored response without creating anything. Reusing a key
+for a different request is rejected.
+
+Keys are kept for IDEMPOTENCY_KEY_RETENTION_HOURS: older keys are ignored
+and deleted by crud.purge_idempotency_keys, which the write path runs at
+most every IDEMPOTENCY_PURGE_INTERVAL_SECONDS per process.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+IDEMPOTENCY_KEY_RETENTION_HOURS = float(os.getenv("IDEMPOTENCY_KEY_RETENTION_HOURS", "24"))
+IDEMPOTENCY_PURGE_INTERVAL_SECONDS = float(os.getenv("IDEMPOTENCY_PURGE_INTERVAL_SECONDS", "300"))
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+
+class IdempotencyKeyMismatch(ValueError):
+    """The key was already used for a different request."""
+
+
+def request_hash(group_id: int, payload: dict) -> str:
+    """sha256 of the request, independent of JSON key order."""
+    canonical = json.dumps({"group_id": group_id, "body": payload}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def retention_cutoff(now: datetime = None) -> datetime:
+    """Keys created before this (UTC) have expired."""
+    return (now or datetime.utcnow()) - timedelta(hours=IDEMPOTENCY_KEY_RETENTION_HOURS)
+
+
+class PurgeSchedule:
+    """Lets one caller per interval through, so expired keys are purged in the background of writes."""
+
+    def __init__(self, interval: float = IDEMPOTENCY_PURGE_INTERVAL_SECONDS, clock=time.monotonic):
+        self.interval = interval
+        self.clock = clock
+        self._next_run = 0.0
+        self._lock = threading.Lock()
+
+    def due(self) -> bool:
+        now = self.clock()
+        with self._lock:
+            if now < self._next_run:
+                return False
+            self._next_run = now + self.interval
+            return True
+
+
+purge_schedule = PurgeSchedule()
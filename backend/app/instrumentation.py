@@ -0,0 +1,218 @@
+"""
+Per-request SQL instrumentation and Prometheus metrics.
+
+SQLAlchemy cursor events count every statement and its duration into the
+RequestStats of the current request (a context variable set by
+QueryStatsMiddleware, which reaches the async session's greenlets and the
+threadpool). The middleware then:
+
+- adds a `Server-Timing` header with the DB time, query count and total time,
+- records per-route histograms of latency, queries and DB time, served in
+  Prometheus text format by `render_metrics()` (GET /metrics).
+
+Statements slower than SLOW_QUERY_MS are logged to the `app.slow_query`
+logger together with a fingerprint: the statement with literals and IN lists
+normalized, so repeats of the same query shape share one id.
+"""
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))  # 0 disables the slow-query log
+
+slow_query_logger = logging.getLogger("app.slow_query")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+
+class RequestStats:
+    """SQL statements issued while serving one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+_current_stats: ContextVar = ContextVar("request_stats", default=None)
+
+
+# Statement fingerprints
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PARAMETERS = re.compile(r"%\(\w+\)s|%s|\$\d+|:\w+|\?")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,?)+\)", re.I)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str):
+    """Return (id, normalized statement): literals and bind parameters become '?'."""
+    normalized = _LITERALS.sub("?", _PARAMETERS.sub("?", statement))
+    normalized = _IN_LIST.sub("IN (...)", normalized)
+    normalized = _WHITESPACE.sub(" ", normalized).strip()
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12], normalized
+
+
+# SQLAlchemy hooks, registered on the Engine class so every engine (sync,
+# async and the chat pool) is covered
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    _record_query(statement, elapsed)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started"):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        _record_query(exception_context.statement or "", elapsed)
+
+
+def _record_query(statement: str, elapsed: float):
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+    if SLOW_QUERY_MS > 0 and elapsed * 1000 >= SLOW_QUERY_MS:
+        fingerprint_id, normalized = fingerprint(statement)
+        metrics.count_slow_query(fingerprint_id)
+        slow_query_logger.warning(
+            "slow query %s took %.1fms: %s", fingerprint_id, elapsed * 1000, normalized
+        )
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+
+
+def _labels(**labels):
+    return ",".join(f'{name}="{value}"' for name, value in labels.items())
+
+
+class Metrics:
+    """In-process request metrics, rendered in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}  # (method, route, status) -> count
+        self.latency = {}  # (method, route) -> Histogram of seconds
+        self.queries = {}  # (method, route) -> Histogram of statements per request
+        self.db_time = {}  # (method, route) -> Histogram of seconds
+        self.slow_queries = {}  # fingerprint -> count
+
+    def observe_request(self, method: str, route: str, status: int, stats: RequestStats, elapsed: float):
+        key = (method, route)
+        with self._lock:
+            self.requests[key + (status,)] = self.requests.get(key + (status,), 0) + 1
+            self.latency.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(elapsed)
+            self.queries.setdefault(key, Histogram(QUERY_COUNT_BUCKETS)).observe(stats.queries)
+            self.db_time.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(stats.db_seconds)
+
+    def count_slow_query(self, fingerprint_id: str):
+        with self._lock:
+            self.slow_queries[fingerprint_id] = self.slow_queries.get(fingerprint_id, 0) + 1
+
+    @staticmethod
+    def _render_histograms(lines, name, help_text, histograms):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for (method, route), histogram in sorted(histograms.items()):
+            labels = _labels(method=method, route=route)
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+    def render(self):
+        lines = [
+            "# HELP http_requests_total Requests served, by route and status code.",
+            "# TYPE http_requests_total counter",
+        ]
+        with self._lock:
+            for (method, route, status), count in sorted(self.requests.items()):
+                lines.append(f"http_requests_total{{{_labels(method=method, route=route, status=status)}}} {count}")
+            self._render_histograms(lines, "http_request_duration_seconds",
+                                    "Request latency in seconds.", self.latency)
+            self._render_histograms(lines, "db_queries_per_request",
+                                    "SQL statements issued per request.", self.queries)
+            self._render_histograms(lines, "db_time_per_request_seconds",
+                                    "Time spent in SQL statements per request.", self.db_time)
+            lines.append("# HELP db_slow_queries_total Statements slower than SLOW_QUERY_MS, by fingerprint.")
+            lines.append("# TYPE db_slow_queries_total counter")
+            for fingerprint_id, count in sorted(self.slow_queries.items()):
+                lines.append(f'db_slow_queries_total{{fingerprint="{fingerprint_id}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def render_metrics():
+    return metrics.render()
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware: per-request query stats, Server-Timing header and route metrics."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                total_ms = (time.perf_counter() - stats.started) * 1000
+                server_timing = (
+                    f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries", '
+                    f"app;dur={total_ms:.1f}"
+                )
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", server_timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            # FastAPI stores the matched route in the scope; unmatched paths share
+            # one label so 404s cannot blow up the metric cardinality
+            route = scope.get("route")
+            metrics.observe_request(
+                scope["method"], getattr(route, "path", "unmatched"), status, stats,
+                time.perf_counter() - stats.started
+            )
@@ -0,0 +1,95 @@
+"""
+Verify or rebuild the group_user_balances ledger from expense_splits.
+
+Usage (from the backend directory):
+    python -m app.ledger                 # report drift only
+    python -m app.ledger --group 3       # check a single group
+    python -m app.ledger --rebuild       # rewrite drifted rows from expense_splits
+    python -m app.ledger --engine numpy  # sum expense_splits with app.vectorized instead of SQL
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy.orm import Session
+from app import crud, models, vectorized
+from app.cache import balance_cache
+from app.database import SessionLocal
+
+
+ENGINES = ("sql", "numpy")
+
+
+def expected_balances(db: Session, group_id: int = None, engine: str = "sql"):
+    """{(group_id, user_id): balance_cents} re-derived from expense_splits by the database or by NumPy."""
+    if engine == "numpy":
+        _, group_ids, user_ids, amounts = vectorized.load_splits(db, group_id)
+        return vectorized.net_balances_dict(group_ids, user_ids, amounts)
+    return crud.aggregate_split_balances(db, group_id)
+
+
+def find_drift(db: Session, group_id: int = None, engine: str = "sql"):
+    """
+    Compare the ledger with balances re-derived from expense_splits.
+
+    Returns a list of (group_id, user_id, ledger_cents, expected_cents)
+    for every row that disagrees, including rows missing on either side.
+    """
+    expected = expected_balances(db, group_id, engine)
+
+    query = db.query(models.GroupUserBalance)
+    if group_id is not None:
+        query = query.filter(models.GroupUserBalance.group_id == group_id)
+    actual = {(row.group_id, row.user_id): row.balance_cents for row in query.all()}
+
+    drift = []
+    for key in sorted(set(expected) | set(actual)):
+        ledger_balance = actual.get(key, 0)
+        expected_balance = expected.get(key, 0)
+        if ledger_balance != expected_balance:
+            drift.append((key[0], key[1], ledger_balance, expected_balance))
+    return drift
+
+
+def rebuild(db: Session, group_id: int = None, engine: str = "sql"):
+    """Rewrite the ledger rows that drifted from expense_splits and commit."""
+    drift = find_drift(db, group_id, engine)
+    for drift_group_id, user_id, _, expected_balance in drift:
+        row = db.get(models.GroupUserBalance, (drift_group_id, user_id))
+        if row is None:
+            db.add(models.GroupUserBalance(
+                group_id=drift_group_id, user_id=user_id, balance_cents=expected_balance
+            ))
+        else:
+            row.balance_cents = expected_balance
+    db.commit()
+    for drift_group_id in {row[0] for row in drift}:
+        balance_cache.invalidate_group(drift_group_id)
+    return drift
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--group", type=int, help="Only check this group id")
+    parser.add_argument("--rebuild", action="store_true", help="Fix drifted rows")
+    parser.add_argument("--engine", choices=ENGINES, default="sql",
+                        help="Sum expense_splits in the database (sql) or in NumPy arrays (numpy)")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        drift = rebuild(db, args.group, args.engine) if args.rebuild else find_drift(db, args.group, args.engine)
+    finally:
+        db.close()
+
+    for group_id, user_id, ledger_balance, expected_balance in drift:
+        print(f"group={group_id} user={user_id} ledger={ledger_balance} expected={expected_balance}")
+    action = "Rebuilt" if args.rebuild else "Found"
+    print(f"{action} {len(drift)} drifted ledger row(s)")
+    return 1 if drift and not args.rebuild else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,43 @@
 import os
 import sys
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 # Added the parent directory to the path so we can import the api module
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # Now we can import modules from the parent directory
-from app.database import Base, engine
-from api import groups, expenses, balances, users, chat
+from app import instrumentation, migrate
+from api import groups, expenses, balances, users, analytics, events
 
-app = FastAPI()
+# Apply pending migrations on startup. With several workers or replicas, set
+# DB_AUTO_MIGRATE=false and run `python -m app.migrate` once before deploying.
+DB_AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "true").lower() in ("1", "true", "yes")
 
-# Create the database tables
-Base.metadata.create_all(bind=engine)
+# The chat router is optional; workers that never serve chat can set
+# ENABLE_CHAT=false. CHAT_EAGER_INIT=true creates the LLM client and chat
+# database connection at startup instead of on the first question.
+ENABLE_CHAT = os.getenv("ENABLE_CHAT", "true").lower() in ("1", "true", "yes")
+CHAT_EAGER_INIT = os.getenv("CHAT_EAGER_INIT", "false").lower() in ("1", "true", "yes")
+
+# Per-request SQL counts/timings (Server-Timing header) and GET /metrics
+ENABLE_METRICS = os.getenv("ENABLE_METRICS", "true").lower() in ("1", "true", "yes")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if DB_AUTO_MIGRATE:
+        await run_in_threadpool(migrate.migrate_database)
+    if ENABLE_CHAT and CHAT_EAGER_INIT:
+        from chat import chatbot
+        await run_in_threadpool(chatbot.warm_up)
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -22,15 +46,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Keyset pagination cursor of list endpoints, DB timings, replayed idempotent responses
+    expose_headers=["X-Next-Cursor", "Server-Timing", "Idempotent-Replayed"],
 )
+if ENABLE_METRICS:
+    app.add_middleware(instrumentation.QueryStatsMiddleware)
 
 @app.get("/")
 async def read_root():
     return {"message": "Welcome to the FastAPI application!"}
 
+@app.get("/metrics", include_in_schema=False)
+async def read_metrics():
+    """Per-route request, SQL query and DB time histograms in Prometheus text format."""
+    return PlainTextResponse(instrumentation.render_metrics(), media_type="text/plain; version=0.0.4")
+
 # Include API routers
 app.include_router(users.router, prefix="/users", tags=["users"])
 app.include_router(groups.router, prefix="/groups", tags=["groups"])
 app.include_router(expenses.router, prefix="/groups/{group_id}/expenses", tags=["expenses"])
 app.include_router(balances.router, tags=["balances"])
-app.include_router(chat.router, prefix="/chat", tags=["chat"])  
\ No newline at end of file
+app.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
+app.include_router(events.router, tags=["events"])
+if ENABLE_CHAT:
+    from api import chat
+    app.include_router(chat.router, prefix="/chat", tags=["chat"])  
\ No newline at end of file
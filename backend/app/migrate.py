@@ -0,0 +1,160 @@
+"""
+Bring a database up to the current schema.
+
+Usage (from the backend directory):
+    python -m app.migrate
+
+The schema is managed by Alembic (see migrations/). Databases created by
+create_all before migrations existed are first converted by the legacy STEPS
+below; every step inspects the live schema and only runs if it is still
+needed, so the command is safe to run repeatedly. Whenever something changed,
+the balance ledger and analytics summaries are re-derived from expenses and
+expense_splits.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import inspect, text
+from app import crud, ledger
+from app.database import SessionLocal, engine
+from app.money import DEFAULT_CURRENCY
+
+ALEMBIC_INI = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'alembic.ini'))
+
+
+def _columns(conn, table: str):
+    inspector = inspect(conn)
+    if not inspector.has_table(table):
+        return None
+    return {column["name"] for column in inspector.get_columns(table)}
+
+
+def integer_cents(conn):
+    """Store money as integer cents (expenses also get a currency column)."""
+    changed = False
+    is_postgres = conn.dialect.name == "postgresql"
+
+    columns = _columns(conn, "expenses")
+    if columns is not None and "amount_cents" not in columns:
+        # expenses.amount held whole major units in an Integer column
+        conn.execute(text("ALTER TABLE expenses ADD COLUMN amount_cents BIGINT"))
+        conn.execute(text("ALTER TABLE expenses ADD COLUMN currency VARCHAR(3)"))
+        conn.execute(
+            text("UPDATE expenses SET amount_cents = COALESCE(amount, 0) * 100, currency = :currency"),
+            {"currency": DEFAULT_CURRENCY}
+        )
+        conn.execute(text("ALTER TABLE expenses DROP COLUMN amount"))
+        if is_postgres:
+            conn.execute(text("ALTER TABLE expenses ALTER COLUMN amount_cents SET NOT NULL"))
+            conn.execute(text("ALTER TABLE expenses ALTER COLUMN currency SET NOT NULL"))
+        changed = True
+
+    columns = _columns(conn, "expense_splits")
+    if columns is not None and "amount_cents" not in columns:
+        conn.execute(text("ALTER TABLE expense_splits ADD COLUMN amount_cents BIGINT"))
+        conn.execute(text(
+            "UPDATE expense_splits SET amount_cents = CAST(ROUND(COALESCE(amount, 0) * 100) AS BIGINT)"
+        ))
+        # Float splits rarely summed to exactly zero; rounding each one can leave
+        # a cent over or under. Settle the residue on the payer's split.
+        conn.execute(text(
+            "UPDATE expense_splits SET amount_cents = amount_cents - ("
+            "  SELECT SUM(s.amount_cents) FROM expense_splits s"
+            "  WHERE s.expense_id = expense_splits.expense_id"
+            ") WHERE user_id = ("
+            "  SELECT e.paid_by FROM expenses e WHERE e.id = expense_splits.expense_id"
+            ")"
+        ))
+        conn.execute(text("ALTER TABLE expense_splits DROP COLUMN amount"))
+        if is_postgres:
+            conn.execute(text("ALTER TABLE expense_splits ALTER COLUMN amount_cents SET NOT NULL"))
+        changed = True
+
+    columns = _columns(conn, "group_user_balances")
+    if columns is not None and "balance_cents" not in columns:
+        # Derived data: recreated by create_all and rebuilt from the splits below
+        conn.execute(text("DROP TABLE group_user_balances"))
+        changed = True
+
+    return changed
+
+
+def expense_created_at(conn):
+    """Record when each expense was created (existing rows get the migration time)."""
+    columns = _columns(conn, "expenses")
+    if columns is None or "created_at" in columns:
+        return False
+    conn.execute(text("ALTER TABLE expenses ADD COLUMN created_at TIMESTAMP"))
+    conn.execute(text("UPDATE expenses SET created_at = CURRENT_TIMESTAMP"))
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("ALTER TABLE expenses ALTER COLUMN created_at SET NOT NULL"))
+    return True
+
+
+# Conversions for databases that predate Alembic; new schema changes go in migrations/versions
+STEPS = [integer_cents, expense_created_at]
+
+
+def current_revision(conn):
+    return MigrationContext.configure(conn).get_current_revision()
+
+
+def upgrade(bind=engine, revision: str = "head", verbose: bool = False):
+    """
+    Apply the legacy steps and Alembic migrations up to `revision`.
+
+    Returns the names of the legacy steps and revisions that were applied.
+    """
+    applied = []
+    with bind.begin() as conn:
+        if current_revision(conn) is None:
+            for step in STEPS:
+                if step(conn):
+                    applied.append(step.__name__)
+                    if verbose:
+                        print(f"Applied {step.__name__}: {step.__doc__}")
+
+    config = Config(ALEMBIC_INI)
+    config.attributes["configure_logger"] = verbose
+    with bind.begin() as conn:
+        before = current_revision(conn)
+        config.attributes["connection"] = conn
+        command.upgrade(config, revision)
+        after = current_revision(conn)
+    if after != before:
+        applied.append(after)
+    return applied
+
+
+def migrate_database(verbose: bool = False, bind=engine):
+    """
+    Upgrade to the latest schema and, if anything changed, re-derive the ledger
+    and summaries and drop the chat assistant's cached schema description.
+    """
+    applied = upgrade(bind, verbose=verbose)
+    if not applied:
+        return "Schema is up to date"
+
+    db = SessionLocal(bind=bind)
+    try:
+        drift = ledger.rebuild(db)
+        crud.rebuild_summaries(db)
+    finally:
+        db.close()
+
+    from chat import chatbot
+    chatbot.invalidate_schema_cache()
+    return f"Applied {', '.join(applied)}; rebuilt {len(drift)} ledger row(s) and the analytics summaries"
+
+
+def main():
+    print(migrate_database(verbose=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,17 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Table, Float
+from datetime import datetime
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, ForeignKey, Table, Index, JSON, func
 from sqlalchemy.orm import relationship
 from app.database import Base
+from app.money import DEFAULT_CURRENCY
 
 # Association table for many-to-many relationship between users and groups
 group_users = Table(
     'group_users',
     Base.metadata,
     Column('user_id', Integer, ForeignKey('users.id'), primary_key=True),
-    Column('group_id', Integer, ForeignKey('groups.id'), primary_key=True)
+    Column('group_id', Integer, ForeignKey('groups.id'), primary_key=True),
+    # The primary key serves lookups by user; members of a group need the reverse
+    Index("ix_group_users_group_id_user_id", "group_id", "user_id")
 )
 
 
@@ -17,6 +21,7 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String, index=True)
     email = Column(String, unique=True, index=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, server_default=func.now())
 
     expenses = relationship("Expense", back_populates="user")
     groups = relationship("Group", secondary="group_users", back_populates="users")
@@ -29,16 +34,28 @@ class Expense(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     description = Column(String, index=True)
-    amount = Column(Integer)
+    amount_cents = Column(BigInteger, nullable=False)  # Total in minor units (e.g. cents)
+    currency = Column(String(3), nullable=False, default=DEFAULT_CURRENCY)  # ISO 4217 code
     paid_by = Column(Integer, ForeignKey('users.id'))
     group_id = Column(Integer, ForeignKey('groups.id'))
     split_type = Column(String)  # 'equal' or 'percentage'
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)  # UTC
+    # Set when the expense is deleted (UTC); its splits are removed at the same
+    # time and the row itself is hard-deleted later by `python -m app.compaction`
+    deleted_at = Column(DateTime, nullable=True)
 
 
     user = relationship("User", back_populates="expenses")
     group = relationship("Group", back_populates="expenses")
     splits = relationship("ExpenseSplit", back_populates="expense")  # Add this line
 
+    __table_args__ = (
+        # Keyset pagination of a group's expenses: WHERE group_id = ? AND id > ? ORDER BY id
+        Index("ix_expenses_group_id_id", "group_id", "id"),
+        # Compaction of soft-deleted rows: WHERE deleted_at < ?
+        Index("ix_expenses_deleted_at", "deleted_at"),
+    )
+
 
 
 class Group(Base):
@@ -46,6 +63,9 @@ class Group(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, server_default=func.now())
+    # Sequence number of the group's latest change feed event (group_events.seq)
+    event_seq = Column(BigInteger, nullable=False, default=0, server_default="0")
 
     users = relationship("User", secondary="group_users", back_populates="groups")
     expenses = relationship("Expense", back_populates="group")
@@ -57,8 +77,100 @@ class ExpenseSplit(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     expense_id = Column(Integer, ForeignKey("expenses.id"))
+    # Copy of expenses.group_id, so per-group split aggregates skip the join
+    group_id = Column(Integer, ForeignKey("groups.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"))
-    amount = Column(Float)  # Positive means owes, negative means is owed
+    amount_cents = Column(BigInteger, nullable=False)  # Positive means owes, negative means is owed
 
     expense = relationship("Expense", back_populates="splits")
-    user = relationship("User", back_populates="expense_splits")
\ No newline at end of file
+    user = relationship("User", back_populates="expense_splits")
+
+    __table_args__ = (
+        Index("ix_expense_splits_expense_id_user_id", "expense_id", "user_id"),
+        Index("ix_expense_splits_group_id_user_id", "group_id", "user_id"),
+    )
+
+
+class GroupUserBalance(Base):
+    """Materialized net balance of a user within a group.
+
+    Maintained by crud.create_expense in the same transaction as the splits,
+    so it always equals the sum of the user's ExpenseSplit amount_cents in the group.
+    Use `python -m app.ledger` to verify or rebuild it from expense_splits.
+    """
+    __tablename__ = "group_user_balances"
+
+    group_id = Column(Integer, ForeignKey("groups.id"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    balance_cents = Column(BigInteger, nullable=False, default=0)  # Positive means owes, negative means is owed
+
+    user = relationship("User")
+
+
+# Summary tables for analytics. Like the balance ledger they are maintained
+# incrementally by the expense write paths (crud.apply_summary_deltas) and can
+# be re-derived from the fact tables with crud.rebuild_summaries.
+
+class GroupSummary(Base):
+    """Expense count and total spend of a group."""
+    __tablename__ = "group_summaries"
+
+    group_id = Column(Integer, ForeignKey("groups.id"), primary_key=True)
+    expense_count = Column(BigInteger, nullable=False, default=0)
+    total_cents = Column(BigInteger, nullable=False, default=0)
+
+
+class UserSummary(Base):
+    """Net position of a user across all groups."""
+    __tablename__ = "user_summaries"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    paid_cents = Column(BigInteger, nullable=False, default=0)  # Total of expenses the user paid
+    balance_cents = Column(BigInteger, nullable=False, default=0)  # Positive means owes, negative means is owed
+
+
+class PayerPeriodSpend(Base):
+    """What each payer spent in a group per calendar month (UTC)."""
+    __tablename__ = "payer_period_spend"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    group_id = Column(Integer, ForeignKey("groups.id"), primary_key=True)
+    period = Column(String(7), primary_key=True)  # 'YYYY-MM'
+    expense_count = Column(BigInteger, nullable=False, default=0)
+    total_cents = Column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        # Per-group reads (group details); the primary key leads with user_id
+        Index("ix_payer_period_spend_group_id", "group_id"),
+    )
+
+
+class IdempotencyKey(Base):
+    """Response of a keyed expense creation, replayed to retries of the same request.
+
+    Written in the same transaction as the expense; rows older than the
+    retention window (app.idempotency) are ignored and purged.
+    """
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String(255), primary_key=True)  # Idempotency-Key header
+    request_hash = Column(String(64), nullable=False)  # sha256 of group id and body
+    response_body = Column(Text, nullable=False)  # JSON of the ExpenseResponse
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)  # UTC
+
+
+class GroupEvent(Base):
+    """Change feed entry of a group: an expense change and the balance deltas it caused.
+
+    Appended in the same transaction as the change, with `seq` taken from
+    groups.event_seq, so a group's events are numbered 1, 2, 3, ... in
+    commit order. Served by GET /groups/{group_id}/events (see app.change_feed).
+    """
+    __tablename__ = "group_events"
+
+    group_id = Column(Integer, ForeignKey("groups.id"), primary_key=True)
+    seq = Column(BigInteger, primary_key=True)
+    type = Column(String(32), nullable=False)  # 'expense_created', 'expense_updated', 'expense_deleted', 'expenses_imported'
+    expense_id = Column(Integer, nullable=True)  # No foreign key: deleted expenses are compacted away
+    data = Column(JSON, nullable=False)  # {"balance_deltas": {user_id: cents}, "expense": {...}}
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)  # UTC
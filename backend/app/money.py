@@ -0,0 +1,50 @@
+"""
+Money helpers: amounts are stored as integer minor units (cents).
+
+The API still accepts and returns major units (e.g. 12.5), converted at the
+edges with `to_cents` / `from_cents`. Inside the app every amount is an int,
+so splits and balances add up exactly.
+"""
+import os
+from decimal import Decimal, ROUND_HALF_UP
+from fractions import Fraction
+from typing import List
+
+DEFAULT_CURRENCY = os.getenv("DEFAULT_CURRENCY", "USD")
+
+
+def to_cents(amount) -> int:
+    """Convert a major-unit amount to cents, rounding half away from zero."""
+    return int((Decimal(str(amount)) * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents: int) -> float:
+    return cents / 100
+
+
+def format_cents(cents: int) -> str:
+    """Exact decimal string of a cent amount, e.g. 1205 -> '12.05'."""
+    sign = "-" if cents < 0 else ""
+    return f"{sign}{abs(cents) // 100}.{abs(cents) % 100:02d}"
+
+
+def allocate(total_cents: int, weights) -> List[int]:
+    """
+    Split `total_cents` in proportion to `weights` using the largest-remainder method.
+
+    Every share is the floor of its exact quota; the cents left over go one at
+    a time to the shares with the largest fractional remainders (earlier
+    shares win ties). The result always sums to exactly `total_cents`.
+    """
+    weights = [Fraction(str(weight)) for weight in weights]
+    weight_sum = sum(weights)
+    if not weights or weight_sum <= 0 or any(weight < 0 for weight in weights):
+        raise ValueError("Weights must be non-negative and sum to a positive value")
+
+    quotas = [total_cents * weight / weight_sum for weight in weights]
+    shares = [quota.numerator // quota.denominator for quota in quotas]
+    leftover = total_cents - sum(shares)
+    by_remainder = sorted(range(len(quotas)), key=lambda i: quotas[i] - shares[i], reverse=True)
+    for i in by_remainder[:leftover]:
+        shares[i] += 1
+    return shares
@@ -0,0 +1,40 @@
+"""
+Opaque keyset (cursor) pagination helpers for list endpoints.
+
+A cursor encodes the sort key of the last row of a page. The next page is
+fetched with `WHERE id > :last_id ORDER BY id LIMIT :limit`, which an index
+serves in constant time no matter how deep into the table the page is.
+The cursor for the following page is returned in the X-Next-Cursor header,
+so list responses keep their existing JSON shape.
+"""
+import base64
+import json
+from typing import Optional
+from fastapi import Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(last_id: int) -> str:
+    payload = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    """Return the last id encoded in `cursor`; raises ValueError if it is malformed."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded))["id"]
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(last_id, int):
+        raise ValueError("Invalid cursor")
+    return last_id
+
+
+def set_next_cursor(response: Response, page_ids, limit: Optional[int]):
+    """Add the next-page cursor header when the page is full."""
+    if limit is not None and page_ids and len(page_ids) >= limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(page_ids[-1])
@@ -1,5 +1,6 @@
+from datetime import datetime
 from typing import List, Optional, Dict
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, computed_field
 
 
 class UserBase(BaseModel):
@@ -29,9 +30,19 @@ class Group(BaseModel):
     class Config:
         orm_mode = True
 
+class GroupMemberSummary(BaseModel):
+    user_id: int
+    username: str
+    paid_cents: int  # Expenses of the group this member paid
+    share_cents: int  # This member's share of the group's expenses
+    balance_cents: int  # share - paid: positive means owes, negative means is owed
+
 class GroupDetails(Group):
     users: List[User]
-    total_expenses: float
+    total_expenses: float  # In major units
+    total_cents: int
+    expense_count: int
+    members: List[GroupMemberSummary]
 
     class Config:
         orm_mode = True
@@ -54,32 +65,81 @@ class GroupDetails(Group):
 # Schemas for Expense Management
 class ExpenseCreate(BaseModel):
     description: str
-    amount: float
+    amount: float = Field(..., gt=0)  # In major units; stored as integer cents
+    # Defaults to DEFAULT_CURRENCY; must match the currency of the group's other expenses
+    currency: Optional[str] = Field(None, pattern=r"^[A-Z]{3}$")
     paid_by: int
     split_type: str  # 'equal' or 'percentage'
-    # splits: Optional[Dict[int, float]]  # user_id to amount or percentage
+    # user_id to percentage, for 'percentage' splits; for 'equal' splits, optionally the
+    # participants (instead of all members), with the values ignored
+    splits: Optional[Dict[int, float]] = None
+
+class ExpenseUpdate(BaseModel):
+    """Fields to change; omitted fields keep their current value."""
+    description: Optional[str] = None
+    amount: Optional[float] = Field(None, gt=0)
+    currency: Optional[str] = Field(None, pattern=r"^[A-Z]{3}$")
+    paid_by: Optional[int] = None
+    split_type: Optional[str] = None
+    # As in ExpenseCreate; when omitted the expense keeps its participants, and a
+    # percentage expense their proportions
+    splits: Optional[Dict[int, float]] = None
 
 class ExpenseResponse(BaseModel):
     id: int
     description: str
-    amount: float
+    amount_cents: int
+    currency: str
     paid_by: int
     split_type: str
     # splits: Dict[int, float]
     group_id : int
+    created_at: Optional[datetime] = None
     class Config:
         orm_mode = True
 
+    @computed_field
+    @property
+    def amount(self) -> float:
+        return self.amount_cents / 100
+
+class GroupEvent(BaseModel):
+    """Change feed entry of a group."""
+    group_id: int
+    seq: int  # 1, 2, 3, ... per group
+    type: str  # 'expense_created', 'expense_updated', 'expense_deleted' or 'expenses_imported'
+    expense_id: Optional[int] = None
+    created_at: datetime
+    balance_deltas: Dict[int, int]  # user_id to change of balance in cents; positive means owes more
+    expense: Optional[ExpenseResponse] = None  # The expense after the change (created/updated)
+    expense_count: Optional[int] = None  # Expenses in an import batch
+
+class BulkExpenseError(BaseModel):
+    index: int  # Position of the rejected item in the request list
+    detail: str
+
+class BulkExpenseResponse(BaseModel):
+    created: List[ExpenseResponse]
+    errors: List[BulkExpenseError]
+
+class ExpenseImportResponse(BaseModel):
+    created_count: int
+    errors: List[BulkExpenseError]  # index is the record number in the uploaded file
+
 # balance schemas
+# Stored balances (balance_cents, splits, balance_deltas) are positive when the
+# user owes money. A transfer is owed by its "from" user to its "to" user
+# (see app/settlement.py), and total_balance is what the user gets back once
+# every transfer is paid: positive when they are owed, i.e. -balance_cents.
 class Balance(BaseModel):
     user_id: int
     username: str
     amount: float # Positive means the user is owed money, negative means the user owes money
 
 class BalanceDetail(BaseModel):
-    from_user_id: int
+    from_user_id: int  # Owes `amount` and pays it
     from_username: str
-    to_user_id: int
+    to_user_id: int  # Is owed `amount`
     to_username: str
     amount: float
 
@@ -94,3 +154,37 @@ class UserBalanceResponse(BaseModel):
     balances_by_group: Dict[str, List[BalanceDetail]]  # group_name to balances
     total_balance: float
 
+class SimplifiedDebtsResponse(BaseModel):
+    group_ids: List[int]
+    transfers_before: int  # Transfers when every group is settled on its own
+    transfers: List[BalanceDetail]
+
+class UserSimplifiedBalanceResponse(BaseModel):
+    user_id: int
+    username: str
+    group_ids: List[int]
+    transfers_before: int  # All members, every group settled on its own
+    transfers_after: int  # All members, after simplifying across the groups
+    balances: List[BalanceDetail]  # Only the transfers this user is part of
+    total_balance: float
+
+# analytics schemas (served from the precomputed summary tables)
+class GroupSummary(BaseModel):
+    group_id: int
+    group_name: str
+    expense_count: int
+    total_cents: int
+
+class UserPosition(BaseModel):
+    user_id: int
+    username: str
+    paid_cents: int  # Total of the expenses the user paid
+    share_cents: int  # The user's share of all expenses they took part in
+    balance_cents: int  # share - paid: positive means owes, negative means is owed
+
+class PayerSpend(BaseModel):
+    user_id: int
+    group_id: int
+    period: str  # 'YYYY-MM' (UTC)
+    expense_count: int
+    total_cents: int
@@ -0,0 +1,129 @@
+"""
+Settlement strategies: turn net balances into a list of transfers.
+
+Sign convention, the same as expense_splits, the balance ledger, the
+summaries and the change feed: a positive balance means the member owes
+money, a negative one that they are owed.
+
+Balances are integer cents keyed by user id and must sum to zero. Every
+strategy returns (from_user_id, to_user_id, cents) tuples: the "from"
+member owes (positive balance) and pays the "to" member, who is owed
+(negative balance). These are the from/to fields of schemas.BalanceDetail.
+"""
+import heapq
+from functools import lru_cache
+
+# Above this many non-zero members the exact search is too slow (O(2^n * n))
+# and `optimal` falls back to `greedy`.
+OPTIMAL_MAX_PARTICIPANTS = 12
+
+
+def greedy(balances: dict):
+    """
+    Repeatedly have the member who owes the most pay the one who is owed the most.
+
+    Runs in O(n log n) with two heaps and exact integer arithmetic, so every
+    member ends at exactly zero and no stray-cent transfers are produced.
+    """
+    # Min-heaps of negated amounts, so the largest amount pops first
+    debtors = [(-balance, user_id) for user_id, balance in balances.items() if balance > 0]
+    creditors = [(balance, user_id) for user_id, balance in balances.items() if balance < 0]
+    heapq.heapify(debtors)
+    heapq.heapify(creditors)
+
+    transfers = []
+    while debtors and creditors:
+        debt, from_id = heapq.heappop(debtors)
+        credit, to_id = heapq.heappop(creditors)
+        amount = min(-debt, -credit)
+        transfers.append((from_id, to_id, amount))
+
+        if debt + amount < 0:
+            heapq.heappush(debtors, (debt + amount, from_id))
+        if credit + amount < 0:
+            heapq.heappush(creditors, (credit + amount, to_id))
+    return transfers
+
+
+def optimal(balances: dict, max_participants: int = OPTIMAL_MAX_PARTICIPANTS):
+    """
+    Settle with the minimum number of transfers.
+
+    A group of k members whose balances sum to zero can always be settled with
+    k - 1 transfers, so the fewest transfers come from partitioning members into
+    as many zero-sum subsets as possible. That partition is found with a
+    memoized search over member bitmasks; each subset is then settled greedily.
+    Falls back to `greedy` for more than `max_participants` non-zero members.
+    """
+    user_ids = sorted(user_id for user_id, balance in balances.items() if balance != 0)
+    if len(user_ids) > max_participants:
+        return greedy(balances)
+
+    n = len(user_ids)
+    full_mask = (1 << n) - 1
+    subset_sums = [0] * (1 << n)
+    for mask in range(1, full_mask + 1):
+        lowest = mask & -mask
+        subset_sums[mask] = subset_sums[mask ^ lowest] + balances[user_ids[lowest.bit_length() - 1]]
+
+    @lru_cache(maxsize=None)
+    def zero_sum_groups(mask):
+        # Most zero-sum subsets reachable by removing members one at a time
+        if mask == 0:
+            return 0
+        best = max(zero_sum_groups(mask & ~(1 << i)) for i in range(n) if mask >> i & 1)
+        return best + (1 if subset_sums[mask] == 0 else 0)
+
+    # Walk the best removal order; members removed between two consecutive
+    # zero-sum masks form one zero-sum subset
+    transfers = []
+    mask, group_start = full_mask, full_mask
+    while mask:
+        mask = max(
+            (mask & ~(1 << i) for i in range(n) if mask >> i & 1),
+            key=zero_sum_groups
+        )
+        if subset_sums[mask] == 0:
+            group_mask = group_start & ~mask
+            group = {user_ids[i]: balances[user_ids[i]] for i in range(n) if group_mask >> i & 1}
+            transfers.extend(greedy(group))
+            group_start = mask
+    return transfers
+
+
+def net_positions(transfers):
+    """
+    Net balance of every member implied by (from_user_id, to_user_id, cents) edges.
+
+    The inverse of settle: a member who has to pay owes that much (positive),
+    one who gets paid is owed it (negative). Parallel and opposing edges
+    between the same two members cancel out here, in a single O(E) pass.
+    """
+    balances = {}
+    for from_id, to_id, cents in transfers:
+        balances[from_id] = balances.get(from_id, 0) + cents
+        balances[to_id] = balances.get(to_id, 0) - cents
+    return balances
+
+
+def simplify(transfers, strategy: str = "greedy"):
+    """
+    Replace a debt graph (e.g. the per-group plans of several groups) with an
+    equivalent plan: every member ends with the same net position, but
+    opposing and chained debts are netted out. O(E) to collapse the graph,
+    then O(V log V) for the greedy settlement of the V members left with a
+    non-zero balance.
+    """
+    return settle(net_positions(transfers), strategy)
+
+
+STRATEGIES = {
+    "greedy": greedy,
+    "optimal": optimal,
+}
+
+
+def settle(balances: dict, strategy: str = "greedy"):
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown settlement strategy '{strategy}', expected one of {sorted(STRATEGIES)}")
+    return STRATEGIES[strategy](balances)
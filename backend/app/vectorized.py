@@ -0,0 +1,178 @@
+"""
+Vectorized (NumPy) balance and split computation for bulk work.
+
+The request path keeps using crud.build_splits and the balance ledger; this
+module is for whole-table recomputation such as ledger reconciliation
+(`python -m app.ledger --engine numpy`) and analytics, where looping over
+ORM rows in Python dominates. All arithmetic is int64 cents, so results
+match the row-by-row code exactly (tests/test_vectorized.py checks it;
+benchmarks/bench_vectorized.py times it).
+"""
+from itertools import chain
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app import models, money
+
+FETCH_BATCH_SIZE = 100_000
+# Percentages are compared as integers in millionths, which is exact for up
+# to six decimals (money.allocate parses weights as decimals)
+WEIGHT_SCALE = 1_000_000
+# net_balances sums into a dense array while it has at most this many slots
+# per input row (or DENSE_MIN_KEYS), and sorts the keys otherwise
+DENSE_KEYS_PER_ROW = 4
+DENSE_MIN_KEYS = 1 << 20
+INT64_MAX = np.iinfo(np.int64).max
+
+
+def load_splits(db: Session, group_id: int = None, batch_size: int = FETCH_BATCH_SIZE):
+    """expense_splits as int64 column arrays: (expense_ids, group_ids, user_ids, amount_cents)."""
+    query = select(
+        models.ExpenseSplit.expense_id,
+        models.ExpenseSplit.group_id,
+        models.ExpenseSplit.user_id,
+        models.ExpenseSplit.amount_cents
+    )
+    if group_id is not None:
+        query = query.where(models.ExpenseSplit.group_id == group_id)
+
+    # Core execution on the session's connection skips the ORM result layer;
+    # np.fromiter over the flattened tuples is far cheaper than np.array(rows)
+    result = db.connection().execute(query.execution_options(yield_per=batch_size))
+    chunks = [
+        np.fromiter(chain.from_iterable(rows), dtype=np.int64, count=4 * len(rows)).reshape(-1, 4)
+        for rows in result.partitions()
+    ]
+    columns = np.concatenate(chunks) if chunks else np.empty((0, 4), dtype=np.int64)
+    return tuple(np.ascontiguousarray(columns[:, i]) for i in range(4))
+
+
+def net_balances(group_ids, user_ids, amounts):
+    """
+    Sum amounts per (group_id, user_id).
+
+    Returns (group_ids, user_ids, balance_cents) arrays with one entry per
+    distinct pair, ordered by group then user. Pairs are packed into one
+    int64 key and summed with np.add.at on int64, which stays exact where
+    float-weighted np.bincount would not: straight into a dense array when
+    the keys are compact, after np.unique otherwise.
+    """
+    group_ids = np.asarray(group_ids, dtype=np.int64)
+    user_ids = np.asarray(user_ids, dtype=np.int64)
+    amounts = np.asarray(amounts, dtype=np.int64)
+    if amounts.size == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty
+
+    group_base, user_base = int(group_ids.min()), int(user_ids.min())
+    user_span = int(user_ids.max()) - user_base + 1
+    keys = (group_ids - group_base) * user_span + (user_ids - user_base)
+    key_span = int(keys.max()) + 1
+
+    if key_span <= max(DENSE_KEYS_PER_ROW * keys.size, DENSE_MIN_KEYS):
+        sums = np.zeros(key_span, dtype=np.int64)
+        np.add.at(sums, keys, amounts)
+        # Pairs whose splits net to zero still get a row, like SQL GROUP BY
+        unique_keys = np.flatnonzero(np.bincount(keys, minlength=key_span))
+        totals = sums[unique_keys]
+    else:
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        totals = np.zeros(unique_keys.size, dtype=np.int64)
+        np.add.at(totals, inverse.ravel(), amounts)
+    return unique_keys // user_span + group_base, unique_keys % user_span + user_base, totals
+
+
+def net_balances_dict(group_ids, user_ids, amounts):
+    """net_balances as {(group_id, user_id): balance_cents}, the shape of crud.aggregate_split_balances."""
+    groups, users, totals = net_balances(group_ids, user_ids, amounts)
+    return dict(zip(zip(groups.tolist(), users.tolist()), totals.tolist()))
+
+
+def allocate(totals, expense_index, weights):
+    """
+    Largest-remainder allocation for many expenses at once, like money.allocate.
+
+    `totals[e]` cents are split over the participant rows whose
+    `expense_index` is e, in proportion to their `weights`. Rows must be
+    grouped by expense in participant order; earlier rows win ties, as in
+    money.allocate. Returns the share of every row.
+
+    Shares are computed as total * scaled weight in int64. Expenses where
+    that product could overflow (from about 9.2e10 cents with percentage
+    weights) are allocated by money.allocate on Python ints instead, so any
+    int64 total is exact; scaled weights must sum to less than 2**53 per
+    expense.
+    """
+    totals = np.asarray(totals, dtype=np.int64)
+    expense_index = np.asarray(expense_index, dtype=np.int64)
+    scaled = np.rint(np.asarray(weights, dtype=np.float64) * WEIGHT_SCALE).astype(np.int64)
+    if np.any(scaled < 0):
+        raise ValueError("Weights must be non-negative and sum to a positive value")
+
+    # bincount sums in float64, exact while per-expense sums stay below 2**53
+    weight_sums = np.bincount(expense_index, weights=scaled, minlength=totals.size).astype(np.int64)
+    if np.any(weight_sums[np.unique(expense_index)] <= 0):
+        raise ValueError("Weights must be non-negative and sum to a positive value")
+
+    overflows = np.zeros(totals.size, dtype=bool)
+    overflows[expense_index[totals[expense_index] > INT64_MAX // np.maximum(scaled, 1)]] = True
+    # Those are allocated at the end; zero here so nothing wraps around
+    safe_totals = np.where(overflows, 0, totals)
+
+    numerators = safe_totals[expense_index] * scaled
+    denominators = weight_sums[expense_index]
+    shares = numerators // denominators
+    remainders = numerators % denominators  # Same denominator within an expense, so comparable
+
+    # Summed in int64 (not bincount's float64), so totals above 2**53 stay exact
+    leftover = safe_totals
+    np.subtract.at(leftover, expense_index, shares)
+    # Rank rows within each expense by remainder (largest first), row order breaking ties
+    position = np.arange(expense_index.size)
+    order = np.lexsort((position, -remainders, expense_index))
+    first_row = np.searchsorted(expense_index[order], np.arange(totals.size))
+    rank = np.empty_like(position)
+    rank[order] = position - first_row[expense_index[order]]
+    shares += rank < leftover[expense_index]
+
+    for expense in np.flatnonzero(overflows):
+        rows = np.flatnonzero(expense_index == expense)
+        shares[rows] = money.allocate(int(totals[expense]), scaled[rows].tolist())
+    return shares
+
+
+def build_splits(totals, paid_by, expense_index, participant_ids, weights=None):
+    """
+    Splits of many expenses at once, matching crud.build_splits row for row.
+
+    Participants are given as flat rows (`expense_index`, `participant_ids`,
+    `weights`; weights default to 1, i.e. equal splits). Every participant
+    owes their share and the payer is owed the total, either on their own
+    participant row or on an extra row appended after the expense's
+    participants. Returns (expense_index, user_ids, amount_cents) arrays
+    grouped by expense. Validation (membership, percentages summing to 100)
+    stays with the caller.
+    """
+    totals = np.asarray(totals, dtype=np.int64)
+    paid_by = np.asarray(paid_by, dtype=np.int64)
+    expense_index = np.asarray(expense_index, dtype=np.int64)
+    participant_ids = np.asarray(participant_ids, dtype=np.int64)
+    if weights is None:
+        weights = np.ones(participant_ids.size)
+
+    amounts = allocate(totals, expense_index, weights)
+    is_payer = participant_ids == paid_by[expense_index]
+    amounts[is_payer] -= totals[expense_index[is_payer]]
+
+    payer_missing = np.ones(totals.size, dtype=bool)
+    payer_missing[expense_index[is_payer]] = False
+    extra = np.flatnonzero(payer_missing)
+
+    rows = np.concatenate([expense_index, extra])
+    order = np.argsort(rows, kind="stable")
+    return (
+        rows[order],
+        np.concatenate([participant_ids, paid_by[extra]])[order],
+        np.concatenate([amounts, -totals[extra]])[order]
+    )
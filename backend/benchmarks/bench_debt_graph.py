@@ -0,0 +1,60 @@
+"""
+Benchmark cross-group debt simplification on synthetic debt graphs.
+
+Usage (from the backend directory):
+    python benchmarks/bench_debt_graph.py [--edges 1000 10000 100000 1000000] [--members 0] [--repeat 3]
+
+Each graph has random (from, to, cents) edges between `--members` users
+(default: a tenth of the edge count), as if many groups had been settled
+one by one. For every size this prints the time of settlement.simplify, the
+time per edge (flat when the cost is linear in the edges), and the number of
+transfers before and after, then checks that every member's net position is
+unchanged.
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import settlement
+
+
+def random_debt_graph(edges: int, members: int, rng: random.Random):
+    transfers = []
+    for _ in range(edges):
+        from_id = rng.randrange(members)
+        to_id = rng.randrange(members - 1)
+        if to_id >= from_id:
+            to_id += 1
+        transfers.append((from_id, to_id, rng.randint(1, 50_000)))
+    return transfers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark debt-graph simplification")
+    parser.add_argument("--edges", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--members", type=int, default=0, help="Members per graph (0: edges / 10)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    print(f"{'edges':>9} {'members':>8} {'ms/call':>10} {'us/edge':>8} {'before':>9} {'after':>8}")
+    for edges in args.edges:
+        members = args.members or max(2, edges // 10)
+        graph = random_debt_graph(edges, members, rng)
+        seconds = timeit.timeit(lambda: settlement.simplify(graph), number=args.repeat) / args.repeat
+        simplified = settlement.simplify(graph)
+        if settlement.net_positions(simplified) != {
+            user_id: balance for user_id, balance in settlement.net_positions(graph).items() if balance
+        }:
+            raise SystemExit(f"simplified plan changes net positions for {edges} edges")
+        print(f"{edges:>9} {members:>8} {seconds * 1000:>10.1f} {seconds / edges * 1e6:>8.2f} "
+              f"{edges:>9} {len(simplified):>8}")
+
+
+if __name__ == "__main__":
+    main()
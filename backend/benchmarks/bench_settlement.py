@@ -0,0 +1,47 @@
+"""
+Benchmark the settlement strategies on random zero-sum groups.
+
+Usage (from the backend directory):
+    python benchmarks/bench_settlement.py [--sizes 10 100 1000] [--repeat 20]
+
+For each group size this prints the mean time per call and the number of
+transfers produced by every strategy. `optimal` falls back to `greedy` above
+settlement.OPTIMAL_MAX_PARTICIPANTS members, which shows up as identical rows.
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import settlement
+
+
+def random_balances(members: int, rng: random.Random):
+    """Random balances in cents for `members` users that sum to exactly zero."""
+    balances = {user_id: rng.randint(-50_000, 50_000) for user_id in range(1, members)}
+    balances[members] = -sum(balances.values())
+    return balances
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark settlement strategies")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    print(f"{'members':>8} {'strategy':>10} {'ms/call':>10} {'transfers':>10}")
+    for size in args.sizes:
+        balances = random_balances(size, rng)
+        for name, strategy in settlement.STRATEGIES.items():
+            seconds = timeit.timeit(lambda: strategy(balances), number=args.repeat) / args.repeat
+            transfers = len(strategy(balances))
+            print(f"{size:>8} {name:>10} {seconds * 1000:>10.3f} {transfers:>10}")
+
+
+if __name__ == "__main__":
+    main()
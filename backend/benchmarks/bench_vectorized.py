@@ -0,0 +1,197 @@
+"""
+Check the vectorized (NumPy) engine against the row-by-row code and benchmark it.
+
+Usage (from the backend directory):
+    python benchmarks/bench_vectorized.py [--splits 10000000] [--expenses 20000] [--url sqlite:///bench.db]
+
+Three parts, every one exiting non-zero on any mismatch (tests/test_vectorized.py
+asserts the same parity under pytest):
+
+1. Split parity: `--expenses` random equal and percentage expenses (including
+   fractional percentages) are split by crud.build_splits one by one and by
+   vectorized.build_splits in one batch; every (user, cents) row must match.
+2. Balance parity: with --url, the balances of the seeded database (see
+   benchmarks/seed_data.py) from expense_splits ORM objects, from
+   crud.aggregate_split_balances and from vectorized.load_splits +
+   net_balances must be identical.
+3. Throughput: `--splits` synthetic split rows are netted per group/user by
+   vectorized.net_balances and by a Python dict loop, and about as many split
+   rows are generated by vectorized.build_splits; crud.build_splits is timed
+   on a sample and extrapolated.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from app import crud, migrate, models, money, schemas, vectorized
+from benchmarks import seed_data
+
+
+def timed(function):
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+
+def random_percentages(rng: random.Random, count: int):
+    """`count` percentages with up to three decimals that sum to exactly 100."""
+    cuts = sorted(rng.sample(range(1, 100_000), count - 1))
+    return [(high - low) / 1000 for low, high in zip([0] + cuts, cuts + [100_000])]
+
+
+def random_expenses(rng: random.Random, count: int, members: int = 12):
+    """(member_ids, ExpenseCreate) pairs, half equal and half percentage splits."""
+    expenses = []
+    for index in range(count):
+        member_ids = sorted(rng.sample(range(1, 200), rng.randint(2, members)))
+        paid_by = rng.choice(member_ids)
+        amount = rng.randint(1, 1_000_000) / 100
+        if index % 2:
+            expense = schemas.ExpenseCreate(
+                description="bench", amount=amount, paid_by=paid_by, split_type="equal"
+            )
+        else:
+            participants = rng.sample(member_ids, rng.randint(1, len(member_ids)))
+            expense = schemas.ExpenseCreate(
+                description="bench", amount=amount, paid_by=paid_by, split_type="percentage",
+                splits=dict(zip(participants, random_percentages(rng, len(participants))))
+            )
+        expenses.append((member_ids, expense))
+    return expenses
+
+
+def batch_arguments(expenses):
+    """Flatten expenses into the arrays taken by vectorized.build_splits."""
+    totals, paid_by, expense_index, participant_ids, weights = [], [], [], [], []
+    for index, (member_ids, expense) in enumerate(expenses):
+        totals.append(money.to_cents(expense.amount))
+        paid_by.append(expense.paid_by)
+        shares = expense.splits if expense.split_type == "percentage" else dict.fromkeys(member_ids, 1)
+        for user_id, weight in shares.items():
+            expense_index.append(index)
+            participant_ids.append(user_id)
+            weights.append(weight)
+    return totals, paid_by, expense_index, participant_ids, weights
+
+
+def check_split_parity(rng: random.Random, count: int):
+    expenses = random_expenses(rng, count)
+    expected, python_seconds = timed(lambda: [
+        (index, user_id, cents)
+        for index, (member_ids, expense) in enumerate(expenses)
+        for user_id, cents in crud.build_splits(expense, member_ids).items()
+    ])
+    arguments = batch_arguments(expenses)
+    rows, numpy_seconds = timed(lambda: vectorized.build_splits(*arguments))
+    actual = list(zip(*(column.tolist() for column in rows)))
+    if actual != expected:
+        mismatch = next(i for i, (a, b) in enumerate(zip(actual, expected)) if a != b) if len(actual) == len(expected) else None
+        raise SystemExit(f"split parity FAILED ({len(actual)} vs {len(expected)} rows, first mismatch at {mismatch})")
+    print(f"split parity: {count} expenses, {len(expected)} rows identical "
+          f"(crud {python_seconds * 1000:.0f} ms, numpy {numpy_seconds * 1000:.0f} ms)")
+
+
+def check_balance_parity(url: str, args):
+    engine = create_engine(url)
+    migrate.upgrade(engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    try:
+        if not db.execute(select(func.count(models.User.id))).scalar():
+            print("Seeding the database...")
+            seed_data.seed(db, seed=args.seed)
+
+        def orm_balances():
+            balances = {}
+            for split in db.query(models.ExpenseSplit).yield_per(vectorized.FETCH_BATCH_SIZE):
+                key = (split.group_id, split.user_id)
+                balances[key] = balances.get(key, 0) + split.amount_cents
+            return balances
+
+        orm, orm_seconds = timed(orm_balances)
+        db.expunge_all()
+        aggregated, sql_seconds = timed(lambda: crud.aggregate_split_balances(db))
+        vectorized_balances, numpy_seconds = timed(
+            lambda: vectorized.net_balances_dict(*vectorized.load_splits(db)[1:])
+        )
+    finally:
+        db.close()
+        engine.dispose()
+
+    if not orm == aggregated == vectorized_balances:
+        raise SystemExit("balance parity FAILED")
+    print(f"balance parity: {len(orm)} group/user balances identical "
+          f"(ORM loop {orm_seconds * 1000:.0f} ms, SQL GROUP BY {sql_seconds * 1000:.0f} ms, "
+          f"load + numpy {numpy_seconds * 1000:.0f} ms)")
+
+
+def bench_net_balances(rng: np.random.Generator, splits: int, groups: int, members: int):
+    group_ids = rng.integers(1, groups + 1, splits)
+    # Members of a group are drawn from a window of user ids, so groups overlap
+    user_ids = group_ids * members // 2 + rng.integers(0, members, splits)
+    amounts = rng.integers(-500_000, 500_000, splits)
+
+    (_, _, totals), numpy_seconds = timed(lambda: vectorized.net_balances(group_ids, user_ids, amounts))
+
+    def python_loop():
+        balances = {}
+        for key in zip(group_ids.tolist(), user_ids.tolist(), amounts.tolist()):
+            pair = key[:2]
+            balances[pair] = balances.get(pair, 0) + key[2]
+        return balances
+
+    balances, python_seconds = timed(python_loop)
+    if sorted(balances.values()) != sorted(totals.tolist()):
+        raise SystemExit("net balance parity FAILED on synthetic splits")
+    print(f"net balances of {splits:,} splits into {totals.size:,} group/user pairs: "
+          f"numpy {numpy_seconds * 1000:.0f} ms, python loop {python_seconds * 1000:.0f} ms "
+          f"({python_seconds / numpy_seconds:.0f}x)")
+
+
+def bench_build_splits(rng: random.Random, splits: int, sample: int):
+    members = 5
+    expenses = splits // (members + 1)
+    nprng = np.random.default_rng(rng.randrange(2 ** 32))
+    totals = nprng.integers(1, 1_000_000, expenses)
+    expense_index = np.repeat(np.arange(expenses), members)
+    participant_ids = nprng.integers(1, 10_000, expenses * members)
+    paid_by = participant_ids[::members]
+    weights = nprng.integers(1, 100, expenses * members)
+
+    rows, numpy_seconds = timed(lambda: vectorized.build_splits(
+        totals, paid_by, expense_index, participant_ids, weights
+    ))
+    per_expense = [
+        (member_ids, expense) for member_ids, expense in random_expenses(rng, sample, members + 1)
+    ]
+    _, python_seconds = timed(lambda: [crud.build_splits(expense, member_ids) for member_ids, expense in per_expense])
+    print(f"build splits for {expenses:,} expenses ({rows[0].size:,} rows): numpy {numpy_seconds * 1000:.0f} ms, "
+          f"crud.build_splits ~{python_seconds / sample * expenses * 1000:.0f} ms (extrapolated from {sample})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check and benchmark the vectorized balance engine")
+    parser.add_argument("--splits", type=int, default=10_000_000, help="Synthetic split rows to benchmark")
+    parser.add_argument("--groups", type=int, default=50_000)
+    parser.add_argument("--members", type=int, default=10, help="Members per synthetic group")
+    parser.add_argument("--expenses", type=int, default=20_000, help="Random expenses for the split parity check")
+    parser.add_argument("--url", help="Also check balance parity on this database, e.g. sqlite:///bench.db")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    check_split_parity(rng, args.expenses)
+    if args.url:
+        check_balance_parity(args.url, args)
+    bench_net_balances(np.random.default_rng(args.seed), args.splits, args.groups, args.members)
+    bench_build_splits(rng, args.splits, min(args.expenses, 20_000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Load test for the /chat/ endpoint with a stub LLM.
+
+Usage (from the backend directory):
+    python benchmarks/chat_load.py [--requests 200] [--concurrency 50] [--llm-latency 0.5]
+
+The LLM is replaced by a stub that sleeps for --llm-latency seconds per call
+and the SQL step by a stub that sleeps for --sql-latency seconds, so no API
+key or database is needed. While the chat load runs, a trivial /ping route is
+polled to check that the event loop stays responsive: if LLM calls blocked
+the loop, ping latency would climb to the LLM latency.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import httpx
+from fastapi import FastAPI
+from api import chat
+from chat import chatbot
+
+
+class StubMessage:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class StubLLM:
+    """Stands in for the chat model: async calls sleep, then return canned output."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def with_structured_output(self, schema):
+        return self
+
+    async def ainvoke(self, prompt):
+        await asyncio.sleep(self.latency)
+        if isinstance(prompt, str):
+            return StubMessage("Stub answer")
+        return {"query": "SELECT 1"}
+
+
+class StubDatabase:
+    """Just enough of SQLDatabase for write_query's prompt."""
+    dialect = "postgresql"
+
+    def get_table_info(self):
+        return "CREATE TABLE expenses (id INTEGER, description TEXT, amount_cents BIGINT)"
+
+
+def percentile(values, pct: float):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def run(args):
+    chatbot.configure(llm=StubLLM(args.llm_latency), db=StubDatabase())
+    chatbot.run_query = lambda query: time.sleep(args.sql_latency) or "[(1,)]"
+    # Every question is distinct, so the SQL and result caches never short-circuit
+
+    app = FastAPI()
+    app.include_router(chat.router, prefix="/chat")
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+        gate = asyncio.Semaphore(args.concurrency)
+        latencies, statuses = [], {}
+        done = asyncio.Event()
+
+        async def one(i: int):
+            async with gate:
+                started = time.perf_counter()
+                response = await client.post("/chat/", json={"question": f"question {i}"})
+                latencies.append(time.perf_counter() - started)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        ping_latencies = []
+
+        async def poll_ping():
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/ping")
+                ping_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.01)
+
+        pinger = asyncio.create_task(poll_ping())
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await pinger
+
+    print(f"requests={args.requests} concurrency={args.concurrency} "
+          f"llm_latency={args.llm_latency}s sql_latency={args.sql_latency}s "
+          f"slots={chatbot.CHAT_MAX_CONCURRENCY} queue={chatbot.CHAT_MAX_QUEUE}")
+    print(f"status codes: {dict(sorted(statuses.items()))}")
+    print(f"throughput: {args.requests / elapsed:.1f} req/s over {elapsed:.2f}s")
+    print(f"chat latency p50={percentile(latencies, 50) * 1000:.0f}ms "
+          f"p95={percentile(latencies, 95) * 1000:.0f}ms max={max(latencies) * 1000:.0f}ms")
+    print(f"ping latency p50={percentile(ping_latencies, 50) * 1000:.1f}ms "
+          f"p95={percentile(ping_latencies, 95) * 1000:.1f}ms "
+          f"max={max(ping_latencies, default=0) * 1000:.1f}ms (should stay far below the LLM latency)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test /chat/ with a stub LLM")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--sql-latency", type=float, default=0.05)
+    asyncio.run(run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
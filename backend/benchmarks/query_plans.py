@@ -0,0 +1,174 @@
+"""
+Query-plan regression check for the balance and expense hot paths.
+
+Usage (from the backend directory):
+    python benchmarks/query_plans.py                       # scratch SQLite file
+    python benchmarks/query_plans.py --url postgresql://user:pw@localhost/plan_check
+
+The target database is migrated to head and seeded, so point --url at an
+empty scratch database, never at real data. The hot crud functions are then
+called while their SELECT statements are captured, and every statement is
+EXPLAINed. Any full scan of a large table (HOT_TABLES) is reported and the
+script exits with status 1, so it can run in CI after schema changes. So is
+any index of app/models.py that the migrated database lacks: a planner can
+answer a query through a worse index without a full scan, so plans alone
+do not prove the hot path indexes exist. Run it against a database created
+by an older revision (or by create_all before Alembic) to check upgrades.
+
+On PostgreSQL sequential scans are disabled for the EXPLAIN session
+(enable_seqscan=off): the planner then only picks one when no index can
+answer the query, which is exactly the regression this guards against,
+independently of table sizes and statistics.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, event, func, inspect, select
+from sqlalchemy.orm import sessionmaker
+from app import crud, migrate, models
+from app.cache import balance_cache
+from benchmarks.seed_data import seed
+
+HOT_TABLES = {"expenses", "expense_splits", "group_users", "group_user_balances", "payer_period_spend", "group_events"}
+
+
+def capture_selects(engine, calls):
+    """Run `calls` and return the (statement, parameters) of every SELECT they issued."""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        for call in calls:
+            call()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return captured
+
+
+def _postgres_full_scans(plan):
+    scans = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in HOT_TABLES:
+        scans.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        scans.extend(_postgres_full_scans(child))
+    return scans
+
+
+def full_scans(conn, statement, parameters):
+    """Hot tables the statement reads with a full scan, plus the plan text for reporting."""
+    if conn.dialect.name == "postgresql":
+        plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return _postgres_full_scans(plan[0]["Plan"]), json.dumps(plan[0]["Plan"], indent=2)
+
+    details = [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+    scans = []
+    for detail in details:
+        # "SEARCH t USING INDEX ..." seeks; "SCAN t [USING ... INDEX ...]" reads every row
+        match = re.match(r"SCAN (\w+)", detail)
+        if match and match.group(1) in HOT_TABLES:
+            scans.append(match.group(1))
+    return scans, "\n".join(details)
+
+
+def missing_indexes(conn):
+    """Indexes declared in app/models.py that the database lacks, matched by table and columns."""
+    inspector = inspect(conn)
+    missing = []
+    for table in models.Base.metadata.sorted_tables:
+        if table.name not in HOT_TABLES:
+            continue
+        existing = {tuple(index["column_names"]) for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if tuple(column.name for column in index.columns) not in existing:
+                missing.append(f"{index.name} on {table.name}")
+    return missing
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that the hot queries are served by indexes")
+    parser.add_argument("--url", help="Empty scratch database (default: a temporary SQLite file)")
+    parser.add_argument("--groups", type=int, default=50)
+    parser.add_argument("--members", type=int, default=8)
+    parser.add_argument("--expenses-per-group", type=int, default=200)
+    parser.add_argument("--verbose", action="store_true", help="Print every plan")
+    args = parser.parse_args(argv)
+
+    scratch = None
+    url = args.url
+    if url is None:
+        scratch = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(scratch.name, 'plan_check.db')}"
+
+    engine = create_engine(url)
+    migrate.upgrade(engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    try:
+        if db.execute(select(func.count(models.User.id))).scalar():
+            parser.error("the database already has data; use an empty scratch database")
+        memberships = seed(db, users=args.groups * args.members // 2 + args.members, groups=args.groups,
+                           group_size=(args.members, args.members), expenses_per_group=args.expenses_per_group)
+        if engine.dialect.name == "postgresql":
+            db.connection().exec_driver_sql("ANALYZE")
+        db.commit()
+
+        group_id = list(memberships)[len(memberships) // 2]
+        user_id = memberships[group_id][0]
+        first_page = crud.get_expenses_by_group(db, group_id, limit=50)
+        balance_cache.clear()
+
+        statements = capture_selects(engine, [
+            lambda: crud.get_expenses_by_group(db, group_id, limit=50),
+            lambda: crud.get_expenses_by_group(db, group_id, limit=50, after_id=first_page[-1]["id"]),
+            lambda: crud.aggregate_split_balances(db, group_id),
+            lambda: crud.get_group_balances(db, group_id),
+            lambda: crud.get_user_balances(db, user_id),
+            lambda: crud.get_group_details(db, group_id),
+            lambda: crud.get_payer_spend(db, group_id=group_id),
+            lambda: crud.get_all_groups(db, limit=50, member_id=user_id),
+            lambda: crud.compact_deleted_expenses(db, datetime.utcnow(), dry_run=True),
+            lambda: crud.get_group_events(db, group_id, after_seq=1),
+            lambda: crud.compact_group_events(db, datetime.utcnow(), dry_run=True),
+        ])
+        db.rollback()
+
+        failures = 0
+        with engine.connect() as conn:
+            for index in missing_indexes(conn):
+                failures += 1
+                print(f"MISSING INDEX {index}")
+            if conn.dialect.name == "postgresql":
+                conn.exec_driver_sql("SET enable_seqscan = off")
+            for statement, parameters in statements:
+                scans, plan = full_scans(conn, statement, parameters)
+                one_line = " ".join(statement.split())
+                if scans:
+                    failures += 1
+                    print(f"FULL SCAN of {', '.join(sorted(set(scans)))}: {one_line}\n{plan}\n")
+                elif args.verbose:
+                    print(f"ok: {one_line}\n{plan}\n")
+    finally:
+        db.close()
+        engine.dispose()
+        if scratch is not None:
+            scratch.cleanup()
+
+    print(f"{len(statements)} hot statement(s) checked on {engine.dialect.name}, "
+          f"{failures} with full scans or missing indexes")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Seeded synthetic data for benchmarks: users, groups and expenses.
+
+Usage (from the backend directory):
+    python benchmarks/seed_data.py --url sqlite:///bench.db [--users 1000] [--groups 200]
+        [--group-size 3-10] [--expenses-per-group 100] [--percentage-share 0.3] [--seed 42]
+
+The database is migrated to head first. Expenses go through
+crud.create_expenses_bulk, so splits, the balance ledger and the analytics
+summaries are written exactly as the API writes them. The same seed always
+produces the same data.
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import sessionmaker
+from app import crud, migrate, models, schemas
+
+BATCH_SIZE = 1000
+
+
+def parse_range(value: str):
+    """'5' -> (5, 5), '3-10' -> (3, 10)."""
+    low, _, high = value.partition("-")
+    return int(low), int(high or low)
+
+
+def random_expense(rng: random.Random, member_ids, percentage_share: float, index: int):
+    paid_by = rng.choice(member_ids)
+    amount = rng.randint(100, 50_000) / 100
+    if rng.random() >= percentage_share or len(member_ids) < 2:
+        return schemas.ExpenseCreate(
+            description=f"expense {index}", amount=amount, paid_by=paid_by, split_type="equal"
+        )
+
+    # Whole percentages over a random subset of members, summing to exactly 100
+    participants = rng.sample(member_ids, rng.randint(2, min(len(member_ids), 100)))
+    cuts = sorted(rng.sample(range(1, 100), len(participants) - 1))
+    percentages = [high - low for low, high in zip([0] + cuts, cuts + [100])]
+    return schemas.ExpenseCreate(
+        description=f"expense {index}",
+        amount=amount,
+        paid_by=paid_by,
+        split_type="percentage",
+        splits=dict(zip(participants, percentages))
+    )
+
+
+def seed(db, users: int = 1000, groups: int = 200, group_size=(3, 10),
+         expenses_per_group: int = 100, percentage_share: float = 0.3, seed: int = 42):
+    """
+    Insert a reproducible dataset and return {group_id: [member user ids]}.
+
+    Group sizes are drawn uniformly from the `group_size` (min, max) range;
+    `percentage_share` of the expenses use percentage splits, the rest equal.
+    """
+    rng = random.Random(seed)
+    offset = db.execute(select(func.count(models.User.id))).scalar()
+    user_ids = []
+    for start in range(0, users, BATCH_SIZE):
+        user_ids += db.execute(
+            insert(models.User).returning(models.User.id, sort_by_parameter_order=True),
+            [
+                {"username": f"user{offset + i:06d}", "email": f"user{offset + i:06d}@example.com"}
+                for i in range(start, min(start + BATCH_SIZE, users))
+            ]
+        ).scalars().all()
+    group_ids = db.execute(
+        insert(models.Group).returning(models.Group.id, sort_by_parameter_order=True),
+        [{"name": f"group{i:06d}"} for i in range(groups)]
+    ).scalars().all()
+
+    memberships = {
+        group_id: sorted(rng.sample(user_ids, min(len(user_ids), rng.randint(*group_size))))
+        for group_id in group_ids
+    }
+    db.execute(insert(models.group_users), [
+        {"group_id": group_id, "user_id": user_id}
+        for group_id, member_ids in memberships.items() for user_id in member_ids
+    ])
+    db.commit()
+
+    for group_id, member_ids in memberships.items():
+        expenses = [
+            random_expense(rng, member_ids, percentage_share, index) for index in range(expenses_per_group)
+        ]
+        for start in range(0, len(expenses), BATCH_SIZE):
+            crud.create_expenses_bulk(db, expenses[start:start + BATCH_SIZE], group_id)
+    return memberships
+
+
+def load_memberships(db):
+    """{group_id: [member user ids]} of an existing database."""
+    memberships = {}
+    rows = db.execute(
+        select(models.group_users.c.group_id, models.group_users.c.user_id)
+        .order_by(models.group_users.c.group_id, models.group_users.c.user_id)
+    )
+    for group_id, user_id in rows:
+        memberships.setdefault(group_id, []).append(user_id)
+    return memberships
+
+
+def add_arguments(parser):
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--groups", type=int, default=200)
+    parser.add_argument("--group-size", type=parse_range, default=(3, 10), help="Members per group, e.g. 5 or 3-10")
+    parser.add_argument("--expenses-per-group", type=int, default=100)
+    parser.add_argument("--percentage-share", type=float, default=0.3, help="Fraction of percentage splits")
+    parser.add_argument("--seed", type=int, default=42)
+
+
+def seed_from_args(db, args):
+    return seed(db, args.users, args.groups, args.group_size,
+                args.expenses_per_group, args.percentage_share, args.seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed a database with synthetic benchmark data")
+    parser.add_argument("--url", required=True, help="Database URL, e.g. sqlite:///bench.db")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.url)
+    migrate.upgrade(engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    try:
+        memberships = seed_from_args(db, args)
+    finally:
+        db.close()
+    members = sum(len(member_ids) for member_ids in memberships.values())
+    print(f"Seeded {args.users} users, {len(memberships)} groups ({members} memberships) "
+          f"and {len(memberships) * args.expenses_per_group} expenses")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Measure the cold import time of app.main.
+
+Usage (from the backend directory):
+    python benchmarks/startup_import.py [--runs 5] [--ref HEAD~1]
+
+Each run imports app.main in a fresh interpreter, once with the chat router
+enabled and once with ENABLE_CHAT=false, and the median wall time is reported.
+With --ref the backend directory at that git revision is exported to a
+temporary directory and measured the same way for comparison; older trees that
+connect to the database or the LLM at import time fail without one.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def time_import(backend_dir: str, env_overrides: dict, runs: int):
+    env = dict(os.environ, **env_overrides)
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", "import app.main"],
+            cwd=backend_dir, env=env, capture_output=True, text=True
+        )
+        elapsed = time.perf_counter() - started
+        if result.returncode != 0:
+            last_line = (result.stderr.strip().splitlines() or ["unknown error"])[-1]
+            return None, last_line
+        timings.append(elapsed)
+    return statistics.median(timings), None
+
+
+def export_ref(ref: str, target: str):
+    archive = subprocess.run(
+        ["git", "archive", ref, "."], cwd=BACKEND_DIR, capture_output=True, check=True
+    )
+    subprocess.run(["tar", "-x", "-C", target], input=archive.stdout, check=True)
+
+
+def report(label: str, backend_dir: str, runs: int):
+    for name, overrides in (("chat enabled", {}), ("chat disabled", {"ENABLE_CHAT": "false"})):
+        median, error = time_import(backend_dir, overrides, runs)
+        if error:
+            print(f"{label:>10} {name:<14} failed: {error}")
+        else:
+            print(f"{label:>10} {name:<14} median={median * 1000:.0f}ms over {runs} run(s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time a cold `import app.main`")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--ref", help="Also measure the backend at this git revision")
+    args = parser.parse_args(argv)
+
+    report("current", BACKEND_DIR, args.runs)
+    if args.ref:
+        with tempfile.TemporaryDirectory() as target:
+            export_ref(args.ref, target)
+            report(args.ref, target, args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Alembic environment for the Splitwise clone.
+
+Migrations run against the connection handed over by app.migrate when there
+is one, otherwise against sqlalchemy.url from alembic.ini or, by default,
+the application database configured in app.database.
+"""
+import os
+import sys
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import models  # noqa: F401 - registers the tables on Base
+from app.database import Base, URL_DATABASE
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def _configure(connection=None, url=None):
+    dialect = connection.dialect.name if connection is not None else url.split(":", 1)[0]
+    context.configure(
+        connection=connection,
+        url=url,
+        target_metadata=target_metadata,
+        # SQLite can only alter tables by copying them
+        render_as_batch=dialect.startswith("sqlite"),
+        compare_type=True,
+        literal_binds=connection is None,
+    )
+
+
+def run_migrations_offline():
+    _configure(url=config.get_main_option("sqlalchemy.url") or URL_DATABASE)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
+    engine = create_engine(config.get_main_option("sqlalchemy.url") or URL_DATABASE, poolclass=pool.NullPool)
+    with engine.connect() as connection:
+        _configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,111 @@
+"""Baseline schema: users, groups, expenses, splits, balance ledger and summaries
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18
+
+Databases created before migrations existed (by create_all) already have
+some or all of these tables, so each one is only created if it is missing.
+`python -m app.migrate` converts older column layouts before upgrading.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _create_table(name, *columns, indexes=()):
+    if sa.inspect(op.get_bind()).has_table(name):
+        return
+    op.create_table(name, *columns)
+    for index_name, index_columns, unique in indexes:
+        op.create_index(index_name, name, index_columns, unique=unique)
+
+
+def upgrade():
+    _create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("username", sa.String()),
+        sa.Column("email", sa.String()),
+        indexes=[
+            ("ix_users_id", ["id"], False),
+            ("ix_users_username", ["username"], False),
+            ("ix_users_email", ["email"], True),
+        ],
+    )
+    _create_table(
+        "groups",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String()),
+        indexes=[
+            ("ix_groups_id", ["id"], False),
+            ("ix_groups_name", ["name"], False),
+        ],
+    )
+    _create_table(
+        "group_users",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("group_id", sa.Integer(), sa.ForeignKey("groups.id"), primary_key=True),
+    )
+    _create_table(
+        "expenses",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("description", sa.String()),
+        sa.Column("amount_cents", sa.BigInteger(), nullable=False),
+        sa.Column("currency", sa.String(3), nullable=False),
+        sa.Column("paid_by", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("group_id", sa.Integer(), sa.ForeignKey("groups.id")),
+        sa.Column("split_type", sa.String()),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        indexes=[
+            ("ix_expenses_id", ["id"], False),
+            ("ix_expenses_description", ["description"], False),
+            ("ix_expenses_group_id_id", ["group_id", "id"], False),
+        ],
+    )
+    _create_table(
+        "expense_splits",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("expense_id", sa.Integer(), sa.ForeignKey("expenses.id")),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("amount_cents", sa.BigInteger(), nullable=False),
+        indexes=[("ix_expense_splits_id", ["id"], False)],
+    )
+    _create_table(
+        "group_user_balances",
+        sa.Column("group_id", sa.Integer(), sa.ForeignKey("groups.id"), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("balance_cents", sa.BigInteger(), nullable=False),
+    )
+    _create_table(
+        "group_summaries",
+        sa.Column("group_id", sa.Integer(), sa.ForeignKey("groups.id"), primary_key=True),
+        sa.Column("expense_count", sa.BigInteger(), nullable=False),
+        sa.Column("total_cents", sa.BigInteger(), nullable=False),
+    )
+    _create_table(
+        "user_summaries",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("paid_cents", sa.BigInteger(), nullable=False),
+        sa.Column("balance_cents", sa.BigInteger(), nullable=False),
+    )
+    _create_table(
+        "payer_period_spend",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("group_id", sa.Integer(), sa.ForeignKey("groups.id"), primary_key=True),
+        sa.Column("period", sa.String(7), primary_key=True),
+        sa.Column("expense_count", sa.BigInteger(), nullable=False),
+        sa.Column("total_cents", sa.BigInteger(), nullable=False),
+    )
+
+
+def downgrade():
+    for name in (
+        "payer_period_spend", "user_summaries", "group_summaries", "group_user_balances",
+        "expense_splits", "expenses", "group_users", "groups", "users",
+    ):
+        op.drop_table(name)
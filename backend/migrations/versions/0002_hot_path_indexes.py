@@ -0,0 +1,64 @@
+"""Indexes for the balance and expense hot paths, group_id on splits, created_at columns
+
+Revision ID: 0002_hot_path_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-18
+
+- group_users(group_id, user_id): member lookups by group (the primary key
+  starts with user_id)
+- expense_splits.group_id: copied from the expense so per-group split
+  aggregates no longer join expenses; indexed together with user_id
+- expense_splits(expense_id, user_id): splits of one expense
+- payer_period_spend(group_id): per-group spend reads
+- created_at on users and groups (expenses already have one)
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_hot_path_indexes"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_group_users_group_id_user_id", "group_users", ["group_id", "user_id"])
+
+    with op.batch_alter_table("expense_splits") as batch:
+        batch.add_column(sa.Column("group_id", sa.Integer(), nullable=True))
+    op.execute(
+        "UPDATE expense_splits SET group_id = ("
+        "  SELECT expenses.group_id FROM expenses WHERE expenses.id = expense_splits.expense_id"
+        ")"
+    )
+    # Splits of expenses without a group cannot be attributed to any balance
+    op.execute("DELETE FROM expense_splits WHERE group_id IS NULL")
+    with op.batch_alter_table("expense_splits") as batch:
+        batch.alter_column("group_id", existing_type=sa.Integer(), nullable=False)
+        batch.create_foreign_key("fk_expense_splits_group_id_groups", "groups", ["group_id"], ["id"])
+        batch.create_index("ix_expense_splits_expense_id_user_id", ["expense_id", "user_id"])
+        batch.create_index("ix_expense_splits_group_id_user_id", ["group_id", "user_id"])
+
+    op.create_index("ix_payer_period_spend_group_id", "payer_period_spend", ["group_id"])
+
+    for table in ("users", "groups"):
+        with op.batch_alter_table(table) as batch:
+            batch.add_column(sa.Column(
+                "created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()
+            ))
+
+
+def downgrade():
+    for table in ("users", "groups"):
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column("created_at")
+
+    op.drop_index("ix_payer_period_spend_group_id", table_name="payer_period_spend")
+
+    with op.batch_alter_table("expense_splits") as batch:
+        batch.drop_index("ix_expense_splits_group_id_user_id")
+        batch.drop_index("ix_expense_splits_expense_id_user_id")
+        batch.drop_constraint("fk_expense_splits_group_id_groups", type_="foreignkey")
+        batch.drop_column("group_id")
+
+    op.drop_index("ix_group_users_group_id_user_id", table_name="group_users")
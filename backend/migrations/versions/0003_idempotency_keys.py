@@ -0,0 +1,32 @@
+"""Idempotency keys of expense creation requests
+
+Revision ID: 0003_idempotency_keys
+Revises: 0002_hot_path_indexes
+Create Date: 2026-10-18
+
+- idempotency_keys: stored responses of keyed POST /groups/{id}/expenses
+  requests, indexed on created_at for purging expired keys
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_idempotency_keys"
+down_revision = "0002_hot_path_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("key", sa.String(255), primary_key=True),
+        sa.Column("request_hash", sa.String(64), nullable=False),
+        sa.Column("response_body", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_idempotency_keys_created_at", "idempotency_keys", ["created_at"])
+
+
+def downgrade():
+    op.drop_index("ix_idempotency_keys_created_at", table_name="idempotency_keys")
+    op.drop_table("idempotency_keys")
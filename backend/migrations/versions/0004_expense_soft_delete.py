@@ -0,0 +1,30 @@
+"""Soft-deleted expenses
+
+Revision ID: 0004_expense_soft_delete
+Revises: 0003_idempotency_keys
+Create Date: 2026-10-18
+
+- expenses.deleted_at: set by DELETE /groups/{id}/expenses/{expense_id};
+  indexed for the compaction of old soft-deleted rows
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_expense_soft_delete"
+down_revision = "0003_idempotency_keys"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("expenses") as batch:
+        batch.add_column(sa.Column("deleted_at", sa.DateTime(), nullable=True))
+        batch.create_index("ix_expenses_deleted_at", ["deleted_at"])
+
+
+def downgrade():
+    # Soft-deleted expenses have no splits left, so they cannot be restored
+    op.execute("DELETE FROM expenses WHERE deleted_at IS NOT NULL")
+    with op.batch_alter_table("expenses") as batch:
+        batch.drop_index("ix_expenses_deleted_at")
+        batch.drop_column("deleted_at")
@@ -0,0 +1,40 @@
+"""Per-group change feed
+
+Revision ID: 0005_group_change_feed
+Revises: 0004_expense_soft_delete
+Create Date: 2026-10-18
+
+- groups.event_seq: last sequence number handed out to the group's events
+- group_events: ordered event log per group, keyed by (group_id, seq);
+  created_at is indexed for trimming old events
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005_group_change_feed"
+down_revision = "0004_expense_soft_delete"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("groups") as batch:
+        batch.add_column(sa.Column("event_seq", sa.BigInteger(), nullable=False, server_default="0"))
+
+    op.create_table(
+        "group_events",
+        sa.Column("group_id", sa.Integer(), sa.ForeignKey("groups.id"), primary_key=True),
+        sa.Column("seq", sa.BigInteger(), primary_key=True),
+        sa.Column("type", sa.String(32), nullable=False),
+        sa.Column("expense_id", sa.Integer(), nullable=True),
+        sa.Column("data", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_group_events_created_at", "group_events", ["created_at"])
+
+
+def downgrade():
+    op.drop_index("ix_group_events_created_at", table_name="group_events")
+    op.drop_table("group_events")
+    with op.batch_alter_table("groups") as batch:
+        batch.drop_column("event_seq")
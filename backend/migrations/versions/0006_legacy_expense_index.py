@@ -0,0 +1,30 @@
+"""Add the (group_id, id) expenses index to databases that predate Alembic
+
+Revision ID: 0006_legacy_expense_index
+Revises: 0005_group_change_feed
+Create Date: 2026-10-18
+
+0001_baseline skips tables that already exist, so on a database created by
+create_all the indexes it declares for those tables were never added. The
+others match what create_all created; ix_expenses_group_id_id did not exist
+then, and keyset-paginated expense lists need it. Created only if missing,
+so new databases (which got it from 0001) are left alone.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_legacy_expense_index"
+down_revision = "0005_group_change_feed"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    indexes = sa.inspect(op.get_bind()).get_indexes("expenses")
+    if not any(index["column_names"] == ["group_id", "id"] for index in indexes):
+        op.create_index("ix_expenses_group_id_id", "expenses", ["group_id", "id"])
+
+
+def downgrade():
+    # The index belongs to the baseline schema; 0001_baseline owns it
+    pass
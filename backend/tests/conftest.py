@@ -0,0 +1,58 @@
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import migrate
+from app.cache import balance_cache
+from app.database import get_async_db, get_db
+from app.main import app
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """A scratch SQLite database migrated to head."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    migrate.upgrade(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine, autoflush=False)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client(engine, db):
+    async_engine = create_async_engine(str(engine.url).replace("sqlite://", "sqlite+aiosqlite://"))
+    sessions = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    sync_sessions = sessionmaker(bind=engine, autoflush=False)
+
+    async def get_test_async_db():
+        async with sessions() as session:
+            yield session
+
+    def get_test_db():
+        session = sync_sessions()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_async_db] = get_test_async_db
+    app.dependency_overrides[get_db] = get_test_db
+    balance_cache.clear()
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_async_db)
+    app.dependency_overrides.pop(get_db)
+    balance_cache.clear()
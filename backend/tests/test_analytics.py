@@ -0,0 +1,76 @@
+from datetime import datetime
+
+import pytest
+
+from app import crud, schemas
+
+
+class FrozenDatetime(datetime):
+    @classmethod
+    def utcnow(cls):
+        return cls.frozen
+
+
+@pytest.fixture
+def group_ids(db, monkeypatch):
+    monkeypatch.setattr(crud, "datetime", FrozenDatetime)
+    FrozenDatetime.frozen = datetime(2026, 1, 31, 23, 59)
+    for name in ("ana", "ben", "cyd"):
+        crud.create_user(db, schemas.UserCreate(username=name, email=f"{name}@example.com"))
+    trip = crud.create_group(db, schemas.GroupCreate(name="trip", user_ids=[1, 2, 3]))["id"]
+    flat = crud.create_group(db, schemas.GroupCreate(name="flat", user_ids=[2, 3]))["id"]
+    crud.create_group(db, schemas.GroupCreate(name="empty", user_ids=[1]))
+
+    expense = crud.create_expense(db, schemas.ExpenseCreate(
+        description="taxi", amount=30, paid_by=1, split_type="equal"
+    ), trip)
+    crud.create_expense(db, schemas.ExpenseCreate(
+        description="hotel", amount=100.01, paid_by=2, split_type="percentage", splits={1: 20, 2: 30, 3: 50}
+    ), trip)
+    FrozenDatetime.frozen = datetime(2026, 2, 1, 0, 0)
+    crud.create_expense(db, schemas.ExpenseCreate(
+        description="rent", amount=50, paid_by=3, split_type="equal"
+    ), flat)
+    crud.create_expense(db, schemas.ExpenseCreate(
+        description="dinner", amount=12.34, paid_by=1, split_type="equal"
+    ), trip)
+    crud.update_expense(db, trip, expense.id, schemas.ExpenseUpdate(paid_by=2))
+    return trip, flat
+
+
+def _analytics(client):
+    urls = ["/analytics/groups", "/analytics/groups/1", "/analytics/spend"]
+    urls += [f"/analytics/users/{user_id}" for user_id in (1, 2, 3)]
+    return {url: client.get(url).json() for url in urls}
+
+
+def test_endpoints_match_rebuilt_summaries(client, db, group_ids):
+    maintained = _analytics(client)
+    crud.rebuild_summaries(db)
+    assert _analytics(client) == maintained
+
+
+def test_summary_values(client, group_ids):
+    trip, flat = group_ids
+    assert client.get(f"/analytics/groups/{trip}").json() == {
+        "group_id": trip, "group_name": "trip", "expense_count": 3, "total_cents": 14235
+    }
+    assert client.get("/analytics/groups").json()[-1] == {
+        "group_id": 3, "group_name": "empty", "expense_count": 0, "total_cents": 0
+    }
+    # ana paid 12.34 and took 10 (taxi) + 20.00 (20% of the hotel) + 4.12 (dinner)
+    assert client.get("/analytics/users/1").json() == {
+        "user_id": 1, "username": "ana", "paid_cents": 1234, "share_cents": 3412, "balance_cents": 2178
+    }
+    spend = client.get("/analytics/spend", params={"group_id": trip}).json()
+    assert [(row["period"], row["user_id"], row["expense_count"], row["total_cents"]) for row in spend] == [
+        ("2026-01", 2, 2, 13001), ("2026-02", 1, 1, 1234)
+    ]
+    spend = client.get("/analytics/spend", params={"period_from": "2026-02", "user_id": 3}).json()
+    assert [(row["group_id"], row["total_cents"]) for row in spend] == [(flat, 5000)]
+
+
+def test_unknown_ids_and_bad_periods_are_rejected(client, group_ids):
+    assert client.get("/analytics/groups/999").status_code == 404
+    assert client.get("/analytics/users/999").status_code == 404
+    assert client.get("/analytics/spend", params={"period_from": "2026-1"}).status_code == 422
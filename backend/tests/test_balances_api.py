@@ -0,0 +1,36 @@
+import pytest
+
+from app import crud, schemas
+from app.cache import balance_cache
+
+
+@pytest.fixture
+def group_ids(db):
+    for name in ("ana", "ben", "cyd"):
+        crud.create_user(db, schemas.UserCreate(username=name, email=f"{name}@example.com"))
+    trip = crud.create_group(db, schemas.GroupCreate(name="trip", user_ids=[1, 2]))["id"]
+    flat = crud.create_group(db, schemas.GroupCreate(name="flat", user_ids=[2, 3]))["id"]
+    crud.create_expense(db, schemas.ExpenseCreate(description="taxi", amount=30, paid_by=1, split_type="equal"), trip)
+    crud.create_expense(db, schemas.ExpenseCreate(description="rent", amount=30, paid_by=2, split_type="equal"), flat)
+    return [trip, flat]
+
+
+def test_simplified_debts_across_groups(client, group_ids):
+    response = client.get("/balances/simplified", params={"group_ids": group_ids})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["group_ids"] == group_ids
+    assert body["transfers_before"] == 2
+    # cyd owes ben 15 and ben owes ana 15: cyd pays ana directly
+    assert [(t["from_user_id"], t["to_user_id"], t["amount"]) for t in body["transfers"]] == [(3, 1, 15)]
+
+
+def test_unknown_group_is_not_found_and_not_cached(client, group_ids):
+    response = client.get("/balances/simplified", params={"group_ids": group_ids + [999]})
+    assert response.status_code == 404
+    assert balance_cache.get_group(999) is None
+
+
+def test_repeated_group_ids_are_rejected(client, group_ids):
+    response = client.get("/balances/simplified", params={"group_ids": [group_ids[0], group_ids[0]]})
+    assert response.status_code == 400
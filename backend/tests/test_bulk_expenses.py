@@ -0,0 +1,69 @@
+import pytest
+from sqlalchemy import func, select
+
+from app import crud, ledger, models, schemas
+
+
+@pytest.fixture
+def group_id(db):
+    for name in ("ana", "ben", "cyd"):
+        crud.create_user(db, schemas.UserCreate(username=name, email=f"{name}@example.com"))
+    return crud.create_group(db, schemas.GroupCreate(name="trip", user_ids=[1, 2]))["id"]
+
+
+def _expense(**fields):
+    return {"description": "taxi", "amount": 30, "paid_by": 1, "split_type": "equal", **fields}
+
+
+def _count(db, model):
+    db.expire_all()
+    return db.execute(select(func.count()).select_from(model)).scalar()
+
+
+def test_invalid_items_are_reported_and_the_rest_created(client, db, group_id):
+    response = client.post(f"/groups/{group_id}/expenses/bulk", json=[
+        _expense(),
+        _expense(paid_by=3),
+        _expense(split_type="percentage", splits={"1": 60, "2": 40}),
+        _expense(split_type="percentage", splits={"1": 60, "2": 30}),
+        _expense(split_type="shares"),
+    ])
+    assert response.status_code == 200
+    body = response.json()
+    assert [expense["description"] for expense in body["created"]] == ["taxi", "taxi"]
+    assert [error["index"] for error in body["errors"]] == [1, 3, 4]
+    assert body["errors"][0]["detail"] == "Payer 3 is not a member of this group"
+
+    created_ids = [expense["id"] for expense in body["created"]]
+    assert [expense["id"] for expense in crud.get_expenses_by_group(db, group_id)] == created_ids
+    assert _count(db, models.ExpenseSplit) == 4
+    assert ledger.find_drift(db) == []
+    # One change feed event for the whole batch
+    assert [event["expense_count"] for event in crud.get_group_events(db, group_id)] == [2]
+
+
+def test_a_batch_without_valid_items_writes_nothing(client, db, group_id):
+    body = client.post(f"/groups/{group_id}/expenses/bulk", json=[_expense(paid_by=3)]).json()
+    assert body["created"] == [] and len(body["errors"]) == 1
+    assert _count(db, models.Expense) == 0
+    assert crud.get_group_events(db, group_id) == []
+
+
+def test_unknown_group_is_rejected(client, group_id):
+    response = client.post("/groups/999/expenses/bulk", json=[_expense()])
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Group not found"
+
+
+def test_batch_is_atomic(db, group_id, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("summary write failed")
+
+    # Expenses, splits and ledger rows are already written when the summaries fail
+    monkeypatch.setattr(crud, "apply_summary_deltas", fail)
+    with pytest.raises(RuntimeError):
+        crud.create_expenses_bulk(db, [schemas.ExpenseCreate(**_expense())] * 3, group_id)
+    db.rollback()
+    assert _count(db, models.Expense) == 0
+    assert _count(db, models.ExpenseSplit) == 0
+    assert _count(db, models.GroupUserBalance) == 0
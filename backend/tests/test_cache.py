@@ -0,0 +1,91 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, schemas
+from app.cache import BalanceCache, InMemoryBackend, balance_cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_and_evict_least_recently_used():
+    clock = FakeClock()
+    backend = InMemoryBackend(max_entries=2, clock=clock)
+    backend.set("a", 1, ttl=10)
+    backend.set("b", 2, ttl=10)
+    assert backend.get("a") == 1
+    backend.set("c", 3, ttl=10)
+    assert backend.get("b") is None
+    clock.now = 10
+    assert backend.get("a") is None and backend.get("c") is None
+
+
+def test_set_is_dropped_after_an_invalidation():
+    cache = BalanceCache(InMemoryBackend())
+    generation = cache.generation(1)
+    cache.invalidate_group(1)
+    cache.set_group(1, {"stale": True}, generation)
+    assert cache.get_group(1) is None
+
+    generation = cache.generation(1)
+    cache.clear()
+    cache.set_group(1, {"stale": True}, generation)
+    assert cache.get_group(1) is None
+
+    # Other groups' invalidations do not matter
+    generation = cache.generation(1)
+    cache.invalidate_group(2)
+    cache.set_group(1, {"fresh": True}, generation)
+    assert cache.get_group(1) == {"fresh": True}
+
+
+@pytest.fixture
+def group_id(db):
+    balance_cache.clear()
+    for name in ("ana", "ben"):
+        crud.create_user(db, schemas.UserCreate(username=name, email=f"{name}@example.com"))
+    group_id = crud.create_group(db, schemas.GroupCreate(name="trip", user_ids=[1, 2]))["id"]
+    yield group_id
+    balance_cache.clear()
+
+
+def _expense(amount):
+    return schemas.ExpenseCreate(description="taxi", amount=amount, paid_by=1, split_type="equal")
+
+
+def test_read_racing_a_write_does_not_cache_stale_balances(engine, db, group_id):
+    writer = sessionmaker(bind=engine, autoflush=False)()
+    writes = []
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def write_after_the_ledger_read(conn, cursor, statement, parameters, context, executemany):
+        if "FROM group_user_balances" in statement and not writes:
+            writes.append(crud.create_expense(writer, _expense(30), group_id))
+
+    stale = crud.get_net_balances(db, [group_id])[group_id]
+    event.remove(engine, "after_cursor_execute", write_after_the_ledger_read)
+    writer.close()
+    assert stale == {} and writes
+    assert balance_cache.get_group(group_id) is None
+    assert crud.get_net_balances(db, [group_id])[group_id] == {1: (-1500, "ana"), 2: (1500, "ben")}
+
+
+def test_counters_track_hits_misses_and_invalidations(db, group_id):
+    balance_cache.hits = balance_cache.misses = 0
+    crud.get_group_balances(db, group_id)
+    crud.get_group_balances(db, group_id)
+    assert (balance_cache.hits, balance_cache.misses) == (1, 1)
+
+    invalidations = balance_cache.invalidations
+    crud.create_expense(db, _expense(10), group_id)
+    assert balance_cache.invalidations == invalidations + 1
+    assert crud.get_group_balances(db, group_id)["balances"][0]["amount"] == 5
+    stats = balance_cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 1)
+    assert stats["hit_ratio"] == pytest.approx(1 / 3)
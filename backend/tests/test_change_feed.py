@@ -0,0 +1,133 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+from starlette.requests import Request
+
+from api import events
+from app import crud, models, schemas
+from app.change_feed import ChangeFeed, InMemoryPubSub, change_feed
+from app.main import app
+
+
+def _expense(paid_by=1):
+    return schemas.ExpenseCreate(description="taxi", amount=30, paid_by=paid_by, split_type="equal")
+
+
+@pytest.fixture
+def group_ids(db):
+    for name in ("ana", "ben"):
+        crud.create_user(db, schemas.UserCreate(username=name, email=f"{name}@example.com"))
+    return [crud.create_group(db, schemas.GroupCreate(name=name, user_ids=[1, 2]))["id"] for name in ("trip", "flat")]
+
+
+def test_sequence_numbers_count_per_group(db, group_ids):
+    trip, flat = group_ids
+    for group_id in (trip, flat, trip, trip, flat):
+        crud.create_expense(db, _expense(), group_id)
+    expense_id = crud.get_expenses_by_group(db, trip)[0]["id"]
+    crud.delete_expense(db, trip, expense_id)
+
+    trip_events = crud.get_group_events(db, trip)
+    assert [event["seq"] for event in trip_events] == [1, 2, 3, 4]
+    assert [event["type"] for event in trip_events][-1] == "expense_deleted"
+    assert trip_events[-1]["balance_deltas"] == {"1": 1500, "2": -1500}
+    assert [event["seq"] for event in crud.get_group_events(db, flat)] == [1, 2]
+    assert crud.get_group_event_seq(db, trip) == 4
+
+
+def test_events_resume_after_a_sequence_number(client, db, group_ids):
+    trip = group_ids[0]
+    for _ in range(5):
+        crud.create_expense(db, _expense(), trip)
+    assert [event["seq"] for event in crud.get_group_events(db, trip, after_seq=2, limit=2)] == [3, 4]
+
+    response = client.get(f"/groups/{trip}/events", params={"after": 3})
+    assert [event["seq"] for event in response.json()] == [4, 5]
+    assert client.get("/groups/999/events").status_code == 404
+
+
+def test_compaction_removes_old_events(db, group_ids):
+    trip = group_ids[0]
+    for _ in range(3):
+        crud.create_expense(db, _expense(), trip)
+    long_ago = datetime.utcnow() - timedelta(days=30)
+    db.execute(update(models.GroupEvent).where(models.GroupEvent.seq < 3).values(created_at=long_ago))
+    db.commit()
+
+    cutoff = datetime.utcnow() - timedelta(days=7)
+    assert crud.compact_group_events(db, cutoff, dry_run=True) == 2
+    assert crud.compact_group_events(db, cutoff) == 2
+    assert [event["seq"] for event in crud.get_group_events(db, trip)] == [3]
+    # Sequence numbers keep counting after compaction
+    crud.create_expense(db, _expense(), trip)
+    assert crud.get_group_event_seq(db, trip) == 4
+
+
+def test_in_memory_pubsub_fans_out_per_channel():
+    async def deliver():
+        feed = ChangeFeed(InMemoryPubSub())
+        trip, other_trip, flat = feed.subscribe(1), feed.subscribe(1), feed.subscribe(2)
+        feed.publish({"group_id": 1, "seq": 1}, {"group_id": 2, "seq": 1})
+        received = [await trip.get(1), await other_trip.get(1), await flat.get(1), await flat.get(0.01)]
+        for subscription in (trip, other_trip, flat):
+            subscription.close()
+        return received, feed.backend.subscriber_count()
+
+    received, subscribers = asyncio.run(deliver())
+    assert received == [{"group_id": 1, "seq": 1}, {"group_id": 1, "seq": 1}, {"group_id": 2, "seq": 1}, None]
+    assert subscribers == 0
+
+
+def _stream_request():
+    async def receive():
+        await asyncio.Event().wait()  # The client never disconnects
+    return Request({"type": "http", "app": app, "method": "GET", "headers": []}, receive)
+
+
+def _parse(message: str):
+    fields = dict(line.split(": ", 1) for line in message.strip().splitlines())
+    return fields["event"], json.loads(fields["data"])
+
+
+def test_stream_replays_then_delivers_live_events(client, db, group_ids):
+    trip = group_ids[0]
+    crud.create_expense(db, _expense(), trip)
+    crud.create_expense(db, _expense(paid_by=2), trip)
+
+    async def read_stream():
+        request = _stream_request()
+        async with events._session_scope(request) as session:
+            response = await events.stream_group_events(request, trip, after=1, last_event_id=None, db=session)
+        messages = response.body_iterator
+        replayed = _parse(await messages.__anext__())
+        # Committed and published while the stream waits on the change feed
+        crud.create_expense(db, _expense(), trip)
+        live = _parse(await messages.__anext__())
+        await messages.aclose()
+        return replayed, live
+
+    replayed, live = asyncio.run(read_stream())
+    assert replayed[0] == "expense_created" and replayed[1]["seq"] == 2
+    assert live[0] == "expense_created" and live[1]["seq"] == 3
+    assert live[1]["balance_deltas"] == {"1": -1500, "2": 1500}
+    assert change_feed.backend.subscriber_count() == 0
+
+
+def test_stream_without_a_position_starts_at_the_head(client, db, group_ids):
+    trip = group_ids[0]
+    crud.create_expense(db, _expense(), trip)
+
+    async def first_message():
+        request = _stream_request()
+        async with events._session_scope(request) as session:
+            response = await events.stream_group_events(request, trip, after=None, last_event_id=None, db=session)
+        message = await response.body_iterator.__anext__()
+        await response.body_iterator.aclose()
+        return message
+
+    message = asyncio.run(first_message())
+    assert message.startswith("id: 1\n")
+    assert _parse(message) == ("ready", {"group_id": trip, "seq": 1})
@@ -0,0 +1,82 @@
+import asyncio
+
+from langchain_core.messages import AIMessage
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, migrate, schemas
+from chat import chatbot, sql_guard
+
+
+class FakeLLM:
+    """Answers the SQL step with a fixed query and records every prompt."""
+
+    def __init__(self, query: str):
+        self.query = query
+        self.sql_prompts = []
+        self.answer_prompts = []
+
+    def with_structured_output(self, schema):
+        return self
+
+    async def ainvoke(self, prompt):
+        if isinstance(prompt, str):
+            self.answer_prompts.append(prompt)
+            return AIMessage(content="There are some expenses.")
+        self.sql_prompts.append(prompt.to_string())
+        return {"query": self.query}
+
+
+def _use_chat(engine, llm, monkeypatch):
+    monkeypatch.setattr(sql_guard, "_engine", engine)
+    for name in ("_llm", "_db", "_db_injected", "_graph"):
+        monkeypatch.setattr(chatbot, name, getattr(chatbot, name))
+    chatbot._db = None
+    chatbot.configure(llm=llm)
+
+
+def test_migration_refreshes_the_cached_schema(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'chat.db'}")
+    migrate.upgrade(engine, "0004_expense_soft_delete")
+    llm = FakeLLM("SELECT COUNT(*) FROM expenses")
+    _use_chat(engine, llm, monkeypatch)
+
+    async def ask_twice():
+        await chatbot.process_chat_question("How many expenses are there?")
+        await chatbot.process_chat_question("how many expenses are there")
+    asyncio.run(ask_twice())
+    # The second question was answered from the caches
+    assert len(llm.sql_prompts) == 1
+    assert "CREATE TABLE expenses" in llm.sql_prompts[0]
+    assert "group_events" not in llm.sql_prompts[0]
+
+    assert "0006_legacy_expense_index" in migrate.migrate_database(bind=engine)
+    asyncio.run(chatbot.process_chat_question("How many expenses are there?"))
+    assert len(llm.sql_prompts) == 2
+    assert "CREATE TABLE group_events" in llm.sql_prompts[1]
+
+    chatbot.invalidate_schema_cache()
+    engine.dispose()
+
+
+def test_any_write_refreshes_cached_results(engine, db, monkeypatch):
+    llm = FakeLLM("SELECT COUNT(*) FROM users")
+    _use_chat(engine, llm, monkeypatch)
+    queries = []
+    run_query = chatbot.run_query
+    monkeypatch.setattr(chatbot, "run_query", lambda query: queries.append(query) or run_query(query))
+
+    def ask():
+        asyncio.run(chatbot.process_chat_question("How many users are there?"))
+        return llm.answer_prompts[-1].rsplit("SQL Result: ", 1)[1]
+
+    assert ask() == "[(0,)]"
+    crud.create_user(db, schemas.UserCreate(username="ana", email="ana@example.com"))
+    assert ask() == "[(1,)]"
+    assert ask() == "[(1,)]"
+    assert len(queries) == 2
+    # Group creation touches no balances but still moves the data version
+    crud.create_group(db, schemas.GroupCreate(name="trip", user_ids=[1]))
+    ask()
+    assert len(queries) == 3
+    chatbot.invalidate_schema_cache()
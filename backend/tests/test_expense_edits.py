@@ -0,0 +1,100 @@
+import pytest
+from sqlalchemy import select
+
+from app import crud, ledger, models, schemas
+
+SUMMARY_TABLES = (models.GroupSummary, models.UserSummary, models.PayerPeriodSpend)
+
+
+def _summaries(db):
+    """Every summary row as a tuple, leaving out all-zero rows a rebuild would not write."""
+    db.expire_all()
+    snapshot = {}
+    for model in SUMMARY_TABLES:
+        columns = list(model.__table__.columns)
+        rows = db.execute(select(*columns).order_by(*model.__table__.primary_key.columns)).all()
+        snapshot[model.__tablename__] = [
+            tuple(row) for row in rows
+            if any(row[index] for index, column in enumerate(columns) if not column.primary_key)
+        ]
+    return snapshot
+
+
+def _splits(db, expense_id):
+    db.expire_all()
+    return {row.user_id: row.amount_cents for row in crud._load_splits(db, expense_id)}
+
+
+@pytest.fixture
+def group_id(db):
+    for name in ("ana", "ben", "cyd", "dev"):
+        crud.create_user(db, schemas.UserCreate(username=name, email=f"{name}@example.com"))
+    return crud.create_group(db, schemas.GroupCreate(name="trip", user_ids=[1, 2, 3]))["id"]
+
+
+def _add_member(db, group_id, user_id):
+    group = db.get(models.Group, group_id)
+    group.users.append(db.get(models.User, user_id))
+    db.commit()
+
+
+def test_amount_edit_keeps_the_participants(client, db, group_id):
+    expense = client.post(f"/groups/{group_id}/expenses/", json={
+        "description": "taxi", "amount": 30, "paid_by": 1, "split_type": "equal", "splits": {"1": 1, "2": 1}
+    }).json()
+    _add_member(db, group_id, 4)
+
+    response = client.patch(f"/groups/{group_id}/expenses/{expense['id']}", json={"amount": 20})
+    assert response.status_code == 200
+    assert _splits(db, expense["id"]) == {1: -1000, 2: 1000}
+
+    client.patch(f"/groups/{group_id}/expenses/{expense['id']}", json={
+        "split_type": "percentage", "splits": {"2": 25, "3": 75}
+    })
+    assert _splits(db, expense["id"]) == {1: -2000, 2: 500, 3: 1500}
+    # Switching back to an equal split keeps the percentage expense's participants
+    client.patch(f"/groups/{group_id}/expenses/{expense['id']}", json={"split_type": "equal"})
+    assert _splits(db, expense["id"]) == {1: -2000, 2: 1000, 3: 1000}
+    assert ledger.find_drift(db) == []
+
+
+def test_payer_change_drops_the_old_payers_row(client, db, group_id):
+    expense = client.post(f"/groups/{group_id}/expenses/", json={
+        "description": "hotel", "amount": 90, "paid_by": 1, "split_type": "percentage",
+        "splits": {"2": 50, "3": 50}
+    }).json()
+
+    client.patch(f"/groups/{group_id}/expenses/{expense['id']}", json={"paid_by": 2})
+    assert _splits(db, expense["id"]) == {2: -4500, 3: 4500}
+    assert ledger.find_drift(db) == []
+
+
+def test_edits_and_deletes_keep_ledger_and_summaries_exact(client, db, group_id):
+    expense_ids = [
+        client.post(f"/groups/{group_id}/expenses/", json=body).json()["id"]
+        for body in (
+            {"description": "taxi", "amount": 10, "paid_by": 1, "split_type": "equal"},
+            {"description": "hotel", "amount": 100.01, "paid_by": 2, "split_type": "percentage",
+             "splits": {"1": 20, "2": 30, "3": 50}},
+            {"description": "dinner", "amount": 45.5, "paid_by": 3, "split_type": "equal"},
+        )
+    ]
+    edits = [
+        {"amount": 12.34},
+        {"paid_by": 3},
+        {"split_type": "percentage", "splits": {"1": 60, "3": 40}},
+        {"description": "renamed"},
+    ]
+    for expense_id, changes in zip(expense_ids + expense_ids[:1], edits):
+        response = client.patch(f"/groups/{group_id}/expenses/{expense_id}", json=changes)
+        assert response.status_code == 200
+        assert ledger.find_drift(db) == []
+
+    assert client.delete(f"/groups/{group_id}/expenses/{expense_ids[1]}").status_code == 204
+    assert client.delete(f"/groups/{group_id}/expenses/{expense_ids[1]}").status_code == 404
+    assert client.patch(f"/groups/{group_id}/expenses/{expense_ids[1]}", json={"amount": 1}).status_code == 404
+    assert ledger.find_drift(db) == []
+
+    maintained = _summaries(db)
+    crud.rebuild_summaries(db)
+    assert maintained == _summaries(db)
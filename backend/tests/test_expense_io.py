@@ -0,0 +1,90 @@
+import io
+
+import pytest
+from hypothesis import HealthCheck, given, settings, strategies as st
+
+from app import crud, expense_io, models, schemas
+
+MEMBERS = [1, 2, 3, 4]
+
+expenses = st.lists(
+    st.tuples(
+        st.integers(min_value=1, max_value=10**9),
+        st.sampled_from(MEMBERS[:3]),
+        st.one_of(
+            st.none(),  # equal
+            st.lists(st.integers(min_value=0, max_value=1000), min_size=3, max_size=3).filter(any),
+        ),
+    ),
+    min_size=1, max_size=10,
+)
+
+
+def _splits_by_expense(db, group_id):
+    return [
+        {user_id: amount_cents for user_id, amount_cents in row["splits"]}
+        for row in crud.stream_expenses_by_group(db, group_id, with_splits=True)
+    ]
+
+
+@pytest.fixture
+def users(db):
+    for user_id in MEMBERS:
+        crud.create_user(db, schemas.UserCreate(username=f"user{user_id}", email=f"user{user_id}@example.com"))
+    return MEMBERS
+
+
+@pytest.mark.parametrize("format", expense_io.FORMATS)
+@settings(deadline=None, max_examples=25, suppress_health_check=[HealthCheck.function_scoped_fixture])
+@given(expense_rows=expenses)
+def test_export_round_trips_splits(db, users, format, expense_rows):
+    source = crud.create_group(db, schemas.GroupCreate(name="source", user_ids=users[:3]))["id"]
+    for amount_cents, paid_by, weights in expense_rows:
+        splits = None
+        if weights is not None:
+            splits = {user_id: weight * 100 / sum(weights) for user_id, weight in zip(users, weights)}
+        crud.create_expense(db, schemas.ExpenseCreate(
+            description="x", amount=amount_cents / 100, paid_by=paid_by,
+            split_type="percentage" if splits else "equal", splits=splits
+        ), source)
+    # Equal expenses must keep their participants when the members change
+    group = db.get(models.Group, source)
+    group.users.append(db.get(models.User, users[3]))
+    db.commit()
+
+    exported = "".join(expense_io.ENCODERS[format](crud.stream_expenses_by_group(db, source, with_splits=True)))
+    records = list(expense_io.read_expenses(io.BytesIO(exported.encode()), format))
+    assert all(isinstance(record, schemas.ExpenseCreate) for _, record in records)
+
+    target = crud.create_group(db, schemas.GroupCreate(name="target", user_ids=users))["id"]
+    result = crud.create_expenses_bulk(db, [record for _, record in records], target)
+    assert result["errors"] == []
+    assert _splits_by_expense(db, target) == _splits_by_expense(db, source)
+
+
+@pytest.mark.parametrize("format", expense_io.FORMATS)
+def test_export_endpoint_streams_from_the_apps_session(client, db, users, format):
+    source = crud.create_group(db, schemas.GroupCreate(name="source", user_ids=users[:3]))["id"]
+    crud.create_expense(db, schemas.ExpenseCreate(
+        description="taxi", amount=10, paid_by=1, split_type="equal"
+    ), source)
+    crud.create_expense(db, schemas.ExpenseCreate(
+        description="hotel", amount=100.01, paid_by=2, split_type="percentage", splits={1: 20, 2: 30, 3: 50}
+    ), source)
+
+    # The stream reads through the overridden get_db, so it sees the test database
+    response = client.get(f"/groups/{source}/expenses/export", params={"format": format})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(expense_io.MEDIA_TYPES[format])
+
+    target = crud.create_group(db, schemas.GroupCreate(name="target", user_ids=users[:3]))["id"]
+    response = client.post(
+        f"/groups/{target}/expenses/import", params={"format": format},
+        files={"file": (f"expenses.{format}", response.content)}
+    )
+    assert response.status_code == 200
+    assert _splits_by_expense(db, target) == _splits_by_expense(db, source)
+
+
+def test_export_of_unknown_group_is_rejected(client, users):
+    assert client.get("/groups/999/expenses/export").status_code == 404
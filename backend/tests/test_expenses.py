@@ -0,0 +1,45 @@
+import pytest
+
+from app import crud, ledger, schemas
+
+
+@pytest.fixture
+def group_id(db):
+    for name in ("ana", "ben", "cyd"):
+        crud.create_user(db, schemas.UserCreate(username=name, email=f"{name}@example.com"))
+    return crud.create_group(db, schemas.GroupCreate(name="trip", user_ids=[1, 2, 3]))["id"]
+
+
+def _expense(**fields):
+    return {"description": "taxi", "amount": 30, "paid_by": 1, "split_type": "equal", **fields}
+
+
+def test_amounts_that_round_to_zero_cents_are_rejected(client, group_id):
+    response = client.post(f"/groups/{group_id}/expenses/", json=_expense(amount=0.004))
+    assert response.status_code == 400
+    expense_id = client.post(f"/groups/{group_id}/expenses/", json=_expense()).json()["id"]
+    assert client.patch(f"/groups/{group_id}/expenses/{expense_id}", json={"amount": 0.001}).status_code == 400
+    assert client.post(f"/groups/{group_id}/expenses/bulk", json=[_expense(amount=0.001)]).json()["errors"] == [
+        {"index": 0, "detail": "Amount must be at least 0.01"}
+    ]
+
+
+def test_a_group_keeps_to_one_currency(client, db, group_id):
+    first = client.post(f"/groups/{group_id}/expenses/", json=_expense(currency="EUR")).json()
+    assert first["currency"] == "EUR"
+    assert client.post(f"/groups/{group_id}/expenses/", json=_expense()).status_code == 400
+    assert client.post(f"/groups/{group_id}/expenses/", json=_expense(currency="EUR")).status_code == 200
+
+    result = client.post(f"/groups/{group_id}/expenses/bulk", json=[
+        _expense(currency="EUR"), _expense(currency="USD")
+    ]).json()
+    assert len(result["created"]) == 1
+    assert result["errors"] == [{"index": 1, "detail": "This group's expenses are in EUR, got USD"}]
+
+    # Only an expense that is alone in its group can change currency
+    assert client.patch(f"/groups/{group_id}/expenses/{first['id']}", json={"currency": "USD"}).status_code == 400
+    other = crud.create_group(db, schemas.GroupCreate(name="flat", user_ids=[1, 2]))["id"]
+    only = client.post(f"/groups/{other}/expenses/", json=_expense()).json()
+    response = client.patch(f"/groups/{other}/expenses/{only['id']}", json={"currency": "GBP"})
+    assert response.json()["currency"] == "GBP"
+    assert ledger.find_drift(db) == []
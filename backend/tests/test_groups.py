@@ -0,0 +1,51 @@
+import pytest
+
+from app import crud, schemas
+from app.pagination import NEXT_CURSOR_HEADER
+
+
+@pytest.fixture
+def group_ids(db):
+    for name in ("ana", "ben", "cyd"):
+        crud.create_user(db, schemas.UserCreate(username=name, email=f"{name}@example.com"))
+    return [
+        crud.create_group(db, schemas.GroupCreate(name=name, user_ids=user_ids))["id"]
+        for name, user_ids in (
+            ("trip", [1, 2, 3]), ("trip_b", [1]), ("tripod", [2, 3]), ("flat", [2]), ("50% off", [3]),
+        )
+    ]
+
+
+def _groups(client, **params):
+    response = client.get("/groups/allGroups", params=params)
+    assert response.status_code == 200
+    return [(group["name"], group["member_count"]) for group in response.json()]
+
+
+def test_lists_groups_with_member_counts(client, group_ids):
+    assert _groups(client) == [("trip", 3), ("trip_b", 1), ("tripod", 2), ("flat", 1), ("50% off", 1)]
+
+
+def test_filters_by_member(client, group_ids):
+    assert _groups(client, member_id=1) == [("trip", 3), ("trip_b", 1)]
+    # Member counts still count every member, not only the filtered one
+    assert _groups(client, member_id=3) == [("trip", 3), ("tripod", 2), ("50% off", 1)]
+    assert _groups(client, member_id=999) == []
+
+
+def test_filters_by_name_prefix_literally(client, group_ids):
+    assert _groups(client, name_prefix="trip") == [("trip", 3), ("trip_b", 1), ("tripod", 2)]
+    # LIKE wildcards in the prefix match only themselves
+    assert _groups(client, name_prefix="trip_") == [("trip_b", 1)]
+    assert _groups(client, name_prefix="50%") == [("50% off", 1)]
+    assert _groups(client, name_prefix="%") == []
+
+
+def test_filters_combine_with_pagination(client, group_ids):
+    response = client.get("/groups/allGroups", params={"member_id": 2, "limit": 2})
+    assert [group["name"] for group in response.json()] == ["trip", "tripod"]
+    response = client.get("/groups/allGroups", params={
+        "member_id": 2, "limit": 2, "cursor": response.headers[NEXT_CURSOR_HEADER]
+    })
+    assert [group["name"] for group in response.json()] == ["flat"]
+    assert NEXT_CURSOR_HEADER not in response.headers
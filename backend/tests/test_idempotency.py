@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from app import crud, idempotency, models, schemas
+
+EXPENSE = {"description": "taxi", "amount": 30, "paid_by": 1, "split_type": "equal"}
+
+
+@pytest.fixture
+def group_id(db):
+    for name in ("ana", "ben"):
+        crud.create_user(db, schemas.UserCreate(username=name, email=f"{name}@example.com"))
+    return crud.create_group(db, schemas.GroupCreate(name="trip", user_ids=[1, 2]))["id"]
+
+
+def _expense_count(db):
+    return db.execute(select(func.count(models.Expense.id))).scalar()
+
+
+def test_retry_replays_the_first_response(client, db, group_id):
+    headers = {"Idempotency-Key": "expense-1"}
+    first = client.post(f"/groups/{group_id}/expenses/", json=EXPENSE, headers=headers)
+    assert first.status_code == 200 and "Idempotent-Replayed" not in first.headers
+
+    retry = client.post(f"/groups/{group_id}/expenses/", json=EXPENSE, headers=headers)
+    assert retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+    assert _expense_count(db) == 1
+
+
+def test_key_reused_for_another_request_is_rejected(client, db, group_id):
+    headers = {"Idempotency-Key": "expense-1"}
+    client.post(f"/groups/{group_id}/expenses/", json=EXPENSE, headers=headers)
+    response = client.post(f"/groups/{group_id}/expenses/", json=dict(EXPENSE, amount=31), headers=headers)
+    assert response.status_code == 422
+    assert _expense_count(db) == 1
+
+
+def test_losing_a_race_answers_with_the_winners_response(db, group_id, monkeypatch):
+    expense = schemas.ExpenseCreate(**EXPENSE)
+    winner, replayed = crud.create_expense_idempotent(db, expense, group_id, "expense-1")
+    assert not replayed
+
+    # The loser looked the key up before the winner committed it
+    lookups = []
+    real_lookup = crud.get_idempotent_response
+
+    def lookup_before_the_winner_committed(db, key, request_hash):
+        lookups.append(key)
+        return None if len(lookups) == 1 else real_lookup(db, key, request_hash)
+
+    monkeypatch.setattr(crud, "get_idempotent_response", lookup_before_the_winner_committed)
+    response, replayed = crud.create_expense_idempotent(db, expense, group_id, "expense-1")
+    assert replayed and response == winner
+    assert len(lookups) == 2
+    assert _expense_count(db) == 1
+
+
+def test_expired_keys_are_ignored_and_purged(db, group_id):
+    expense = schemas.ExpenseCreate(**EXPENSE)
+    crud.create_expense_idempotent(db, expense, group_id, "old")
+    crud.create_expense_idempotent(db, expense, group_id, "new")
+    expired = datetime.utcnow() - timedelta(hours=idempotency.IDEMPOTENCY_KEY_RETENTION_HOURS + 1)
+    db.get(models.IdempotencyKey, "old").created_at = expired
+    db.commit()
+
+    assert crud.purge_idempotency_keys(db) == 1
+    db.commit()
+    assert db.get(models.IdempotencyKey, "old") is None
+    assert db.get(models.IdempotencyKey, "new") is not None
+
+    # An expired key that was not purged yet no longer replays
+    db.get(models.IdempotencyKey, "new").created_at = expired
+    db.commit()
+    _, replayed = crud.create_expense_idempotent(db, expense, group_id, "new")
+    assert not replayed
+    assert _expense_count(db) == 3
+
+
+def test_purge_runs_at_most_once_per_interval():
+    now = [0.0]
+    schedule = idempotency.PurgeSchedule(interval=300, clock=lambda: now[0])
+    assert schedule.due()
+    now[0] = 299
+    assert not schedule.due()
+    now[0] = 300
+    assert schedule.due()
@@ -0,0 +1,27 @@
+from sqlalchemy import event
+
+from app import crud, ledger, schemas
+
+
+def test_upserts_write_rows_in_key_order(engine, db):
+    for name in ("ana", "ben", "cyd"):
+        crud.create_user(db, schemas.UserCreate(username=name, email=f"{name}@example.com"))
+    group_id = crud.create_group(db, schemas.GroupCreate(name="trip", user_ids=[1, 2, 3]))["id"]
+    upserts = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "ON CONFLICT" in statement:
+            upserts.append((statement.split()[2], parameters))
+
+    crud.create_expense(db, schemas.ExpenseCreate(
+        description="hotel", amount=90, paid_by=2, split_type="percentage", splits={3: 50, 1: 30, 2: 20}
+    ), group_id)
+    event.remove(engine, "before_cursor_execute", capture)
+
+    balances = dict(upserts)["group_user_balances"]
+    # (group_id, user_id, balance_cents) per row, in user id order
+    assert [balances[index] for index in range(1, len(balances), 3)] == [1, 2, 3]
+    users = dict(upserts)["user_summaries"]
+    assert [users[index] for index in range(0, len(users), 3)] == [1, 2, 3]
+    assert ledger.find_drift(db) == []
@@ -0,0 +1,65 @@
+import logging
+import re
+
+import pytest
+
+from app import crud, instrumentation, schemas
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    metrics = instrumentation.Metrics()
+    monkeypatch.setattr(instrumentation, "metrics", metrics)
+    return metrics
+
+
+@pytest.fixture
+def group_id(db):
+    for name in ("ana", "ben"):
+        crud.create_user(db, schemas.UserCreate(username=name, email=f"{name}@example.com"))
+    return crud.create_group(db, schemas.GroupCreate(name="trip", user_ids=[1, 2]))["id"]
+
+
+def _server_timing(response):
+    match = re.fullmatch(r'db;dur=([\d.]+);desc="(\d+) queries", app;dur=([\d.]+)', response.headers["Server-Timing"])
+    assert match, response.headers["Server-Timing"]
+    return float(match[1]), int(match[2]), float(match[3])
+
+
+def test_server_timing_counts_the_requests_queries(client, metrics, group_id):
+    _, queries, _ = _server_timing(client.get("/"))
+    assert queries == 0
+    db_ms, queries, total_ms = _server_timing(client.get(f"/groups/{group_id}"))
+    assert queries >= 2
+    assert 0 < db_ms <= total_ms
+
+
+def test_metrics_are_labelled_by_route_template(client, metrics, group_id):
+    client.get(f"/groups/{group_id}")
+    client.get("/groups/999")
+    client.get("/no/such/path")
+    body = client.get("/metrics").text
+
+    assert 'http_requests_total{method="GET",route="/groups/{group_id}",status="200"} 1' in body
+    assert 'http_requests_total{method="GET",route="/groups/{group_id}",status="404"} 1' in body
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"} 1' in body
+    assert 'db_queries_per_request_count{method="GET",route="/groups/{group_id}"} 2' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/groups/{group_id}",le="+Inf"} 2' in body
+    for name in ("http_request_duration_seconds", "db_queries_per_request", "db_time_per_request_seconds"):
+        assert f"# TYPE {name} histogram" in body
+
+
+def test_slow_queries_are_logged_by_fingerprint(client, metrics, group_id, monkeypatch, caplog):
+    monkeypatch.setattr(instrumentation, "SLOW_QUERY_MS", 1e-6)
+    with caplog.at_level(logging.WARNING, logger="app.slow_query"):
+        client.get(f"/groups/{group_id}")
+    assert caplog.records and all("slow query" in record.getMessage() for record in caplog.records)
+    assert metrics.slow_queries
+    assert "db_slow_queries_total{fingerprint=" in metrics.render()
+
+
+def test_fingerprints_ignore_literals_and_in_list_lengths():
+    first = instrumentation.fingerprint("SELECT * FROM users WHERE id IN (?, ?, ?) AND name = 'ana' LIMIT 10")
+    second = instrumentation.fingerprint("SELECT *  FROM users WHERE id IN (?) AND name = 'o''brien' LIMIT 5")
+    assert first == second
+    assert first[1] == "SELECT * FROM users WHERE id IN (...) AND name = ? LIMIT ?"
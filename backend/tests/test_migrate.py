@@ -0,0 +1,96 @@
+import os
+import tempfile
+from collections import defaultdict
+
+from hypothesis import given, settings, strategies as st
+from sqlalchemy import Column, Float, ForeignKey, Integer, MetaData, String, Table, create_engine, select
+
+from app import migrate, models
+
+# The tables as create_all made them before amounts were stored in cents
+legacy = MetaData()
+Table("users", legacy, Column("id", Integer, primary_key=True, index=True), Column("username", String, index=True),
+      Column("email", String, unique=True, index=True))
+Table("groups", legacy, Column("id", Integer, primary_key=True, index=True), Column("name", String, index=True))
+Table("group_users", legacy, Column("user_id", Integer, ForeignKey("users.id"), primary_key=True),
+      Column("group_id", Integer, ForeignKey("groups.id"), primary_key=True))
+legacy_expenses = Table(
+    "expenses", legacy,
+    Column("id", Integer, primary_key=True, index=True), Column("description", String, index=True),
+    Column("amount", Integer), Column("paid_by", Integer, ForeignKey("users.id")),
+    Column("group_id", Integer, ForeignKey("groups.id")), Column("split_type", String),
+)
+legacy_splits = Table(
+    "expense_splits", legacy,
+    Column("id", Integer, primary_key=True, index=True), Column("expense_id", Integer, ForeignKey("expenses.id")),
+    Column("user_id", Integer, ForeignKey("users.id")), Column("amount", Float),
+)
+
+MEMBERS = [1, 2, 3, 4, 5, 6, 7]
+
+
+def legacy_splits_of(amount, paid_by, weights):
+    """Float splits as the old crud.create_expense computed them."""
+    splits = {}
+    for user_id, weight in zip(MEMBERS, weights):
+        share = weight / sum(weights) * amount
+        splits[user_id] = -1 * (amount - share) if user_id == paid_by else share
+    return splits
+
+
+expenses = st.lists(
+    st.tuples(
+        st.integers(min_value=1, max_value=10**6),
+        st.sampled_from(MEMBERS),
+        st.lists(st.integers(min_value=0, max_value=100), min_size=len(MEMBERS), max_size=len(MEMBERS))
+        .filter(any),
+    ),
+    min_size=1, max_size=30,
+)
+
+
+@settings(deadline=None, max_examples=25)
+@given(expenses)
+def test_integer_cents_converts_float_rows_without_drift(expense_rows):
+    with tempfile.TemporaryDirectory() as scratch:
+        check_integer_cents(create_engine(f"sqlite:///{os.path.join(scratch, 'legacy.db')}"), expense_rows)
+
+
+def check_integer_cents(engine, expense_rows):
+    legacy.create_all(engine)
+    expected = defaultdict(float)
+    with engine.begin() as conn:
+        conn.execute(legacy.tables["users"].insert(), [{"id": user_id} for user_id in MEMBERS])
+        conn.execute(legacy.tables["groups"].insert(), [{"id": 1}])
+        conn.execute(legacy.tables["group_users"].insert(), [{"user_id": user_id, "group_id": 1} for user_id in MEMBERS])
+        for expense_id, (amount, paid_by, weights) in enumerate(expense_rows, start=1):
+            conn.execute(legacy_expenses.insert(), [{
+                "id": expense_id, "amount": amount, "paid_by": paid_by, "group_id": 1, "split_type": "percentage",
+            }])
+            splits = legacy_splits_of(amount, paid_by, weights)
+            conn.execute(legacy_splits.insert(), [
+                {"expense_id": expense_id, "user_id": user_id, "amount": split} for user_id, split in splits.items()
+            ])
+            for user_id, split in splits.items():
+                expected[expense_id, user_id] = split * 100
+
+    assert "integer_cents" in migrate.upgrade(engine)
+
+    with engine.connect() as conn:
+        amounts = dict(conn.execute(select(models.Expense.id, models.Expense.amount_cents)).all())
+        rows = conn.execute(select(
+            models.ExpenseSplit.expense_id, models.ExpenseSplit.user_id, models.ExpenseSplit.amount_cents
+        )).all()
+    engine.dispose()
+
+    assert amounts == {expense_id: amount * 100 for expense_id, (amount, _, _) in enumerate(expense_rows, start=1)}
+    per_expense = defaultdict(int)
+    for expense_id, user_id, cents in rows:
+        assert isinstance(cents, int)
+        per_expense[expense_id] += cents
+        paid_by = expense_rows[expense_id - 1][1]
+        # Each split is its float value rounded to the cent; the payer's also absorbs the others' rounding
+        tolerance = 0.5 * len(MEMBERS) if user_id == paid_by else 0.5
+        assert abs(cents - expected[expense_id, user_id]) <= tolerance + 1e-6
+    assert all(total == 0 for total in per_expense.values())
+    assert len(per_expense) == len(expense_rows)
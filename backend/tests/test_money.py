@@ -0,0 +1,74 @@
+from fractions import Fraction
+
+import pytest
+from hypothesis import given, strategies as st
+
+from app import crud, money, schemas
+
+totals = st.integers(min_value=0, max_value=10**12)
+weight_lists = st.lists(st.integers(min_value=0, max_value=10**6), min_size=1, max_size=50).filter(any)
+
+
+@given(totals, weight_lists)
+def test_allocate_sums_to_total(total_cents, weights):
+    assert sum(money.allocate(total_cents, weights)) == total_cents
+
+
+@given(totals, weight_lists)
+def test_allocate_shares_within_a_cent_of_their_quota(total_cents, weights):
+    shares = money.allocate(total_cents, weights)
+    for share, weight in zip(shares, weights):
+        assert abs(share - Fraction(total_cents * weight, sum(weights))) < 1
+
+
+@given(totals, st.integers(min_value=1, max_value=200))
+def test_allocate_equal_shares_within_a_cent(total_cents, count):
+    shares = money.allocate(total_cents, [1] * count)
+    assert max(shares) - min(shares) <= 1
+
+
+@pytest.mark.parametrize("weights", [[], [0, 0], [1, -1]])
+def test_allocate_rejects_invalid_weights(weights):
+    with pytest.raises(ValueError):
+        money.allocate(100, weights)
+
+
+amounts = st.integers(min_value=1, max_value=10**10).map(lambda cents: cents / 100)
+
+
+def _assert_exact(splits, expense):
+    total_cents = money.to_cents(expense.amount)
+    assert sum(splits.values()) == 0
+    # What each participant owes, with the payer's credit for the total taken back out
+    shares = dict(splits)
+    shares[expense.paid_by] += total_cents
+    assert sum(shares.values()) == total_cents
+    assert all(share >= 0 for share in shares.values())
+
+
+@given(amounts, st.integers(min_value=1, max_value=100), st.data())
+def test_build_splits_equal_is_exact(amount, member_count, data):
+    member_ids = list(range(1, member_count + 1))
+    paid_by = data.draw(st.sampled_from(member_ids))
+    expense = schemas.ExpenseCreate(description="x", amount=amount, paid_by=paid_by, split_type="equal")
+    splits = crud.build_splits(expense, member_ids)
+    _assert_exact(splits, expense)
+    assert set(splits) == set(member_ids)
+
+
+@given(amounts, weight_lists, st.data())
+def test_build_splits_percentage_is_exact(amount, weights, data):
+    member_ids = list(range(1, len(weights) + 1))
+    percentages = {user_id: weight * 100 / sum(weights) for user_id, weight in zip(member_ids, weights)}
+    paid_by = data.draw(st.sampled_from(member_ids))
+    expense = schemas.ExpenseCreate(
+        description="x", amount=amount, paid_by=paid_by, split_type="percentage", splits=percentages
+    )
+    _assert_exact(crud.build_splits(expense, member_ids), expense)
+
+
+@given(st.decimals(min_value=0, max_value=10**8, places=2, allow_nan=False))
+def test_cents_round_trip(amount):
+    cents = money.to_cents(amount)
+    assert money.format_cents(cents) == f"{amount:.2f}"
+    assert money.to_cents(money.from_cents(cents)) == cents
@@ -0,0 +1,58 @@
+import pytest
+
+from app import crud, schemas
+from app.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+
+def _walk(client, url, limit, **params):
+    """Every page of a list endpoint, following X-Next-Cursor."""
+    pages = []
+    cursor = None
+    while True:
+        response = client.get(url, params=dict(params, limit=limit, cursor=cursor))
+        assert response.status_code == 200
+        pages.append([row["id"] for row in response.json()])
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return pages
+
+
+@pytest.fixture
+def group_id(db):
+    for index in range(7):
+        crud.create_user(db, schemas.UserCreate(username=f"user{index}", email=f"user{index}@example.com"))
+    group_id = crud.create_group(db, schemas.GroupCreate(name="trip", user_ids=[1, 2]))["id"]
+    for _ in range(6):
+        crud.create_expense(db, schemas.ExpenseCreate(
+            description="taxi", amount=10, paid_by=1, split_type="equal"
+        ), group_id)
+    return group_id
+
+
+def test_cursors_walk_every_row_once(client, group_id):
+    assert _walk(client, "/users/", 3) == [[1, 2, 3], [4, 5, 6], [7]]
+    # A full last page still gets a cursor; the page after it is empty and has none
+    assert _walk(client, f"/groups/{group_id}/expenses/", 3) == [[1, 2, 3], [4, 5, 6], []]
+
+
+def test_cursor_seeks_past_the_last_id(client, db, group_id):
+    crud.delete_expense(db, group_id, 4)
+    response = client.get(f"/groups/{group_id}/expenses/", params={"limit": 2, "cursor": encode_cursor(3)})
+    assert [expense["id"] for expense in response.json()] == [5, 6]
+    assert decode_cursor(response.headers[NEXT_CURSOR_HEADER]) == 6
+    # Without a limit everything after the cursor comes back, with no next cursor
+    response = client.get(f"/groups/{group_id}/expenses/", params={"cursor": encode_cursor(5)})
+    assert [expense["id"] for expense in response.json()] == [6]
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+def test_skip_still_pages_users(client, group_id):
+    assert [user["id"] for user in client.get("/users/", params={"skip": 5}).json()] == [6, 7]
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor("1"), "eyJ4IjoxfQ"])
+def test_malformed_cursors_are_rejected(client, group_id, cursor):
+    for url in ("/users/", "/groups/allGroups", f"/groups/{group_id}/expenses/"):
+        response = client.get(url, params={"cursor": cursor})
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,30 @@
+from sqlalchemy import create_engine, text
+
+from app import migrate
+from benchmarks import query_plans
+from tests.test_migrate import legacy
+
+SMALL = ["--groups", "6", "--members", "4", "--expenses-per-group", "20"]
+
+
+def test_hot_queries_use_indexes():
+    assert query_plans.main(SMALL) == 0
+
+
+def test_upgraded_legacy_database_has_the_hot_path_indexes(tmp_path):
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    engine = create_engine(url)
+    legacy.create_all(engine)
+    engine.dispose()
+    assert query_plans.main(["--url", url] + SMALL) == 0
+
+
+def test_a_dropped_index_fails_the_check(tmp_path, capsys):
+    url = f"sqlite:///{tmp_path / 'plans.db'}"
+    engine = create_engine(url)
+    migrate.upgrade(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_expenses_group_id_id"))
+    engine.dispose()
+    assert query_plans.main(["--url", url] + SMALL) == 1
+    assert "MISSING INDEX" in capsys.readouterr().out
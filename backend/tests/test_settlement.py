@@ -0,0 +1,45 @@
+from hypothesis import given, strategies as st
+
+from app import crud, schemas, settlement
+
+
+@st.composite
+def balances(draw, max_members=10):
+    """Zero-sum balances in cents, positive meaning the member owes."""
+    amounts = draw(st.lists(st.integers(-10**6, 10**6), min_size=1, max_size=max_members - 1))
+    amounts.append(-sum(amounts))
+    return dict(enumerate(amounts, start=1))
+
+
+@given(balances(), st.sampled_from(sorted(settlement.STRATEGIES)))
+def test_settle_has_debtors_pay_creditors(balances, strategy):
+    transfers = settlement.settle(balances, strategy)
+    for from_id, to_id, cents in transfers:
+        assert balances[from_id] > 0 > balances[to_id]
+        assert cents > 0
+    assert settlement.net_positions(transfers) == {
+        user_id: balance for user_id, balance in balances.items() if balance
+    }
+
+
+@given(st.lists(st.tuples(st.integers(1, 8), st.integers(1, 8), st.integers(1, 10**5))))
+def test_simplify_keeps_net_positions(graph):
+    graph = [(from_id, to_id, cents) for from_id, to_id, cents in graph if from_id != to_id]
+    expected = {user_id: balance for user_id, balance in settlement.net_positions(graph).items() if balance}
+    assert settlement.net_positions(settlement.simplify(graph)) == expected
+
+
+def test_group_balances_have_the_debtor_pay_the_payer(db):
+    for name in ("payer", "other"):
+        crud.create_user(db, schemas.UserCreate(username=name, email=f"{name}@example.com"))
+    group_id = crud.create_group(db, schemas.GroupCreate(name="trip", user_ids=[1, 2]))["id"]
+    crud.create_expense(db, schemas.ExpenseCreate(
+        description="dinner", amount=100, paid_by=1, split_type="equal"
+    ), group_id)
+
+    members = {member["user_id"]: member for member in crud.get_group_details(db, group_id)["members"]}
+    assert members[2]["balance_cents"] == 5000  # owes
+    [transfer] = crud.get_group_balances(db, group_id)["balances"]
+    assert (transfer["from_user_id"], transfer["to_user_id"], transfer["amount"]) == (2, 1, 50)
+    assert crud.get_user_balances(db, 1)["total_balance"] == 50
+    assert crud.get_user_balances(db, 2)["total_balance"] == -50
@@ -0,0 +1,135 @@
+import json
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from chat import sql_guard
+from chat.sql_guard import SQLGuardError, check_read_only, with_row_limit
+
+
+@pytest.mark.parametrize("sql", [
+    "DELETE FROM expenses",
+    "UPDATE users SET email = 'x'",
+    "WITH gone AS (DELETE FROM expenses RETURNING *) SELECT * FROM gone",
+    "SELECT * INTO copy FROM expenses",
+    "SELECT * FROM expenses FOR UPDATE",
+    "EXPLAIN ANALYZE DELETE FROM expenses",
+    "PRAGMA writable_schema = 1",
+])
+def test_rejects_writes(sql):
+    with pytest.raises(SQLGuardError):
+        check_read_only(sql)
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT 1; DELETE FROM expenses",
+    "SELECT 1; SELECT 2",
+    "SELECT 1 -- comment\n; DROP TABLE users",
+])
+def test_rejects_multiple_statements(sql):
+    with pytest.raises(SQLGuardError, match="single statement"):
+        check_read_only(sql)
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT pg_sleep(60)",
+    "SELECT PG_READ_FILE('/etc/passwd')",
+    "SELECT set_config('default_transaction_read_only', 'off', false)",
+    "SELECT nextval('expenses_id_seq')",
+])
+def test_rejects_forbidden_functions(sql):
+    with pytest.raises(SQLGuardError, match="Forbidden function"):
+        check_read_only(sql)
+
+
+@pytest.mark.parametrize("sql", [
+    # Postgres ends the first literal at the second quote; a plain '' reader would not
+    "SELECT E'\\'', pg_read_file('/etc/passwd') /*'*/",
+    "SELECT E'\\'', pg_sleep(60) /*'*/",
+    "SELECT '\\', pg_sleep(60) --'",
+    "SELECT $$'$$, pg_sleep(60) --'",
+    "SELECT $q$ $q$",
+    # SQLite ends the comment at the first */, Postgres only at the second
+    "SELECT 1 /* /* */ ' */, pg_sleep(60) --'",
+    "SELECT 'never closed",
+    "SELECT 1 /* never closed",
+])
+def test_rejects_literals_and_comments_it_cannot_delimit(sql):
+    with pytest.raises(SQLGuardError):
+        check_read_only(sql)
+
+
+@pytest.mark.parametrize("sql, statement", [
+    ("SELECT 'delete; drop' AS note", "SELECT 'delete; drop' AS note"),
+    ("SELECT 'it''s' AS \"update\"", "SELECT 'it''s' AS \"update\""),
+    ("SELECT id FROM users -- delete everything\n;", "SELECT id FROM users"),
+    ("/* insert */ SELECT 1 AS one;;", "SELECT 1 AS one"),
+    ("SELECT '--' AS dashes, '/*' AS opener", "SELECT '--' AS dashes, '/*' AS opener"),
+    ("SELECT amount$cents FROM t", "SELECT amount$cents FROM t"),
+])
+def test_keywords_in_literals_and_comments_are_ignored(sql, statement):
+    assert check_read_only(sql) == statement
+
+
+def test_row_limit_wraps_the_statement():
+    statement = check_read_only("SELECT id FROM users LIMIT 1000 -- all of them")
+    assert with_row_limit(statement, 5) == "SELECT * FROM (SELECT id FROM users LIMIT 1000) AS guarded_query LIMIT 5"
+
+
+def test_execute_caps_rows_and_flags_truncation(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'guard.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE numbers (n INTEGER)"))
+        conn.execute(text("INSERT INTO numbers VALUES (1), (2), (3)"))
+    assert sql_guard.execute("SELECT n FROM numbers ORDER BY n", max_rows=2, engine=engine) == [(1,), (2,)]
+    assert sql_guard.sql_stats.recent[-1]["status"] == "truncated"
+    with pytest.raises(SQLGuardError):
+        sql_guard.execute("DELETE FROM numbers", engine=engine)
+    assert sql_guard.sql_stats.recent[-1]["status"] == "rejected"
+    engine.dispose()
+
+
+class FakePostgres:
+    """Engine, connection and transaction of a PostgreSQL server whose planner estimates `cost`."""
+
+    class dialect:
+        name = "postgresql"
+
+    def __init__(self, cost: float):
+        self.cost = cost
+        self.statements = []
+
+    def connect(self):
+        return self
+
+    def begin(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement):
+        self.statements.append(str(statement))
+        return self
+
+    def scalar(self):
+        return json.dumps([{"Plan": {"Total Cost": self.cost}}])
+
+    def __iter__(self):
+        return iter([(1,)])
+
+
+def test_execute_rejects_expensive_queries_without_running_them():
+    engine = FakePostgres(cost=5000)
+    with pytest.raises(SQLGuardError, match="too expensive"):
+        sql_guard.execute("SELECT * FROM expenses", max_cost=1000, engine=engine)
+    assert engine.statements[0] == "SET TRANSACTION READ ONLY"
+    assert engine.statements[-1].startswith("EXPLAIN")
+    assert sql_guard.sql_stats.recent[-1]["cost"] == 5000
+
+    engine = FakePostgres(cost=10)
+    assert sql_guard.execute("SELECT * FROM expenses", max_cost=1000, engine=engine) == [(1,)]
+    assert engine.statements[-1].startswith("SELECT * FROM (SELECT * FROM expenses)")
@@ -0,0 +1,85 @@
+import random
+
+import numpy as np
+import pytest
+from hypothesis import given, settings, strategies as st
+
+from app import crud, models, money, schemas, vectorized
+from benchmarks.bench_vectorized import batch_arguments, random_expenses
+from benchmarks.seed_data import seed
+
+
+def crud_rows(expenses):
+    return [
+        (index, user_id, cents)
+        for index, (member_ids, expense) in enumerate(expenses)
+        for user_id, cents in crud.build_splits(expense, member_ids).items()
+    ]
+
+
+def vectorized_rows(expenses):
+    return list(zip(*(column.tolist() for column in vectorized.build_splits(*batch_arguments(expenses)))))
+
+
+def test_build_splits_matches_crud():
+    expenses = random_expenses(random.Random(42), 2000)
+    assert vectorized_rows(expenses) == crud_rows(expenses)
+
+
+@st.composite
+def expenses(draw, max_cents):
+    """(member_ids, ExpenseCreate) with percentages of up to six decimals."""
+    member_ids = draw(st.lists(st.integers(1, 50), min_size=1, max_size=10, unique=True))
+    paid_by = draw(st.sampled_from(member_ids))
+    amount = draw(st.integers(1, max_cents)) / 100
+    participants = draw(st.lists(st.sampled_from(member_ids), min_size=1, unique=True))
+    if draw(st.booleans()):
+        return member_ids, schemas.ExpenseCreate(description="x", amount=amount, paid_by=paid_by, split_type="equal")
+    # Percentages in millionths, the last one taking up the rest of 100%
+    cuts = sorted(draw(st.lists(st.integers(0, 100_000_000), min_size=len(participants) - 1,
+                                max_size=len(participants) - 1)))
+    millionths = [high - low for low, high in zip([0] + cuts, cuts + [100_000_000])]
+    if not any(millionths):
+        millionths[-1] = 100_000_000
+    splits = {user_id: part / 1_000_000 for user_id, part in zip(participants, millionths)}
+    return member_ids, schemas.ExpenseCreate(
+        description="x", amount=amount, paid_by=paid_by, split_type="percentage", splits=splits
+    )
+
+
+@settings(max_examples=200)
+@given(st.lists(expenses(max_cents=10**9), min_size=1, max_size=20))
+def test_build_splits_matches_crud_property(batch):
+    assert vectorized_rows(batch) == crud_rows(batch)
+
+
+@settings(max_examples=100)
+@given(st.lists(expenses(max_cents=10**13), min_size=1, max_size=5))
+def test_build_splits_matches_crud_past_int64_products(batch):
+    # total * millionths weight exceeds int64 from about 9.2e10 cents
+    assert vectorized_rows(batch) == crud_rows(batch)
+
+
+def test_allocate_large_totals_are_exact():
+    total = np.iinfo(np.int64).max // 3
+    shares = vectorized.allocate([total, 100], [0, 0, 0, 1, 1], [33.3333, 33.3333, 33.3334, 1, 2])
+    assert shares.tolist()[:3] == money.allocate(total, [333333, 333333, 333334])
+    assert shares.tolist()[3:] == [33, 67]
+
+
+@pytest.mark.parametrize("weights", [[1, -1], [0, 0]])
+def test_allocate_rejects_invalid_weights(weights):
+    with pytest.raises(ValueError):
+        vectorized.allocate([100], [0, 0], weights)
+
+
+def test_balances_match_orm_and_sql(db):
+    seed(db, users=60, groups=12, group_size=(2, 8), expenses_per_group=40)
+    db.commit()
+
+    orm = {}
+    for split in db.query(models.ExpenseSplit):
+        key = (split.group_id, split.user_id)
+        orm[key] = orm.get(key, 0) + split.amount_cents
+    assert vectorized.net_balances_dict(*vectorized.load_splits(db)[1:]) == orm
+    assert crud.aggregate_split_balances(db) == orm
@@ -61,10 +61,10 @@ const Dashboard: React.FC = () => {
     // Go through all balances in all groups
     Object.values(userBalances.balances_by_group).forEach(groupBalances => {
       groupBalances.forEach(balance => {
-        if (balance.from_user_id === currentUser.id) {
+        if (balance.to_user_id === currentUser.id) {
           // Someone owes Shruti
           totalOwed += balance.amount;
-        } else if (balance.to_user_id === currentUser.id) {
+        } else if (balance.from_user_id === currentUser.id) {
           // Shruti owes someone
           totalOwing += balance.amount;
         }
@@ -82,9 +82,9 @@ const Dashboard: React.FC = () => {
     
     Object.entries(userBalances.balances_by_group).forEach(([groupName, balances]) => {
       balances.forEach(balance => {
-        if (balance.from_user_id === currentUser.id) {
+        if (balance.to_user_id === currentUser.id) {
           peopleWhoOwe.push({
-            username: balance.to_username,
+            username: balance.from_username,
             amount: balance.amount,
             group: groupName
           });
@@ -103,9 +103,9 @@ const Dashboard: React.FC = () => {
     
     Object.entries(userBalances.balances_by_group).forEach(([groupName, balances]) => {
       balances.forEach(balance => {
-        if (balance.to_user_id === currentUser.id) {
+        if (balance.from_user_id === currentUser.id) {
           peopleYouOwe.push({
-            username: balance.from_username,
+            username: balance.to_username,
             amount: balance.amount,
             group: groupName
           });
@@ -186,9 +186,9 @@ const GroupDetails: React.FC<{ groupId: number }> = ({ groupId }) => {
             {balances.map((balance, i) => (
               <div key={i} className="p-4 border rounded-lg flex justify-between">
                 <div>
-                  <span className="font-medium">{balance.to_username}</span>
-                  {' owes '}
                   <span className="font-medium">{balance.from_username}</span>
+                  {' owes '}
+                  <span className="font-medium">{balance.to_username}</span>
                 </div>
                 <div className="font-semibold text-green-600">${balance.amount.toFixed(2)}</div>
               </div>